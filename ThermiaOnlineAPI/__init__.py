@@ -1,29 +1,208 @@
-from typing import List
+import asyncio
+import random
+import threading
+from datetime import timedelta
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
 
 from ThermiaOnlineAPI.api.ThermiaAPI import ThermiaAPI
+from ThermiaOnlineAPI.const import (
+    DEFAULT_POLLING_INTERVAL,
+    STATE_VERSION,
+    UNSUPPORTED_DATA_CACHE_TTL,
+)
 from ThermiaOnlineAPI.exceptions import AuthenticationException, NetworkException
-from ThermiaOnlineAPI.model.HeatPump import ThermiaHeatPump
+from ThermiaOnlineAPI.model.HeatPump import PropertyChange, ThermiaHeatPump
+from ThermiaOnlineAPI.store.HistoricalDataStore import HistoricalDataStore
+from ThermiaOnlineAPI.store.InstallationProfileCache import InstallationProfileCache
+from ThermiaOnlineAPI.utils.hedging import HedgingPolicy
+from ThermiaOnlineAPI.utils.polling import get_polling_offset, polling_ticks
 
 
 class Thermia:
-    def __init__(self, username, password):
+    def __init__(
+        self,
+        username,
+        password,
+        historical_data_store: Optional[HistoricalDataStore] = None,
+        installation_profile_cache: Optional[InstallationProfileCache] = None,
+        unsupported_data_ttl: timedelta = UNSUPPORTED_DATA_CACHE_TTL,
+        state: Optional[Dict[str, Any]] = None,
+        max_data_age: Optional[timedelta] = None,
+        hedging_policy: Optional[HedgingPolicy] = None,
+    ):
         self._username = username
         self._password = password
+        self._historical_data_store = historical_data_store
+        self._max_data_age = max_data_age
+        # Shared by all heat pumps, so data of the same model is fetched only once
+        self._installation_profile_cache = (
+            installation_profile_cache
+            if installation_profile_cache is not None
+            else InstallationProfileCache()
+        )
 
-        self.api_interface = ThermiaAPI(username, password)
+        self.api_interface = ThermiaAPI(
+            username,
+            password,
+            installation_profile_cache=self._installation_profile_cache,
+            unsupported_data_ttl=unsupported_data_ttl,
+            state=state["api"] if state is not None else None,
+            hedging_policy=hedging_policy,
+        )
         self.connected = self.api_interface.authenticated
 
-        self.heat_pumps = self.fetch_heat_pumps()
+        if state is not None:
+            self.heat_pumps = [
+                ThermiaHeatPump(
+                    heat_pump_state["device_data"],
+                    self.api_interface,
+                    self._historical_data_store,
+                    self._installation_profile_cache,
+                    heat_pump_state,
+                    max_data_age,
+                )
+                for heat_pump_state in state["heat_pumps"]
+            ]
+        else:
+            self.heat_pumps = self.fetch_heat_pumps()
+
+    @classmethod
+    def from_state(
+        cls, username, password, state: Dict[str, Any], **kwargs
+    ) -> "Thermia":
+        """
+        Restore Thermia from to_state() output without any requests. Heat
+        pumps serve the restored (stale) data until their next update.
+        """
+        if state.get("version") != STATE_VERSION:
+            raise ValueError("Unsupported state version: " + str(state.get("version")))
+
+        return cls(username, password, state=state, **kwargs)
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "version": STATE_VERSION,
+            "api": self.api_interface.to_state(),
+            "heat_pumps": [heat_pump.to_state() for heat_pump in self.heat_pumps],
+        }
+
+    def update_data_in_background(self) -> threading.Thread:
+        thread = threading.Thread(target=self.update_data, daemon=True)
+        thread.start()
+
+        return thread
 
     def fetch_heat_pumps(self) -> List[ThermiaHeatPump]:
         devices = self.api_interface.get_devices()
         heat_pumps = []
 
         for device in devices:
-            heat_pumps.append(ThermiaHeatPump(device, self.api_interface))
+            heat_pumps.append(
+                ThermiaHeatPump(
+                    device,
+                    self.api_interface,
+                    self._historical_data_store,
+                    self._installation_profile_cache,
+                    max_data_age=self._max_data_age,
+                )
+            )
 
         return heat_pumps
 
     def update_data(self) -> None:
         for heat_pump in self.heat_pumps:
             heat_pump.update_data()
+
+    def subscribe(
+        self, callback: Callable[[ThermiaHeatPump, List[PropertyChange]], None]
+    ) -> None:
+        for heat_pump in self.heat_pumps:
+            heat_pump.subscribe(callback)
+
+    def unsubscribe(
+        self, callback: Callable[[ThermiaHeatPump, List[PropertyChange]], None]
+    ) -> None:
+        for heat_pump in self.heat_pumps:
+            heat_pump.unsubscribe(callback)
+
+    async def watch(
+        self,
+        interval: timedelta = DEFAULT_POLLING_INTERVAL,
+        stagger: bool = False,
+        jitter: timedelta = timedelta(0),
+    ) -> AsyncIterator[Dict[str, Dict[str, Any]]]:
+        """
+        Update data of all heat pumps every interval and yield their
+        snapshots by heat pump id after each update.
+
+        With stagger, heat pump updates are spread evenly across the
+        interval by a hash of the heat pump id, with an additional random
+        delay of up to jitter per update, and a snapshot of each heat pump
+        is yielded separately as soon as it is updated.
+        """
+        if stagger:
+            staggered_snapshots = self.__watch_staggered(interval, jitter)
+            try:
+                async for snapshots in staggered_snapshots:
+                    yield snapshots
+            finally:
+                await staggered_snapshots.aclose()
+            return
+
+        async for _ in polling_ticks(interval):
+            snapshots = await asyncio.gather(
+                *[
+                    asyncio.to_thread(self.__update_heat_pump_and_snapshot, heat_pump)
+                    for heat_pump in self.heat_pumps
+                ]
+            )
+
+            yield {
+                heat_pump.id: snapshot
+                for heat_pump, snapshot in zip(self.heat_pumps, snapshots)
+            }
+
+    async def __watch_staggered(
+        self, interval: timedelta, jitter: timedelta
+    ) -> AsyncIterator[Dict[str, Dict[str, Any]]]:
+        # Bounded, so that heat pumps skip cycles when the consumer is too slow
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, len(self.heat_pumps)))
+
+        async def watch_heat_pump(heat_pump: ThermiaHeatPump):
+            try:
+                await asyncio.sleep(
+                    get_polling_offset(heat_pump.id, interval).total_seconds()
+                )
+
+                async for _ in polling_ticks(interval):
+                    await asyncio.sleep(random.uniform(0, jitter.total_seconds()))
+                    snapshot = await asyncio.to_thread(
+                        self.__update_heat_pump_and_snapshot, heat_pump
+                    )
+                    await queue.put({heat_pump.id: snapshot})
+            except Exception as e:
+                # Raised by the iterator, as it is when heat pumps are not staggered
+                await queue.put(e)
+
+        tasks = [
+            asyncio.create_task(watch_heat_pump(heat_pump))
+            for heat_pump in self.heat_pumps
+        ]
+
+        try:
+            while True:
+                item = await queue.get()
+
+                if isinstance(item, Exception):
+                    raise item
+
+                yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def __update_heat_pump_and_snapshot(
+        self, heat_pump: ThermiaHeatPump
+    ) -> Dict[str, Any]:
+        heat_pump.update_data()
+        return heat_pump.snapshot()
@@ -6,7 +6,8 @@ from requests.adapters import HTTPAdapter, Retry
 from requests import cookies
 import json
 import hashlib
-from typing import Dict, Optional
+import threading
+from typing import Any, Callable, Dict, Optional, Set, Tuple
 
 from ThermiaOnlineAPI.const import (
     REG_GROUP_HOT_WATER,
@@ -22,13 +23,17 @@ from ThermiaOnlineAPI.const import (
     THERMIA_AZURE_AUTH_CLIENT_ID_AND_SCOPE,
     THERMIA_AZURE_AUTH_REDIRECT_URI,
     THERMIA_INSTALLATION_PATH,
+    UNSUPPORTED_DATA_CACHE_TTL,
+    UNSUPPORTED_DATA_MIN_RESPONSES,
 )
 
 
 from ..exceptions.AuthenticationException import AuthenticationException
 from ..exceptions.NetworkException import NetworkException
 from ..model.HeatPump import ThermiaHeatPump
+from ..store.InstallationProfileCache import InstallationProfileCache
 from ..utils import utils
+from ..utils.hedging import HedgingPolicy
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -45,18 +50,30 @@ azure_auth_request_headers = {
     "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8"
 }
 
+# Response statuses meaning that a register group is not supported by the model
+UNSUPPORTED_REGISTER_GROUP_STATUSES = [400, 404]
+
 # Fix for multiple operation modes with the same value
 REG_OPERATIONMODE_SKIP_VALUES = ["REG_VALUE_OPERATION_MODE_SERVICE"]
 
 
 class ThermiaAPI:
-    def __init__(self, email, password):
+    def __init__(
+        self,
+        email,
+        password,
+        installation_profile_cache: Optional[InstallationProfileCache] = None,
+        unsupported_data_ttl: timedelta = UNSUPPORTED_DATA_CACHE_TTL,
+        state: Optional[Dict[str, Any]] = None,
+        hedging_policy: Optional[HedgingPolicy] = None,
+    ):
         self.__email = email
         self.__password = password
         self.__token = None
         self.__token_valid_to = None
         self.__refresh_token_valid_to = None
         self.__refresh_token = None
+        self.__authentication_lock = threading.Lock()
 
         self.__default_request_headers = {
             "Authorization": "Bearer ",
@@ -65,6 +82,25 @@ class ThermiaAPI:
             "Access-Control-Allow-Origin": "*",
         }
 
+        # Parsed responses by URL, used to skip parsing of unchanged responses
+        self.__response_cache: Dict[str, dict] = {}
+        # Data derived from register groups by (device id, register group, name)
+        self.__derived_data_cache: Dict[Tuple[str, str, str], Tuple[list, Any]] = {}
+
+        # Unsupported register groups and registers are cached per installation profile
+        self.__installation_profile_cache = (
+            installation_profile_cache
+            if installation_profile_cache is not None
+            else InstallationProfileCache()
+        )
+        self.__unsupported_data_ttl = unsupported_data_ttl
+        self.__installation_profile_ids: Dict[str, Any] = {}
+        # Only online heat pumps are trusted to report unsupported data
+        self.__online_device_ids: Set[str] = set()
+
+        # Register group requests are hedged with this policy, if set
+        self.__hedging_policy = hedging_policy
+
         self.__session = requests.Session()
         retry = Retry(
             total=20, backoff_factor=0.1, status_forcelist=[500, 502, 503, 504]
@@ -72,35 +108,51 @@ class ThermiaAPI:
         adapter = HTTPAdapter(max_retries=retry)
         self.__session.mount("https://", adapter)
 
-        self.configuration = self.__fetch_configuration()
-        self.authenticated = self.__authenticate()
+        if state is not None:
+            # Restored tokens are used until they expire, without any requests
+            self.configuration = state["configuration"]
+            self.__set_token_state(state)
+            self.authenticated = self.__token is not None
+        else:
+            self.configuration = self.__fetch_configuration()
+            self.authenticated = self.__authenticate()
 
-    def get_devices(self):
+    def to_state(self) -> Dict[str, Any]:
+        with self.__authentication_lock:
+            return {
+                "configuration": self.configuration,
+                "token": self.__token,
+                "token_valid_to": self.__token_valid_to,
+                "refresh_token": self.__refresh_token,
+                "refresh_token_valid_to": self.__refresh_token_valid_to,
+            }
+
+    def __set_token_state(self, state: Dict[str, Any]):
+        self.__token = state.get("token")
+        self.__token_valid_to = state.get("token_valid_to")
+        self.__refresh_token = state.get("refresh_token")
+        self.__refresh_token_valid_to = state.get("refresh_token_valid_to")
+
+        if self.__token is not None:
+            self.__default_request_headers["Authorization"] = "Bearer " + self.__token
+
+    def get_devices(self, raise_on_error: bool = False):
         self.__check_token_validity()
 
         url = self.configuration["apiBaseUrl"] + "/api/v1/installationsInfo"
-        request = self.__session.get(url, headers=self.__default_request_headers)
-        status = request.status_code
+        response = self.__get_json(
+            url, "Error fetching devices.", raise_on_error=raise_on_error
+        )
 
-        if status != 200:
-            _LOGGER.error(
-                "Error fetching devices. Status: "
-                + str(status)
-                + ", Response: "
-                + request.text
-            )
+        if response is None:
             return []
 
-        response = utils.get_response_json_or_log_and_raise_exception(
-            request, "Error getting devices."
-        )
-
         return response.get("items", [])
 
-    def get_device_by_id(self, device_id: str):
+    def get_device_by_id(self, device_id: str, raise_on_error: bool = False):
         self.__check_token_validity()
 
-        devices = self.get_devices()
+        devices = self.get_devices(raise_on_error)
 
         device = [d for d in devices if str(d["id"]) == device_id]
 
@@ -110,27 +162,28 @@ class ThermiaAPI:
 
         return device[0]
 
-    def get_device_info(self, device_id: str):
+    def get_device_info(self, device_id: str, raise_on_error: bool = False):
         self.__check_token_validity()
 
         url = self.configuration["apiBaseUrl"] + "/api/v1/installations/" + device_id
-        request = self.__session.get(url, headers=self.__default_request_headers)
-        status = request.status_code
-
-        if status != 200:
-            _LOGGER.error(
-                "Error fetching device info. Status: "
-                + str(status)
-                + ", Response: "
-                + str(request.text)
-            )
-            return None
+        info = self.__get_json(
+            url, "Error fetching device info.", raise_on_error=raise_on_error
+        )
 
-        return utils.get_response_json_or_log_and_raise_exception(
-            request, "Error getting device info."
+        installation_profile_id = utils.get_dict_value_or_none(
+            info, "installationProfileId"
         )
+        if installation_profile_id is not None:
+            self.__installation_profile_ids[device_id] = installation_profile_id
 
-    def get_device_status(self, device_id: str):
+        if utils.get_dict_value_or_none(info, "isOnline") is True:
+            self.__online_device_ids.add(str(device_id))
+        elif info is not None:
+            self.__online_device_ids.discard(str(device_id))
+
+        return info
+
+    def get_device_status(self, device_id: str, raise_on_error: bool = False):
         self.__check_token_validity()
 
         url = (
@@ -139,23 +192,11 @@ class ThermiaAPI:
             + device_id
             + "/status"
         )
-        request = self.__session.get(url, headers=self.__default_request_headers)
-        status = request.status_code
-
-        if status != 200:
-            _LOGGER.error(
-                "Error fetching device status. Status :"
-                + str(status)
-                + ", Response: "
-                + request.text
-            )
-            return None
-
-        return utils.get_response_json_or_log_and_raise_exception(
-            request, "Error fetching device status."
+        return self.__get_json(
+            url, "Error fetching device status.", raise_on_error=raise_on_error
         )
 
-    def get_all_alarms(self, device_id: str):
+    def get_all_alarms(self, device_id: str, raise_on_error: bool = False):
         self.__check_token_validity()
 
         url = (
@@ -164,20 +205,23 @@ class ThermiaAPI:
             + str(device_id)
             + "/events?onlyActiveAlarms=false"
         )
-        request = self.__session.get(url, headers=self.__default_request_headers)
-        status = request.status_code
+        return self.__get_json(
+            url, "Error in getting device's alarms.", raise_on_error=raise_on_error
+        )
 
-        if status != 200:
-            _LOGGER.error(
-                "Error in getting device's alarms. Status: "
-                + str(status)
-                + ", Response: "
-                + request.text
-            )
-            return None
+    def get_active_alarms(self, device_id: str, raise_on_error: bool = False):
+        self.__check_token_validity()
 
-        return utils.get_response_json_or_log_and_raise_exception(
-            request, "Error in getting device's alarms."
+        url = (
+            self.configuration["apiBaseUrl"]
+            + "/api/v1/installation/"
+            + str(device_id)
+            + "/events?onlyActiveAlarms=true"
+        )
+        return self.__get_json(
+            url,
+            "Error in getting device's active alarms.",
+            raise_on_error=raise_on_error,
         )
 
     def get_historical_data_registers(self, device_id: str):
@@ -188,21 +232,7 @@ class ThermiaAPI:
             + "/api/v1/DataHistory/installation/"
             + str(device_id)
         )
-        request = self.__session.get(url, headers=self.__default_request_headers)
-        status = request.status_code
-
-        if status != 200:
-            _LOGGER.error(
-                "Error in historical data registers. Status: "
-                + str(status)
-                + ", Response: "
-                + request.text
-            )
-            return None
-
-        return utils.get_response_json_or_log_and_raise_exception(
-            request, "Error in historical data registers."
-        )
+        return self.__get_json(url, "Error in historical data registers.")
 
     def get_historical_data(
         self, device_id: str, register_id, start_date_str, end_date_str
@@ -220,20 +250,11 @@ class ThermiaAPI:
             + "&periodEnd="
             + end_date_str
         )
-        request = self.__session.get(url, headers=self.__default_request_headers)
-        status = request.status_code
-
-        if status != 200:
-            _LOGGER.error(
-                "Error in historical data for specific register. Status: "
-                + str(status)
-                + ", Response: "
-                + request.text
-            )
-            return None
-
-        return utils.get_response_json_or_log_and_raise_exception(
-            request, "Error in historical data for specific register."
+        # Every historical data request is for a different period, there is nothing to compare against
+        return self.__get_json(
+            url,
+            "Error in historical data for specific register.",
+            detect_changes=False,
         )
 
     def get_all_available_groups(self, installation_profile_id: int):
@@ -245,56 +266,81 @@ class ThermiaAPI:
             + str(installation_profile_id)
             + "/groups"
         )
+        return self.__get_json(url, "Error in getting available groups.")
 
-        request = self.__session.get(url, headers=self.__default_request_headers)
-        status = request.status_code
-
-        if status != 200:
-            _LOGGER.error(
-                "Error in getting available groups. Status: "
-                + str(status)
-                + ", Response: "
-                + request.text
-            )
-            return None
+    def clear_response_cache(self):
+        self.__response_cache.clear()
+        self.__derived_data_cache.clear()
 
-        return utils.get_response_json_or_log_and_raise_exception(
-            request, "Error in getting available groups."
+    def get__group_temperatures(self, device_id: str, raise_on_error: bool = False):
+        return self.__get_register_group(
+            device_id, REG_GROUP_TEMPERATURES, raise_on_error
         )
 
-    def get__group_temperatures(self, device_id: str):
-        return self.__get_register_group(device_id, REG_GROUP_TEMPERATURES)
-
-    def get__group_operational_status(self, device_id: str):
-        return self.__get_register_group(device_id, REG_GROUP_OPERATIONAL_STATUS)
+    def get__group_operational_status(
+        self, device_id: str, raise_on_error: bool = False
+    ):
+        return self.__get_register_group(
+            device_id, REG_GROUP_OPERATIONAL_STATUS, raise_on_error
+        )
 
-    def get__group_operational_time(self, device_id: str):
-        return self.__get_register_group(device_id, REG_GROUP_OPERATIONAL_TIME)
+    def get__group_operational_time(self, device_id: str, raise_on_error: bool = False):
+        return self.__get_register_group(
+            device_id, REG_GROUP_OPERATIONAL_TIME, raise_on_error
+        )
 
-    def get_group_operational_operation(self, device: ThermiaHeatPump):
+    def get_group_operational_operation(
+        self, device: ThermiaHeatPump, raise_on_error: bool = False
+    ):
         return self.__get_group_operational_operation_from_register_group(
-            device, REG_GROUP_OPERATIONAL_OPERATION
+            device, REG_GROUP_OPERATIONAL_OPERATION, raise_on_error
         )
 
-    def get_group_operational_operation_from_status(self, device: ThermiaHeatPump):
+    def get_group_operational_operation_from_status(
+        self, device: ThermiaHeatPump, raise_on_error: bool = False
+    ):
         return self.__get_group_operational_operation_from_register_group(
-            device, REG_GROUP_OPERATIONAL_STATUS
+            device, REG_GROUP_OPERATIONAL_STATUS, raise_on_error
         )
 
     def __get_group_operational_operation_from_register_group(
-        self, device: ThermiaHeatPump, register_group: str
+        self, device: ThermiaHeatPump, register_group: str, raise_on_error: bool
     ):
-        register_data = self.__get_register_group(device.id, register_group)
+        if self.__is_unsupported(device.id, register_group, REG_OPERATIONMODE):
+            return None
+
+        register_data = self.__get_register_group(
+            device.id, register_group, raise_on_error
+        )
+
+        register_index, operation_mode = self.__get_derived_register_group_data(
+            device.id,
+            register_group,
+            REG_OPERATIONMODE,
+            register_data,
+            self.__parse_operation_mode_from_register_group,
+        )
+
+        if register_index is not None:
+            device.set_register_index_operation_mode(register_index)
+            self.__set_supported(device.id, register_group, REG_OPERATIONMODE)
+        elif len(register_data) > 0:
+            self.__set_unsupported(device.id, register_group, REG_OPERATIONMODE)
 
+        return operation_mode
+
+    def __parse_operation_mode_from_register_group(
+        self, register_data: list
+    ) -> Tuple[Optional[int], Optional[dict]]:
         data = [d for d in register_data if d["registerName"] == REG_OPERATIONMODE]
 
         if len(data) != 1:
             # Operation mode not supported
-            return None
+            return None, None
 
         data = data[0]
 
-        device.set_register_index_operation_mode(data["registerId"])
+        register_index = data["registerId"]
 
         current_operation_mode_value = int(data.get("registerValue"))
         operation_modes_data = data.get("valueNames")
@@ -322,15 +368,35 @@ class ThermiaAPI:
             ]
             if len(current_operation_mode) != 1:
                 # Something has gone wrong or operation mode not supported
-                return None
+                return register_index, None
 
-            return {
+            return register_index, {
                 "current": current_operation_mode[0],
                 "available": operation_modes,
                 "isReadOnly": data["isReadOnly"],
             }
 
-        return None
+        return register_index, None
+
+    def __get_derived_register_group_data(
+        self,
+        device_id: str,
+        register_group: str,
+        name: str,
+        register_data: list,
+        derive_function: Callable[[list], Any],
+    ):
+        # Unchanged register groups are returned as the same object, so derived data can be reused
+        cache_key = (device_id, register_group, name)
+        cached_data = self.__derived_data_cache.get(cache_key)
+
+        if cached_data is not None and cached_data[0] is register_data:
+            return cached_data[1]
+
+        derived_data = derive_function(register_data)
+        self.__derived_data_cache[cache_key] = (register_data, derived_data)
+
+        return derived_data
 
     def __get_switch_register_index_and_value_from_group_by_register_name(
         self, register_group: list, register_name: str
@@ -366,20 +432,51 @@ class ThermiaAPI:
             "registerValue": int(register_value),
         }
 
-    def get_group_hot_water(self, device: ThermiaHeatPump) -> Dict[str, Optional[int]]:
-        register_data: list = self.__get_register_group(device.id, REG_GROUP_HOT_WATER)
+    def get_group_hot_water(
+        self, device: ThermiaHeatPump, raise_on_error: bool = False
+    ) -> Dict[str, Optional[int]]:
+        if self.__is_unsupported(
+            device.id, REG_GROUP_HOT_WATER, REG_HOT_WATER_STATUS
+        ) and self.__is_unsupported(
+            device.id, REG_GROUP_HOT_WATER, REG__HOT_WATER_BOOST
+        ):
+            device.set_register_index_hot_water_switch(None)
+            device.set_register_index_hot_water_boost_switch(None)
+            return {"hot_water_switch": None, "hot_water_boost_switch": None}
 
-        hot_water_switch_data = (
-            self.__get_switch_register_index_and_value_from_group_by_register_name(
-                register_data, REG_HOT_WATER_STATUS
-            )
+        register_data: list = self.__get_register_group(
+            device.id, REG_GROUP_HOT_WATER, raise_on_error
         )
-        hot_water_boost_switch_data = (
-            self.__get_switch_register_index_and_value_from_group_by_register_name(
-                register_data, REG__HOT_WATER_BOOST
+
+        hot_water_switch_data, hot_water_boost_switch_data = (
+            self.__get_derived_register_group_data(
+                device.id,
+                REG_GROUP_HOT_WATER,
+                REG_HOT_WATER_STATUS,
+                register_data,
+                lambda data: (
+                    self.__get_switch_register_index_and_value_from_group_by_register_name(
+                        data, REG_HOT_WATER_STATUS
+                    ),
+                    self.__get_switch_register_index_and_value_from_group_by_register_name(
+                        data, REG__HOT_WATER_BOOST
+                    ),
+                ),
             )
         )
 
+        if len(register_data) > 0:
+            for register_name, register_id in [
+                (REG_HOT_WATER_STATUS, hot_water_switch_data["registerId"]),
+                (REG__HOT_WATER_BOOST, hot_water_boost_switch_data["registerId"]),
+            ]:
+                if register_id is not None:
+                    self.__set_supported(device.id, REG_GROUP_HOT_WATER, register_name)
+                else:
+                    self.__set_unsupported(
+                        device.id, REG_GROUP_HOT_WATER, register_name
+                    )
+
         device.set_register_index_hot_water_switch(hot_water_switch_data["registerId"])
 
         device.set_register_index_hot_water_boost_switch(
@@ -391,24 +488,24 @@ class ThermiaAPI:
             "hot_water_boost_switch": hot_water_boost_switch_data["registerValue"],
         }
 
-    def set_temperature(self, device: ThermiaHeatPump, temperature):
+    def set_temperature(self, device: ThermiaHeatPump, temperature) -> bool:
         device_temperature_register_index = device.get_register_indexes()["temperature"]
         if device_temperature_register_index is None:
             _LOGGER.error(
                 "Error setting device's temperature. No temperature register index."
             )
-            return
+            return False
 
-        self.__set_register_value(
+        return self.__set_register_value(
             device, device_temperature_register_index, temperature
         )
 
-    def set_operation_mode(self, device: ThermiaHeatPump, mode):
+    def set_operation_mode(self, device: ThermiaHeatPump, mode) -> bool:
         if device.is_operation_mode_read_only:
             _LOGGER.error(
                 "Error setting device's operation mode. Operation mode is read only."
             )
-            return
+            return False
 
         operation_mode_int = None
 
@@ -420,7 +517,7 @@ class ThermiaAPI:
             _LOGGER.error(
                 "Error setting device's operation mode. Invalid operation mode."
             )
-            return
+            return False
 
         device_operation_mode_register_index = device.get_register_indexes()[
             "operation_mode"
@@ -429,45 +526,50 @@ class ThermiaAPI:
             _LOGGER.error(
                 "Error setting device's operation mode. No operation mode register index."
             )
-            return
+            return False
 
-        self.__set_register_value(
+        return self.__set_register_value(
             device, device_operation_mode_register_index, operation_mode_int
         )
 
     def set_hot_water_switch_state(
         self, device: ThermiaHeatPump, state: int
-    ):  # 0 - off, 1 - on
+    ) -> bool:  # 0 - off, 1 - on
         register_index = device.get_register_indexes()["hot_water_switch"]
         if register_index is None:
             _LOGGER.error(
                 "Error setting device's hot water switch state. No hot water switch register index."
             )
-            return
+            return False
 
-        self.__set_register_value(device, register_index, state)
+        return self.__set_register_value(device, register_index, state)
 
     def set_hot_water_boost_switch_state(
         self, device: ThermiaHeatPump, state: int
-    ):  # 0 - off, 1 - on
+    ) -> bool:  # 0 - off, 1 - on
         register_index = device.get_register_indexes()["hot_water_boost_switch"]
         if register_index is None:
             _LOGGER.error(
                 "Error setting device's hot water boost switch state. No hot water boost switch register index."
             )
-            return
+            return False
 
-        self.__set_register_value(device, register_index, state)
+        return self.__set_register_value(device, register_index, state)
 
     def get_register_group_json(self, device_id: str, register_group: str) -> list:
         return self.__get_register_group(device_id, register_group)
 
     def set_register_value(
         self, device: ThermiaHeatPump, register_index: int, value: int
-    ):
-        self.__set_register_value(device, register_index, value)
+    ) -> bool:
+        return self.__set_register_value(device, register_index, value)
+
+    def __get_register_group(
+        self, device_id: str, register_group: str, raise_on_error: bool = False
+    ) -> list:
+        if self.__is_unsupported(device_id, register_group):
+            return []
 
-    def __get_register_group(self, device_id: str, register_group: str) -> list:
         self.__check_token_validity()
 
         url = (
@@ -477,27 +579,221 @@ class ThermiaAPI:
             + "/Groups/"
             + register_group
         )
-        request = self.__session.get(url, headers=self.__default_request_headers)
+        status, register_data = self.__get_json_and_status(
+            url,
+            "Error in getting device's register group: " + register_group + ".",
+            default=[],
+            hedge=True,
+        )
+
+        if status in UNSUPPORTED_REGISTER_GROUP_STATUSES or (
+            status == 200 and register_data == []
+        ):
+            if not self.__is_supported(device_id, register_group):
+                self.__set_unsupported(device_id, register_group)
+            elif raise_on_error:
+                # Group returned data before, so the response is a temporary error
+                raise NetworkException(
+                    "Error in getting device's register group: "
+                    + register_group
+                    + ". No data returned.",
+                    status,
+                )
+        elif status == 200:
+            self.__set_supported(device_id, register_group)
+        elif status not in [200, 304] and raise_on_error:
+            raise NetworkException(
+                "Error in getting device's register group: " + register_group + ".",
+                status,
+            )
+
+        return register_data
+
+    def __is_unsupported(
+        self, device_id: str, register_group: str, register_name: Optional[str] = None
+    ) -> bool:
+        installation_profile_id = self.__installation_profile_ids.get(str(device_id))
+
+        if installation_profile_id is None:
+            return False
+
+        unsupported_response_count = self.__installation_profile_cache.get(
+            installation_profile_id,
+            self.__get_unsupported_data_key(register_group, register_name),
+            self.__unsupported_data_ttl,
+        )
+
+        return (
+            isinstance(unsupported_response_count, int)
+            and unsupported_response_count >= UNSUPPORTED_DATA_MIN_RESPONSES
+        )
+
+    def __set_unsupported(
+        self, device_id: str, register_group: str, register_name: Optional[str] = None
+    ):
+        installation_profile_id = self.__installation_profile_ids.get(str(device_id))
+
+        # Offline heat pumps return empty register groups, their responses are not trusted
+        if (
+            installation_profile_id is None
+            or str(device_id) not in self.__online_device_ids
+            or self.__is_supported(device_id, register_group, register_name)
+        ):
+            return
+
+        unsupported_data_key = self.__get_unsupported_data_key(
+            register_group, register_name
+        )
+        unsupported_response_count = self.__installation_profile_cache.get(
+            installation_profile_id, unsupported_data_key, self.__unsupported_data_ttl
+        )
+        if not isinstance(unsupported_response_count, int):
+            unsupported_response_count = 0
+
+        if unsupported_response_count + 1 == UNSUPPORTED_DATA_MIN_RESPONSES:
+            _LOGGER.debug(
+                "Installation profile "
+                + str(installation_profile_id)
+                + " does not support "
+                + register_group
+                + ("/" + register_name if register_name is not None else "")
+            )
+
+        self.__installation_profile_cache.set(
+            installation_profile_id,
+            unsupported_data_key,
+            unsupported_response_count + 1,
+        )
+
+    def __is_supported(
+        self, device_id: str, register_group: str, register_name: Optional[str] = None
+    ) -> bool:
+        installation_profile_id = self.__installation_profile_ids.get(str(device_id))
+
+        if installation_profile_id is None:
+            return False
+
+        # Data returned once is never cached as unsupported
+        return (
+            self.__installation_profile_cache.get(
+                installation_profile_id,
+                self.__get_supported_data_key(register_group, register_name),
+                timedelta.max,
+            )
+            is True
+        )
+
+    def __set_supported(
+        self, device_id: str, register_group: str, register_name: Optional[str] = None
+    ):
+        installation_profile_id = self.__installation_profile_ids.get(str(device_id))
+
+        if installation_profile_id is None or self.__is_supported(
+            device_id, register_group, register_name
+        ):
+            return
+
+        self.__installation_profile_cache.set(
+            installation_profile_id,
+            self.__get_supported_data_key(register_group, register_name),
+            True,
+        )
+        self.__installation_profile_cache.set(
+            installation_profile_id,
+            self.__get_unsupported_data_key(register_group, register_name),
+            0,
+        )
+
+    def __get_supported_data_key(
+        self, register_group: str, register_name: Optional[str]
+    ) -> str:
+        key = "supported:" + register_group
+        return key if register_name is None else key + ":" + register_name
+
+    def __get_unsupported_data_key(
+        self, register_group: str, register_name: Optional[str]
+    ) -> str:
+        key = "unsupported:" + register_group
+        return key if register_name is None else key + ":" + register_name
+
+    def __get_json(
+        self,
+        url: str,
+        error_message: str,
+        default=None,
+        detect_changes=True,
+        raise_on_error=False,
+    ):
+        status, data = self.__get_json_and_status(
+            url, error_message, default, detect_changes
+        )
+
+        if status not in [200, 304] and raise_on_error:
+            raise NetworkException(error_message, status)
+
+        return data
+
+    def __get_json_and_status(
+        self,
+        url: str,
+        error_message: str,
+        default=None,
+        detect_changes=True,
+        hedge=False,
+    ) -> Tuple[int, Any]:
+        headers = self.__default_request_headers
+
+        cached_response = self.__response_cache.get(url) if detect_changes else None
+        if cached_response is not None and cached_response["etag"] is not None:
+            headers = {**headers, "If-None-Match": cached_response["etag"]}
+
+        if hedge and self.__hedging_policy is not None:
+            request = self.__hedging_policy.run(
+                lambda: self.__session.get(url, headers=headers)
+            )
+        else:
+            request = self.__session.get(url, headers=headers)
         status = request.status_code
 
+        if status == 304 and cached_response is not None:
+            return status, cached_response["data"]
+
         if status != 200:
             _LOGGER.error(
-                "Error in getting device's register group: "
-                + register_group
-                + ", Status: "
+                error_message
+                + " Status: "
                 + str(status)
                 + ", Response: "
                 + request.text
             )
-            return []
+            return status, default
 
-        return utils.get_response_json_or_log_and_raise_exception(
-            request, "Error in getting device's register group: " + register_group
+        if not detect_changes:
+            return status, utils.get_response_json_or_log_and_raise_exception(
+                request, error_message
+            )
+
+        # Most responses are byte-for-byte identical between updates, reuse already parsed data
+        response_hash = hashlib.blake2b(request.content, digest_size=16).digest()
+
+        if cached_response is not None and cached_response["hash"] == response_hash:
+            return status, cached_response["data"]
+
+        data = utils.get_response_json_or_log_and_raise_exception(
+            request, error_message
         )
 
+        self.__response_cache[url] = {
+            "hash": response_hash,
+            "etag": request.headers.get("ETag"),
+            "data": data,
+        }
+
+        return status, data
+
     def __set_register_value(
         self, device: ThermiaHeatPump, register_index: int, register_value: int
-    ):
+    ) -> bool:
         self.__check_token_validity()
 
         url = (
@@ -516,6 +812,9 @@ class ThermiaAPI:
             url, headers=self.__default_request_headers, json=body
         )
 
+        # Register values have changed, all responses must be parsed again
+        self.clear_response_cache()
+
         status = request.status_code
         if status != 200:
             _LOGGER.error(
@@ -526,6 +825,9 @@ class ThermiaAPI:
                 + ", Response: "
                 + request.text
             )
+            return False
+
+        return True
 
     def __fetch_configuration(self):
         request = self.__session.get(THERMIA_CONFIG_URL)
@@ -748,11 +1050,13 @@ class ThermiaAPI:
         return True
 
     def __check_token_validity(self):
-        if (
-            self.__token_valid_to is None
-            or self.__token_valid_to < datetime.now().timestamp()
-            or self.__refresh_token_valid_to is None
-            or self.__refresh_token_valid_to < datetime.now().timestamp()
-        ):
-            _LOGGER.info("Token expired, re-authenticating.")
-            self.authenticated = self.__authenticate()
+        # Requests can be made from multiple threads, only one of them should re-authenticate
+        with self.__authentication_lock:
+            if (
+                self.__token_valid_to is None
+                or self.__token_valid_to < datetime.now().timestamp()
+                or self.__refresh_token_valid_to is None
+                or self.__refresh_token_valid_to < datetime.now().timestamp()
+            ):
+                _LOGGER.info("Token expired, re-authenticating.")
+                self.authenticated = self.__authenticate()
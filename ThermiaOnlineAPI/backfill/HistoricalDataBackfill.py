@@ -0,0 +1,293 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+import logging
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, List, NamedTuple, Optional, Set
+
+from ..const import (
+    DATETIME_FORMAT,
+    HISTORICAL_DATA_CHUNK_SIZE,
+    HISTORICAL_DATA_MAX_PARALLEL_REQUESTS,
+    HISTORICAL_DATA_STORE_SETTLE_TIME,
+)
+from ..model.HistoricalData import HistoricalDataColumns
+from ..utils.historical_data import (
+    datetime_to_timestamp,
+    plan_time_chunks,
+    timestamp_to_datetime,
+)
+
+if TYPE_CHECKING:
+    from ..api.ThermiaAPI import ThermiaAPI
+    from ..store.HistoricalDataStore import HistoricalDataStore
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class BackfillWorkUnit(NamedTuple):
+    device_id: str
+    register_name: str
+    register_id: int
+    start: int
+    end: int
+
+    @property
+    def key(self) -> str:
+        return (
+            self.device_id
+            + "/"
+            + str(self.register_id)
+            + "/"
+            + str(self.start)
+            + "/"
+            + str(self.end)
+        )
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces calls to acquire() evenly, at most
+    max_requests_per_second per second.
+    """
+
+    def __init__(self, max_requests_per_second: Optional[float]):
+        self.__interval = (
+            1 / max_requests_per_second if max_requests_per_second else 0.0
+        )
+        self.__next_request_time = time.monotonic()
+        self.__lock = threading.Lock()
+
+    def acquire(self):
+        if self.__interval == 0:
+            return
+
+        with self.__lock:
+            now = time.monotonic()
+            request_time = max(now, self.__next_request_time)
+            self.__next_request_time = request_time + self.__interval
+
+        if request_time > now:
+            time.sleep(request_time - now)
+
+
+class HistoricalDataBackfill:
+    """
+    Backfills historical data of many heat pumps and registers.
+
+    Work is split into units per heat pump, register and time chunk, that
+    are fetched with bounded parallelism and rate limiting. Completed units
+    are appended to the checkpoint file, so a run that was interrupted
+    continues with the remaining units when started again with the same
+    arguments. Fetched data is passed to on_data and/or saved to
+    historical_data_store.
+    """
+
+    def __init__(
+        self,
+        api_interface: "ThermiaAPI",
+        checkpoint_file_path: str,
+        on_data: Optional[
+            Callable[[BackfillWorkUnit, HistoricalDataColumns], None]
+        ] = None,
+        historical_data_store: Optional["HistoricalDataStore"] = None,
+        chunk_size: timedelta = HISTORICAL_DATA_CHUNK_SIZE,
+        max_parallel_requests: int = HISTORICAL_DATA_MAX_PARALLEL_REQUESTS,
+        max_requests_per_second: Optional[float] = 2.0,
+        max_attempts: int = 3,
+        retry_delay: float = 5.0,
+    ):
+        self.__api_interface = api_interface
+        self.__checkpoint_file_path = checkpoint_file_path
+        self.__on_data = on_data
+        self.__historical_data_store = historical_data_store
+        self.__chunk_size = chunk_size
+        self.__max_parallel_requests = max_parallel_requests
+        self.__rate_limiter = RateLimiter(max_requests_per_second)
+        self.__max_attempts = max_attempts
+        self.__retry_delay = retry_delay
+
+        self.__checkpoint_lock = threading.Lock()
+
+    def plan(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        device_ids: Optional[List[str]] = None,
+        register_names: Optional[List[str]] = None,
+    ) -> List[BackfillWorkUnit]:
+        if device_ids is None:
+            device_ids = [
+                str(device["id"]) for device in self.__api_interface.get_devices()
+            ]
+
+        chunks = plan_time_chunks(start_date, end_date, self.__chunk_size)
+
+        work_units = []
+
+        for device_id in device_ids:
+            registers = self.__get_historical_data_registers(device_id)
+
+            for register_name, register_id in registers.items():
+                if register_names is not None and register_name not in register_names:
+                    continue
+
+                for index, (chunk_start, chunk_end) in enumerate(chunks):
+                    end = datetime_to_timestamp(chunk_end)
+                    if index < len(chunks) - 1:
+                        # Period ends are inclusive, so chunks must not overlap
+                        end -= 1
+
+                    work_units.append(
+                        BackfillWorkUnit(
+                            device_id,
+                            register_name,
+                            register_id,
+                            datetime_to_timestamp(chunk_start),
+                            end,
+                        )
+                    )
+
+        return work_units
+
+    def run(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        device_ids: Optional[List[str]] = None,
+        register_names: Optional[List[str]] = None,
+    ) -> Dict[str, int]:
+        """
+        Run all work units that are not completed yet. Work units that fail
+        to fetch data are counted as failed, while errors of on_data or the
+        store cancel the work units that have not started and are raised.
+        """
+        work_units = self.plan(start_date, end_date, device_ids, register_names)
+        completed_keys = self.__load_completed_keys()
+
+        pending_work_units = [
+            work_unit for work_unit in work_units if work_unit.key not in completed_keys
+        ]
+
+        _LOGGER.info(
+            "Backfill of "
+            + str(len(work_units))
+            + " work units, "
+            + str(len(work_units) - len(pending_work_units))
+            + " already completed"
+        )
+
+        failed_count = 0
+
+        with ThreadPoolExecutor(max_workers=self.__max_parallel_requests) as executor:
+            futures = [
+                executor.submit(self.__run_work_unit, work_unit)
+                for work_unit in pending_work_units
+            ]
+            try:
+                for future in as_completed(futures):
+                    if not future.result():
+                        failed_count += 1
+            except BaseException:
+                # Cancelled work units are not completed, so the next run continues with them
+                executor.shutdown(cancel_futures=True)
+                raise
+
+        return {
+            "total": len(work_units),
+            "skipped": len(work_units) - len(pending_work_units),
+            "completed": len(pending_work_units) - failed_count,
+            "failed": failed_count,
+        }
+
+    def __get_historical_data_registers(self, device_id: str) -> Dict[str, int]:
+        data = self.__api_interface.get_historical_data_registers(device_id)
+
+        if data is None or data.get("registers") is None:
+            return {}
+
+        return {
+            register["registerName"]: register["registerId"]
+            for register in data["registers"]
+        }
+
+    def __run_work_unit(self, work_unit: BackfillWorkUnit) -> bool:
+        for attempt in range(self.__max_attempts):
+            if attempt > 0:
+                time.sleep(self.__retry_delay * 2 ** (attempt - 1))
+
+            self.__rate_limiter.acquire()
+
+            try:
+                historical_data = self.__api_interface.get_historical_data(
+                    work_unit.device_id,
+                    work_unit.register_id,
+                    timestamp_to_datetime(work_unit.start).strftime(DATETIME_FORMAT),
+                    timestamp_to_datetime(work_unit.end).strftime(DATETIME_FORMAT),
+                )
+            except Exception as e:
+                _LOGGER.warning(
+                    "Error in backfill work unit " + work_unit.key + ": " + str(e)
+                )
+                continue
+
+            if historical_data is None:
+                continue
+
+            columns = HistoricalDataColumns.from_entries(
+                historical_data.get("data") or []
+            )
+
+            # The most recent data might not be available yet, so it is never marked as fetched
+            settled_timestamp = datetime_to_timestamp(
+                datetime.now() - HISTORICAL_DATA_STORE_SETTLE_TIME
+            )
+
+            self.__save_work_unit_data(work_unit, columns, settled_timestamp)
+            if work_unit.end <= settled_timestamp:
+                self.__mark_completed(work_unit)
+
+            return True
+
+        _LOGGER.error(
+            "Backfill work unit "
+            + work_unit.key
+            + " failed after "
+            + str(self.__max_attempts)
+            + " attempts"
+        )
+
+        return False
+
+    def __save_work_unit_data(
+        self,
+        work_unit: BackfillWorkUnit,
+        columns: HistoricalDataColumns,
+        settled_timestamp: int,
+    ):
+        if self.__historical_data_store is not None:
+            self.__historical_data_store.add_data(
+                work_unit.device_id,
+                work_unit.register_id,
+                work_unit.start,
+                min(work_unit.end, settled_timestamp),
+                list(zip(columns.timestamps.tolist(), columns.values.tolist())),
+            )
+
+        if self.__on_data is not None:
+            self.__on_data(work_unit, columns)
+
+    def __load_completed_keys(self) -> Set[str]:
+        if not os.path.exists(self.__checkpoint_file_path):
+            return set()
+
+        with open(self.__checkpoint_file_path, "r") as checkpoint_file:
+            # Last line might be incomplete if the previous run crashed while writing it
+            return {line[:-1] for line in checkpoint_file if line.endswith("\n")}
+
+    def __mark_completed(self, work_unit: BackfillWorkUnit):
+        # Checkpoint is append-only, so saving progress does not depend on its size
+        with self.__checkpoint_lock:
+            with open(self.__checkpoint_file_path, "a") as checkpoint_file:
+                checkpoint_file.write(work_unit.key + "\n")
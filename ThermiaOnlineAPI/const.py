@@ -1,3 +1,5 @@
+from datetime import timedelta
+
 ###############################################################################
 # General configuration
 ###############################################################################
@@ -103,3 +105,59 @@ REG_OPER_TIME_HOT_WATER = "REG_OPER_TIME_HOT_WATER"
 ###############################################################################
 
 DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+# Version of Thermia.to_state() format
+STATE_VERSION = 1
+
+# Version of the shared snapshot store record layout
+SHARED_SNAPSHOT_VERSION = 1
+
+###############################################################################
+# Historical data
+###############################################################################
+
+HISTORICAL_DATA_CHUNK_SIZE = timedelta(days=1)
+HISTORICAL_DATA_MAX_PARALLEL_REQUESTS = 4
+HISTORICAL_DATA_ROLLUP_BUCKET_SIZE = timedelta(hours=1)
+# Data newer than this might still be missing on the server, so it is refetched
+HISTORICAL_DATA_STORE_SETTLE_TIME = timedelta(hours=1)
+
+###############################################################################
+# Installation profile cache
+###############################################################################
+
+INSTALLATION_PROFILE_CACHE_TTL = timedelta(days=7)
+# Register groups and registers that a model does not support are not requested again for this long
+UNSUPPORTED_DATA_CACHE_TTL = timedelta(days=1)
+# Consistent unsupported responses of online heat pumps needed before data is cached as unsupported
+UNSUPPORTED_DATA_MIN_RESPONSES = 3
+
+###############################################################################
+# Polling
+###############################################################################
+
+DEFAULT_POLLING_INTERVAL = timedelta(minutes=1)
+# Back-off of update_data() for offline heat pumps
+OFFLINE_POLLING_MIN_INTERVAL = timedelta(minutes=1)
+OFFLINE_POLLING_MAX_INTERVAL = timedelta(minutes=30)
+# Active alarms are fetched on every update, full event history less often
+ALARM_HISTORY_SYNC_INTERVAL = timedelta(hours=1)
+ADAPTIVE_POLLING_MIN_INTERVAL = timedelta(minutes=1)
+ADAPTIVE_POLLING_MAX_INTERVAL = timedelta(minutes=15)
+# Temperature change in degrees per minute above which the heat pump is polled at the minimum interval
+ADAPTIVE_POLLING_RATE_OF_CHANGE_THRESHOLD = 0.2
+# Operational statuses that do not mean the heat pump is actively running
+IDLE_OPERATIONAL_STATUSES = [
+    "STANDBY",
+    "NO_DEMAND",
+    "STATUS_STANDBY",
+    "STATUS_NO_DEMAND",
+    "OFF",
+]
+
+###############################################################################
+# Server
+###############################################################################
+
+DEFAULT_SERVER_HOST = "127.0.0.1"
+DEFAULT_SERVER_PORT = 8765
@@ -0,0 +1,283 @@
+from bisect import bisect_right
+from datetime import datetime, timedelta
+import logging
+import os
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from .ExportWriter import (
+    ExportWriter,
+    create_export_writer,
+    get_default_export_format,
+)
+from ..const import HISTORICAL_DATA_CHUNK_SIZE, HISTORICAL_DATA_STORE_SETTLE_TIME
+from ..model.HeatPump import SNAPSHOT_PROPERTIES, ThermiaHeatPump
+from ..utils.historical_data import datetime_to_timestamp, timestamp_to_datetime
+from ..utils.utils import load_json_file, save_json_file
+
+if TYPE_CHECKING:
+    from .. import Thermia
+
+_LOGGER = logging.getLogger(__name__)
+
+HISTORICAL_DATA_COLUMN_TYPES: Dict[str, type] = {
+    "device_id": str,
+    "register": str,
+    "timestamp": int,
+    "value": float,
+}
+
+SNAPSHOT_COLUMN_TYPES: Dict[str, type] = {
+    "timestamp": int,
+    "id": str,
+    "name": str,
+    "is_online": bool,
+    "is_data_stale": bool,
+    "last_online": str,
+    "model": str,
+    "model_id": str,
+    "is_hot_water_active": bool,
+    "running_operational_statuses": str,
+    "running_power_statuses": str,
+    "operation_mode": str,
+    "hot_water_switch_state": int,
+    "hot_water_boost_switch_state": int,
+    "active_alarm_count": int,
+    "active_alarms": str,
+}
+
+
+class DataExporter:
+    """
+    Exports historical data and live snapshots of all heat pumps into files
+    in output_directory:
+
+    - historical/<heat pump id>/<register name>/<first timestamp>-<last timestamp>.<format>
+    - snapshots/<first timestamp>.<format>
+
+    Parquet and Arrow IPC formats require pyarrow, CSV and JSON lines are
+    always available. Export progress of historical data is saved to
+    checkpoint.json after every completed file, so an interrupted export
+    continues where it stopped.
+    """
+
+    def __init__(
+        self,
+        output_directory: str,
+        export_format: Optional[str] = None,
+        row_group_size: int = 10000,
+        max_rows_per_file: int = 1000000,
+    ):
+        self.__output_directory = output_directory
+        self.__export_format = export_format or get_default_export_format()
+        self.__row_group_size = row_group_size
+        self.__max_rows_per_file = max_rows_per_file
+
+        self.__checkpoint_file_path = os.path.join(output_directory, "checkpoint.json")
+        self.__checkpoint: Dict[str, Dict[str, int]] = load_json_file(
+            self.__checkpoint_file_path, {}
+        )
+
+        self.__snapshot_writer: Optional[ExportWriter] = None
+
+    def get_checkpoint(self, device_id: str, register_name: str) -> Optional[int]:
+        checkpoint = self.__checkpoint.get(device_id, {}).get(register_name)
+
+        # Completed files are named by their range, they are the source of truth
+        # if the export stopped after a file was completed but before the checkpoint was saved
+        directory = self.__get_historical_data_directory(device_id, register_name)
+        if os.path.isdir(directory):
+            for file_name in os.listdir(directory):
+                file_range = file_name.split(".")[0].split("-")
+                if len(file_range) == 2 and file_name.endswith(self.__export_format):
+                    checkpoint = max(checkpoint or 0, int(file_range[1]))
+
+        return checkpoint
+
+    def export_historical_data(
+        self,
+        thermia: "Thermia",
+        start_date: datetime,
+        end_date: datetime,
+        register_names: Optional[List[str]] = None,
+        chunk_size: Optional[timedelta] = HISTORICAL_DATA_CHUNK_SIZE,
+    ):
+        for heat_pump in thermia.heat_pumps:
+            for register_name in register_names or heat_pump.historical_data_registers:
+                self.export_historical_data_for_register(
+                    heat_pump, register_name, start_date, end_date, chunk_size
+                )
+
+    def export_historical_data_for_register(
+        self,
+        heat_pump: ThermiaHeatPump,
+        register_name: str,
+        start_date: datetime,
+        end_date: datetime,
+        chunk_size: Optional[timedelta] = HISTORICAL_DATA_CHUNK_SIZE,
+    ):
+        # The most recent data might not be available yet, so it is exported next time
+        end_date = min(end_date, datetime.now() - HISTORICAL_DATA_STORE_SETTLE_TIME)
+
+        checkpoint = self.get_checkpoint(heat_pump.id, register_name)
+
+        if checkpoint is not None:
+            start_date = max(start_date, timestamp_to_datetime(checkpoint + 1))
+
+        if start_date >= end_date:
+            return
+
+        writer: Optional[ExportWriter] = None
+        last_timestamp = None
+
+        try:
+            for historical_data in heat_pump.iter_historical_data_batches_for_register(
+                register_name,
+                start_date,
+                end_date,
+                chunk_size,
+                skip_failed_chunks=False,
+            ):
+                timestamps = historical_data.timestamps.tolist()
+                values = historical_data.values.tolist()
+
+                if checkpoint is not None:
+                    first_index = bisect_right(timestamps, checkpoint)
+                    timestamps = timestamps[first_index:]
+                    values = values[first_index:]
+
+                if len(timestamps) == 0:
+                    continue
+
+                if writer is None:
+                    writer = self.__create_historical_data_writer(
+                        heat_pump.id, register_name, timestamps[0]
+                    )
+
+                writer.write_columns(
+                    {
+                        "device_id": [heat_pump.id] * len(timestamps),
+                        "register": [register_name] * len(timestamps),
+                        "timestamp": timestamps,
+                        "value": values,
+                    }
+                )
+                last_timestamp = timestamps[-1]
+
+                if writer.row_count >= self.__max_rows_per_file:
+                    self.__close_historical_data_writer(
+                        writer, heat_pump.id, register_name, last_timestamp
+                    )
+                    writer = None
+        except Exception:
+            # Rows after the checkpoint are exported again next time
+            if writer is not None:
+                writer.discard()
+            raise
+
+        if writer is not None:
+            self.__close_historical_data_writer(
+                writer, heat_pump.id, register_name, last_timestamp
+            )
+
+        self.__set_checkpoint(
+            heat_pump.id, register_name, datetime_to_timestamp(end_date)
+        )
+
+    def export_snapshots(self, thermia: "Thermia", now: Optional[datetime] = None):
+        """
+        Append current data of all heat pumps to the snapshot file. Call this
+        periodically, after update_data(), and call close() at the end.
+        """
+        timestamp = datetime_to_timestamp(now or datetime.now())
+        snapshots = [heat_pump.snapshot() for heat_pump in thermia.heat_pumps]
+
+        if len(snapshots) == 0:
+            return
+
+        if self.__snapshot_writer is None:
+            self.__snapshot_writer = self.__create_writer(
+                os.path.join(self.__output_directory, "snapshots"),
+                str(timestamp),
+                {
+                    **{name: float for name in SNAPSHOT_PROPERTIES},
+                    **SNAPSHOT_COLUMN_TYPES,
+                },
+            )
+
+        columns: Dict[str, List[Any]] = {"timestamp": [timestamp] * len(snapshots)}
+        for property_name in SNAPSHOT_PROPERTIES:
+            columns[property_name] = [
+                self.__to_export_value(snapshot[property_name])
+                for snapshot in snapshots
+            ]
+
+        self.__snapshot_writer.write_columns(columns)
+
+        if self.__snapshot_writer.row_count >= self.__max_rows_per_file:
+            self.__snapshot_writer.close()
+            self.__snapshot_writer = None
+
+    def close(self):
+        if self.__snapshot_writer is not None:
+            self.__snapshot_writer.close()
+            self.__snapshot_writer = None
+
+    def __create_writer(
+        self, directory: str, file_name: str, column_types: Dict[str, type]
+    ) -> ExportWriter:
+        os.makedirs(directory, exist_ok=True)
+
+        return create_export_writer(
+            self.__export_format,
+            os.path.join(directory, file_name + "." + self.__export_format),
+            self.__row_group_size,
+            column_types,
+        )
+
+    def __get_historical_data_directory(
+        self, device_id: str, register_name: str
+    ) -> str:
+        return os.path.join(
+            self.__output_directory, "historical", device_id, register_name
+        )
+
+    def __create_historical_data_writer(
+        self, device_id: str, register_name: str, first_timestamp: int
+    ) -> ExportWriter:
+        return self.__create_writer(
+            self.__get_historical_data_directory(device_id, register_name),
+            str(first_timestamp),
+            HISTORICAL_DATA_COLUMN_TYPES,
+        )
+
+    def __close_historical_data_writer(
+        self,
+        writer: ExportWriter,
+        device_id: str,
+        register_name: str,
+        last_timestamp: int,
+    ):
+        # File name contains the whole exported range once the file is complete
+        first_timestamp = os.path.basename(writer.file_path).split(".")[0]
+        writer.close(
+            os.path.join(
+                os.path.dirname(writer.file_path),
+                first_timestamp
+                + "-"
+                + str(last_timestamp)
+                + "."
+                + self.__export_format,
+            )
+        )
+
+        self.__set_checkpoint(device_id, register_name, last_timestamp)
+
+    def __set_checkpoint(self, device_id: str, register_name: str, timestamp: int):
+        self.__checkpoint.setdefault(device_id, {})[register_name] = timestamp
+        save_json_file(self.__checkpoint_file_path, self.__checkpoint)
+
+    def __to_export_value(self, value):
+        if isinstance(value, list):
+            return ",".join(str(item) for item in value)
+
+        return value
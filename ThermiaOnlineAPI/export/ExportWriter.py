@@ -0,0 +1,254 @@
+from abc import ABC, abstractmethod
+import csv
+import json
+import os
+from typing import Dict, List, Optional, Sequence
+
+from ..utils.utils import get_dict_value_or_none
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # pyarrow is an optional dependency
+    pyarrow = None
+
+EXPORT_FORMAT_PARQUET = "parquet"
+EXPORT_FORMAT_ARROW = "arrow"
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_JSON_LINES = "jsonl"
+
+EXPORT_FORMATS = [
+    EXPORT_FORMAT_PARQUET,
+    EXPORT_FORMAT_ARROW,
+    EXPORT_FORMAT_CSV,
+    EXPORT_FORMAT_JSON_LINES,
+]
+
+
+def get_default_export_format() -> str:
+    return EXPORT_FORMAT_PARQUET if pyarrow is not None else EXPORT_FORMAT_CSV
+
+
+class ExportWriter(ABC):
+    """
+    Streaming writer that buffers columnar batches and writes them out in
+    row groups of row_group_size rows.
+
+    Data is written to a temporary file that is renamed to file_path on
+    close, so a file at file_path is always complete.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        row_group_size: int,
+        column_types: Optional[Dict[str, type]] = None,
+    ):
+        self.file_path = file_path
+        self.row_count = 0
+
+        self._temporary_file_path = file_path + ".tmp"
+        self._column_types = column_types or {}
+        self.__row_group_size = row_group_size
+        self.__buffer: Dict[str, List] = {}
+        self.__buffered_row_count = 0
+
+    def write_columns(self, columns: Dict[str, Sequence]):
+        row_count = len(next(iter(columns.values()), []))
+
+        if row_count == 0:
+            return
+
+        for column_name, values in columns.items():
+            self.__buffer.setdefault(column_name, []).extend(values)
+
+        self.__buffered_row_count += row_count
+        self.row_count += row_count
+
+        if self.__buffered_row_count >= self.__row_group_size:
+            self.__flush()
+
+    def close(self, file_path: Optional[str] = None):
+        """
+        Flush remaining rows and move the file to file_path, if it is given,
+        otherwise to the file path the writer was created with.
+        """
+        self.__flush()
+        self._close_file()
+
+        if file_path is not None:
+            self.file_path = file_path
+
+        if os.path.exists(self._temporary_file_path):
+            os.replace(self._temporary_file_path, self.file_path)
+
+    def discard(self):
+        """Close the writer without keeping any of the written rows."""
+        self.__buffer = {}
+        self.__buffered_row_count = 0
+        self._close_file()
+
+        if os.path.exists(self._temporary_file_path):
+            os.remove(self._temporary_file_path)
+
+    def __flush(self):
+        if self.__buffered_row_count == 0:
+            return
+
+        self._write_row_group(self.__buffer)
+
+        self.__buffer = {}
+        self.__buffered_row_count = 0
+
+    @abstractmethod
+    def _write_row_group(self, columns: Dict[str, List]):
+        pass
+
+    @abstractmethod
+    def _close_file(self):
+        pass
+
+
+class CsvExportWriter(ExportWriter):
+    def __init__(
+        self,
+        file_path: str,
+        row_group_size: int,
+        column_types: Optional[Dict[str, type]] = None,
+    ):
+        super().__init__(file_path, row_group_size, column_types)
+        self.__file = None
+        self.__writer = None
+
+    def _write_row_group(self, columns: Dict[str, List]):
+        if self.__file is None:
+            self.__file = open(self._temporary_file_path, "w", newline="")
+            self.__writer = csv.writer(self.__file)
+            self.__writer.writerow(columns.keys())
+
+        self.__writer.writerows(zip(*columns.values()))
+
+    def _close_file(self):
+        if self.__file is not None:
+            self.__file.close()
+
+
+class JsonLinesExportWriter(ExportWriter):
+    def __init__(
+        self,
+        file_path: str,
+        row_group_size: int,
+        column_types: Optional[Dict[str, type]] = None,
+    ):
+        super().__init__(file_path, row_group_size, column_types)
+        self.__file = None
+
+    def _write_row_group(self, columns: Dict[str, List]):
+        if self.__file is None:
+            self.__file = open(self._temporary_file_path, "w")
+
+        column_names = list(columns.keys())
+        self.__file.writelines(
+            json.dumps(dict(zip(column_names, row))) + "\n"
+            for row in zip(*columns.values())
+        )
+
+    def _close_file(self):
+        if self.__file is not None:
+            self.__file.close()
+
+
+def create_arrow_table(columns: Dict[str, List], column_types: Dict[str, type]):
+    # Types are set explicitly, as a column with only None values can not be inferred
+    arrow_types = {
+        bool: pyarrow.bool_(),
+        int: pyarrow.int64(),
+        float: pyarrow.float64(),
+        str: pyarrow.string(),
+    }
+
+    return pyarrow.table(
+        {
+            column_name: pyarrow.array(
+                values,
+                type=get_dict_value_or_none(arrow_types, column_types.get(column_name)),
+            )
+            for column_name, values in columns.items()
+        }
+    )
+
+
+class ParquetExportWriter(ExportWriter):
+    def __init__(
+        self,
+        file_path: str,
+        row_group_size: int,
+        column_types: Optional[Dict[str, type]] = None,
+    ):
+        super().__init__(file_path, row_group_size, column_types)
+        self.__writer = None
+
+    def _write_row_group(self, columns: Dict[str, List]):
+        table = create_arrow_table(columns, self._column_types)
+
+        if self.__writer is None:
+            self.__writer = pyarrow.parquet.ParquetWriter(
+                self._temporary_file_path, table.schema
+            )
+
+        self.__writer.write_table(table)
+
+    def _close_file(self):
+        if self.__writer is not None:
+            self.__writer.close()
+
+
+class ArrowExportWriter(ExportWriter):
+    def __init__(
+        self,
+        file_path: str,
+        row_group_size: int,
+        column_types: Optional[Dict[str, type]] = None,
+    ):
+        super().__init__(file_path, row_group_size, column_types)
+        self.__writer = None
+
+    def _write_row_group(self, columns: Dict[str, List]):
+        table = create_arrow_table(columns, self._column_types)
+
+        if self.__writer is None:
+            self.__writer = pyarrow.ipc.new_file(
+                self._temporary_file_path, table.schema
+            )
+
+        self.__writer.write_table(table)
+
+    def _close_file(self):
+        if self.__writer is not None:
+            self.__writer.close()
+
+
+def create_export_writer(
+    export_format: str,
+    file_path: str,
+    row_group_size: int,
+    column_types: Optional[Dict[str, type]] = None,
+) -> ExportWriter:
+    if (
+        export_format in [EXPORT_FORMAT_PARQUET, EXPORT_FORMAT_ARROW]
+        and pyarrow is None
+    ):
+        raise ValueError("pyarrow is required for " + export_format + " export")
+
+    writer_classes = {
+        EXPORT_FORMAT_PARQUET: ParquetExportWriter,
+        EXPORT_FORMAT_ARROW: ArrowExportWriter,
+        EXPORT_FORMAT_CSV: CsvExportWriter,
+        EXPORT_FORMAT_JSON_LINES: JsonLinesExportWriter,
+    }
+
+    if export_format not in writer_classes:
+        raise ValueError("Unsupported export format: " + str(export_format))
+
+    return writer_classes[export_format](file_path, row_group_size, column_types)
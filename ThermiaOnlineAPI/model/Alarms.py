@@ -0,0 +1,56 @@
+from typing import Any, Dict, List, Optional
+
+from ..utils.utils import get_dict_value_or_default, get_dict_value_or_none
+
+
+class AlarmIndex:
+    """
+    Local index of heat pump events by id. Active alarms are updated from
+    the active alarms endpoint on every update, while the full event history
+    is synced separately at a slower interval.
+    """
+
+    def __init__(self):
+        self.__events_by_id: Dict[Any, dict] = {}
+        self.__active_alarms: List[dict] = []
+        self.__active_alarm_titles: List[str] = []
+
+    def update_active_alarms(self, alarms: List[dict]) -> None:
+        self.__active_alarms = [
+            alarm
+            for alarm in alarms
+            if get_dict_value_or_default(alarm, "isActiveAlarm", False) is True
+        ]
+        self.__active_alarm_titles = [
+            alarm.get("eventTitle") for alarm in self.__active_alarms
+        ]
+        self.__add_events(alarms)
+
+    def update_events(self, events: List[dict]) -> None:
+        self.__add_events(events)
+
+    def get_event(self, event_id) -> Optional[dict]:
+        return self.__events_by_id.get(event_id)
+
+    @property
+    def events(self) -> List[dict]:
+        return list(self.__events_by_id.values())
+
+    @property
+    def active_alarms(self) -> List[dict]:
+        return self.__active_alarms
+
+    @property
+    def active_alarm_titles(self) -> List[str]:
+        return self.__active_alarm_titles
+
+    @property
+    def active_alarm_count(self) -> int:
+        return len(self.__active_alarms)
+
+    def __add_events(self, events: List[dict]) -> None:
+        for event in events:
+            event_id = get_dict_value_or_none(event, "id")
+
+            if event_id is not None:
+                self.__events_by_id[event_id] = event
@@ -1,10 +1,27 @@
+import asyncio
 from collections import ChainMap
-from datetime import datetime
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 import logging
 import sys
+import threading
+import time
 from ..utils.utils import pretty_json_string_except
 
-from typing import TYPE_CHECKING, Dict, List, Optional
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
 
 from ThermiaOnlineAPI.const import (
     REG_BRINE_IN,
@@ -34,13 +51,42 @@ from ThermiaOnlineAPI.const import (
     COMP_STATUS_ITEC,
     REG_SUPPLY_LINE,
     DATETIME_FORMAT,
+    ALARM_HISTORY_SYNC_INTERVAL,
+    DEFAULT_POLLING_INTERVAL,
+    OFFLINE_POLLING_MAX_INTERVAL,
+    OFFLINE_POLLING_MIN_INTERVAL,
+    HISTORICAL_DATA_CHUNK_SIZE,
+    HISTORICAL_DATA_MAX_PARALLEL_REQUESTS,
+    HISTORICAL_DATA_ROLLUP_BUCKET_SIZE,
+    HISTORICAL_DATA_STORE_SETTLE_TIME,
     REG_OPER_DATA_BUFFER_TANK,
 )
 
+from ..exceptions.NetworkException import NetworkException
+from .Alarms import AlarmIndex
+from .HistoricalData import (
+    HistoricalDataColumns,
+    HistoricalDataRollup,
+    HistoricalDataTable,
+    RollupRow,
+    calculate_rollup_rows,
+)
+from ..utils.historical_data import (
+    datetime_to_timestamp,
+    fetch_time_chunks,
+    merge_historical_data_chunks,
+    parse_historical_data_timestamp,
+    plan_time_chunks,
+    timestamp_to_datetime,
+)
+from ..utils.polling import polling_ticks
 from ..utils.utils import get_dict_value_or_none, get_dict_value_or_default
 
 if TYPE_CHECKING:
     from ..api.ThermiaAPI import ThermiaAPI
+    from ..store.HistoricalDataStore import HistoricalDataStore
+    from ..store.InstallationProfileCache import InstallationProfileCache
+    from ..utils.polling import AdaptivePollingPolicy
 
 DEFAULT_REGISTER_INDEXES: Dict[str, Optional[int]] = {
     "temperature": None,
@@ -49,11 +95,118 @@ DEFAULT_REGISTER_INDEXES: Dict[str, Optional[int]] = {
     "hot_water_boost_switch": None,
 }
 
+# Properties included in heat pump data snapshots
+SNAPSHOT_PROPERTIES: List[str] = [
+    "id",
+    "name",
+    "is_online",
+    "is_data_stale",
+    "last_online",
+    "model",
+    "model_id",
+    "indoor_temperature",
+    "outdoor_temperature",
+    "is_hot_water_active",
+    "hot_water_temperature",
+    "heat_temperature",
+    "supply_line_temperature",
+    "desired_supply_line_temperature",
+    "buffer_tank_temperature",
+    "return_line_temperature",
+    "brine_out_temperature",
+    "brine_in_temperature",
+    "pool_temperature",
+    "cooling_tank_temperature",
+    "cooling_supply_line_temperature",
+    "running_operational_statuses",
+    "running_power_statuses",
+    "operational_status_integral",
+    "operational_status_pid",
+    "compressor_operational_time",
+    "heating_operational_time",
+    "hot_water_operational_time",
+    "auxiliary_heater_1_operational_time",
+    "auxiliary_heater_2_operational_time",
+    "auxiliary_heater_3_operational_time",
+    "operation_mode",
+    "hot_water_switch_state",
+    "hot_water_boost_switch_state",
+    "active_alarm_count",
+    "active_alarms",
+]
+
+
+def _operation_mode_to_state(operation_mode: Optional[dict]) -> Optional[dict]:
+    if operation_mode is None:
+        return None
+
+    # JSON object keys can only be strings, so available modes are stored as pairs
+    return {**operation_mode, "available": list(operation_mode["available"].items())}
+
+
+def _operation_mode_from_state(operation_mode: Optional[dict]) -> Optional[dict]:
+    if operation_mode is None:
+        return None
+
+    return {**operation_mode, "available": ChainMap(dict(operation_mode["available"]))}
+
+
+# Data sources of update_data(), each fetched with its own request(s)
+DATA_SOURCES: List[str] = [
+    "info",
+    "status",
+    "device_data",
+    "group_temperatures",
+    "group_operational_status",
+    "group_operational_time",
+    "group_operational_operation",
+    "group_hot_water",
+    "alarms",
+]
+
+
+def data_source(name: str):
+    """
+    Mark a property getter as reading the given data source, so that its
+    data is refreshed in the background when older than max_data_age.
+    """
+
+    def decorator(getter):
+        @functools.wraps(getter)
+        def wrapper(self):
+            self._revalidate_data_source(name)
+            return getter(self)
+
+        return wrapper
+
+    return decorator
+
+
+class DataSourceState(NamedTuple):
+    fetched_at: Optional[datetime]
+    error: Optional[str]
+
+
+class PropertyChange(NamedTuple):
+    name: str
+    old_value: Any
+    new_value: Any
+
 
 class ThermiaHeatPump:
-    def __init__(self, device_data: dict, api_interface: "ThermiaAPI"):
+    def __init__(
+        self,
+        device_data: dict,
+        api_interface: "ThermiaAPI",
+        historical_data_store: Optional["HistoricalDataStore"] = None,
+        installation_profile_cache: Optional["InstallationProfileCache"] = None,
+        state: Optional[Dict[str, Any]] = None,
+        max_data_age: Optional[timedelta] = None,
+    ):
         self.__device_id = str(device_data["id"])
         self.__api_interface = api_interface
+        self.__historical_data_store = historical_data_store
+        self.__installation_profile_cache = installation_profile_cache
 
         self._LOGGER = logging.getLogger(__name__ + "." + self.__device_id)
 
@@ -66,6 +219,8 @@ class ThermiaHeatPump:
             "operational_status_valueNamePrefix": None,
             "operational_status_minRegisterValue": None,
         }
+        # Device config and register indexes, shared by heat pumps of the same installation profile
+        self.__capability_profile: Optional[Dict[str, Any]] = None
 
         # GROUPS
         self.__group_temperatures = None
@@ -79,9 +234,48 @@ class ThermiaHeatPump:
         }
 
         self.__alarms = None
+        self.__alarm_index = AlarmIndex()
+        self.__next_alarm_history_sync_time: Optional[float] = None
         self.__historical_data_registers_map = None
 
-        self.__register_indexes = DEFAULT_REGISTER_INDEXES
+        # Which data sources had changed responses during the last update
+        self.__changed_data_sources: Dict[str, bool] = {}
+
+        # Stale-while-revalidate: data sources older than max_data_age are refreshed in the background on read
+        self.__max_data_age = (
+            max_data_age.total_seconds() if max_data_age is not None else None
+        )
+        self.__data_refreshed_at: Dict[str, float] = {}
+        # Monotonic start time of the fetch of the applied data of each data source
+        self.__applied_fetch_started_at: Dict[str, float] = {}
+        # Time of the last successful fetch and error of the last fetch of each data source
+        self.__data_source_states: Dict[str, DataSourceState] = {
+            data_source: DataSourceState(None, None)
+            for data_source in [*DATA_SOURCES, "alarm_history"]
+        }
+        self.__refreshing_data_sources: Set[str] = set()
+        self.__data_lock = threading.Lock()
+        # Held while fetched data is applied and subscribers are notified, by
+        # update_data() and background refreshes. Reentrant, so subscribers can update data
+        self.__update_lock = threading.RLock()
+
+        # Offline heat pumps are polled with back-off until they come back online
+        self.__is_data_stale = False
+        self.__offline_polling_interval: Optional[timedelta] = None
+        self.__next_offline_update_time: Optional[float] = None
+
+        # Subscribers to property changes and the snapshot they are compared against
+        self.__subscribers: List[
+            Callable[["ThermiaHeatPump", List[PropertyChange]], None]
+        ] = []
+        self.__subscribers_snapshot: Optional[Dict[str, Any]] = None
+
+        self.__register_indexes = dict(DEFAULT_REGISTER_INDEXES)
+
+        # Operational status group registers by name, with the group they were indexed from
+        self.__operational_status_registers: Tuple[
+            Optional[list], Dict[str, Optional[Dict]]
+        ] = (None, {})
 
         # Precalculated data so it does not have to be updated
 
@@ -93,36 +287,378 @@ class ThermiaHeatPump:
         self.__all_power_statuses_map = None
         self.__running_power_statuses = None
 
-        self.update_data()
+        if state is not None:
+            self.__restore_state(state)
+        else:
+            self.update_data()
 
     def update_data(self):
-        self.__info = self.__api_interface.get_device_info(self.__device_id)
-        self.__status = self.__api_interface.get_device_status(self.__device_id)
-        self.__device_data = self.__api_interface.get_device_by_id(self.__device_id)
+        if (
+            self.__next_offline_update_time is not None
+            and time.monotonic() < self.__next_offline_update_time
+        ):
+            with self.__update_lock:
+                self.__changed_data_sources = {}
+            return
+
+        # Each data source is fetched on its own, failed ones keep their last good value
+        values: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        fetch_started_at: Dict[str, float] = {}
+
+        for data_source in ["info", "device_data"]:
+            self.__try_fetch_data_source(data_source, values, errors, fetch_started_at)
+
+        is_offline = get_dict_value_or_none(values.get("info"), "isOnline") is False
+
+        # Data is fetched fully at least once, even if the heat pump is offline
+        if is_offline and self.__info is not None:
+            self.__update_offline_data(values, errors, fetch_started_at)
+            return
+
+        self.__offline_polling_interval = None
+        self.__next_offline_update_time = None
+
+        for data_source in DATA_SOURCES:
+            if data_source not in values and data_source not in errors:
+                self.__try_fetch_data_source(
+                    data_source, values, errors, fetch_started_at
+                )
+
+        with self.__update_lock:
+            self.__changed_data_sources = self.__apply_data_sources(
+                values, errors, fetch_started_at
+            )
+            # Synced after fetched data sources are applied, so its failure does not discard them
+            self.__try_sync_alarm_history(errors)
+
+            self.__is_data_stale = is_offline or len(errors) > 0
+
+            if len(self.__subscribers) > 0 and any(
+                self.__changed_data_sources.values()
+            ):
+                self.__notify_subscribers()
+
+    def __try_fetch_data_source(
+        self,
+        data_source: str,
+        values: Dict[str, Any],
+        errors: Dict[str, str],
+        fetch_started_at: Dict[str, float],
+    ):
+        fetch_started_at[data_source] = time.monotonic()
+
+        try:
+            values[data_source] = self.__fetch_data_source(data_source)
+        except Exception as e:
+            self._LOGGER.error(
+                "Error updating data source " + data_source + ": " + str(e)
+            )
+            errors[data_source] = str(e)
+
+    def __apply_data_sources(
+        self,
+        values: Dict[str, Any],
+        errors: Dict[str, str],
+        fetch_started_at: Dict[str, float],
+    ) -> Dict[str, bool]:
+        """
+        Apply fetched data sources and return which of them changed. Results
+        of fetches that started before the fetch of the applied data, like
+        background refreshes overtaken by update_data(), are skipped.
+        """
+        values = {
+            data_source: value
+            for data_source, value in values.items()
+            if not self.__is_fetch_outdated(data_source, fetch_started_at)
+        }
+        errors = {
+            data_source: error
+            for data_source, error in errors.items()
+            if not self.__is_fetch_outdated(data_source, fetch_started_at)
+        }
+
+        for data_source in [*values, *errors]:
+            self.__applied_fetch_started_at[data_source] = fetch_started_at[data_source]
+
+        # API returns the same objects for unchanged responses
+        changed_data_sources = {
+            data_source: data_source in values
+            and self.__is_data_source_changed(data_source, values[data_source])
+            for data_source in [*values, *errors]
+        }
+
+        refreshed_at = time.monotonic()
+        fetched_at = datetime.now()
+
+        for data_source, value in values.items():
+            self.__set_data_source(
+                data_source, value, changed_data_sources[data_source]
+            )
+            self.__data_refreshed_at[data_source] = refreshed_at
+            self.__data_source_states[data_source] = DataSourceState(fetched_at, None)
+
+        for data_source, error in errors.items():
+            self.__data_refreshed_at[data_source] = refreshed_at
+            self.__data_source_states[data_source] = DataSourceState(
+                self.__data_source_states[data_source].fetched_at, error
+            )
+
+        return changed_data_sources
 
-        self.__register_indexes["temperature"] = get_dict_value_or_default(
-            self.__status, "heatingEffectRegisters", [None, None]
-        )[1]
+    def __is_fetch_outdated(
+        self, data_source: str, fetch_started_at: Dict[str, float]
+    ) -> bool:
+        applied_fetch_started_at = self.__applied_fetch_started_at.get(data_source)
 
-        self.__group_temperatures = self.__api_interface.get__group_temperatures(
-            self.__device_id
+        return (
+            applied_fetch_started_at is not None
+            and fetch_started_at[data_source] < applied_fetch_started_at
         )
-        self.__group_operational_status = (
-            self.__api_interface.get__group_operational_status(self.__device_id)
+
+    def __fetch_data_source(self, data_source: str) -> Any:
+        api_interface = self.__api_interface
+        device_id = self.__device_id
+
+        if data_source == "info":
+            return api_interface.get_device_info(device_id, raise_on_error=True)
+        if data_source == "status":
+            return api_interface.get_device_status(device_id, raise_on_error=True)
+        if data_source == "device_data":
+            return api_interface.get_device_by_id(device_id, raise_on_error=True)
+        if data_source == "group_temperatures":
+            return api_interface.get__group_temperatures(device_id, raise_on_error=True)
+        if data_source == "group_operational_status":
+            return api_interface.get__group_operational_status(
+                device_id, raise_on_error=True
+            )
+        if data_source == "group_operational_time":
+            return api_interface.get__group_operational_time(
+                device_id, raise_on_error=True
+            )
+        if data_source == "group_operational_operation":
+            return (
+                api_interface.get_group_operational_operation(
+                    self, raise_on_error=True
+                ),
+                api_interface.get_group_operational_operation_from_status(
+                    self, raise_on_error=True
+                ),
+            )
+        if data_source == "group_hot_water":
+            return api_interface.get_group_hot_water(self, raise_on_error=True)
+        if data_source == "alarms":
+            return api_interface.get_active_alarms(device_id, raise_on_error=True)
+
+        raise ValueError("Unknown data source: " + data_source)
+
+    def __is_data_source_changed(self, data_source: str, value: Any) -> bool:
+        if data_source == "info":
+            return value is not self.__info
+        if data_source == "status":
+            return value is not self.__status
+        if data_source == "device_data":
+            return value is not self.__device_data
+        if data_source == "group_temperatures":
+            return value is not self.__group_temperatures
+        if data_source == "group_operational_status":
+            return value is not self.__group_operational_status
+        if data_source == "group_operational_time":
+            return value is not self.__group_operational_time
+        if data_source == "group_operational_operation":
+            return (
+                value[0] is not self.__group_operational_operation
+                or value[1] is not self.__group_operational_operation_read_only
+            )
+        if data_source == "group_hot_water":
+            return value != self.__group_hot_water
+        if data_source == "alarms":
+            return value is not self.__alarms
+
+        raise ValueError("Unknown data source: " + data_source)
+
+    def __set_data_source(self, data_source: str, value: Any, changed: bool):
+        if data_source == "info":
+            self.__info = value
+        elif data_source == "status":
+            self.__status = value
+            self.__register_indexes["temperature"] = get_dict_value_or_default(
+                self.__status, "heatingEffectRegisters", [None, None]
+            )[1]
+        elif data_source == "device_data":
+            self.__device_data = value
+        elif data_source == "group_temperatures":
+            self.__group_temperatures = value
+        elif data_source == "group_operational_time":
+            self.__group_operational_time = value
+        elif data_source == "group_operational_operation":
+            (
+                self.__group_operational_operation,
+                self.__group_operational_operation_read_only,
+            ) = value
+        elif data_source == "group_hot_water":
+            self.__group_hot_water = value
+        elif data_source == "alarms":
+            self.__alarms = value
+            if value is not None:
+                self.__alarm_index.update_active_alarms(value)
+        elif data_source == "group_operational_status":
+            self.__group_operational_status = value
+
+            if self.__capability_profile is None:
+                self.__load_capability_profile()
+
+            # Precalculated data depends only on operational status group
+            if changed or self.__all_operational_statuses_map is None:
+                self.__precalculate_operational_status_data()
+
+            self.__save_capability_profile()
+
+    def _revalidate_data_source(self, data_source: str):
+        """
+        With max_data_age set, start a background refresh of the data
+        source if its data is older than that. Called by property getters.
+        """
+        if self.__max_data_age is None:
+            return
+
+        # Offline heat pumps return stale or empty data, only info is refreshed
+        if get_dict_value_or_none(self.__info, "isOnline") is False and (
+            data_source not in ["info", "device_data"]
+        ):
+            return
+
+        with self.__data_lock:
+            fetched_at = self.__data_refreshed_at.get(data_source)
+
+            if (
+                fetched_at is not None
+                and time.monotonic() - fetched_at <= self.__max_data_age
+            ) or data_source in self.__refreshing_data_sources:
+                return
+
+            self.__refreshing_data_sources.add(data_source)
+
+        threading.Thread(
+            target=self.__refresh_data_source, args=(data_source,), daemon=True
+        ).start()
+
+    def __refresh_data_source(self, data_source: str):
+        values: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        fetch_started_at: Dict[str, float] = {}
+
+        try:
+            self.__try_fetch_data_source(data_source, values, errors, fetch_started_at)
+
+            # Background refreshes do not replace the changes of the last update_data()
+            with self.__update_lock:
+                changed = self.__apply_data_sources(
+                    values, errors, fetch_started_at
+                ).get(data_source, False)
+
+                if changed and len(self.__subscribers) > 0:
+                    self.__notify_subscribers()
+        finally:
+            with self.__data_lock:
+                self.__refreshing_data_sources.discard(data_source)
+
+    def __load_capability_profile(self):
+        installation_profile_id = get_dict_value_or_none(
+            self.__info, "installationProfileId"
         )
-        self.__group_operational_time = (
-            self.__api_interface.get__group_operational_time(self.__device_id)
+
+        if self.__installation_profile_cache is None or installation_profile_id is None:
+            return
+
+        capability_profile = self.__installation_profile_cache.get(
+            installation_profile_id, "capabilities"
+        )
+
+        if capability_profile is None:
+            return
+
+        # Profile detected on a heat pump with other registers is not merged
+        if (
+            self.__get_register_from_operational_status(
+                capability_profile.get("operational_status_register")
+            )
+            is None
+        ):
+            return
+
+        self.__capability_profile = capability_profile
+
+        for key in self.__device_config:
+            self.__device_config[key] = capability_profile.get(key)
+
+        for key in self.__register_indexes:
+            if key != "temperature" and self.__register_indexes[key] is None:
+                self.__register_indexes[key] = capability_profile.get(
+                    key + "_register_index"
+                )
+
+    def __save_capability_profile(self):
+        installation_profile_id = get_dict_value_or_none(
+            self.__info, "installationProfileId"
         )
-        self.__group_operational_operation = (
-            self.__api_interface.get_group_operational_operation(self)
+
+        if (
+            self.__installation_profile_cache is None
+            or installation_profile_id is None
+            or self.__device_config["operational_status_register"] is None
+        ):
+            return
+
+        capability_profile = {
+            **self.__device_config,
+            **{
+                key + "_register_index": register_index
+                for key, register_index in self.__register_indexes.items()
+                if key != "temperature"
+            },
+        }
+
+        if capability_profile != self.__capability_profile:
+            self.__capability_profile = capability_profile
+            self.__installation_profile_cache.set(
+                installation_profile_id, "capabilities", capability_profile
+            )
+
+    def __update_offline_data(
+        self,
+        values: Dict[str, Any],
+        errors: Dict[str, str],
+        fetch_started_at: Dict[str, float],
+    ):
+        # Register groups and status of offline heat pumps are stale or empty,
+        # so previous data is kept and only info is polled with back-off
+        with self.__update_lock:
+            self.__changed_data_sources = self.__apply_data_sources(
+                values, errors, fetch_started_at
+            )
+            self.__is_data_stale = True
+
+            if len(self.__subscribers) > 0 and any(
+                self.__changed_data_sources.values()
+            ):
+                self.__notify_subscribers()
+
+        self.__offline_polling_interval = (
+            OFFLINE_POLLING_MIN_INTERVAL
+            if self.__offline_polling_interval is None
+            else min(self.__offline_polling_interval * 2, OFFLINE_POLLING_MAX_INTERVAL)
         )
-        self.__group_operational_operation_read_only = (
-            self.__api_interface.get_group_operational_operation_from_status(self)
+        self.__next_offline_update_time = (
+            time.monotonic() + self.__offline_polling_interval.total_seconds()
         )
-        self.__group_hot_water = self.__api_interface.get_group_hot_water(self)
 
-        self.__alarms = self.__api_interface.get_all_alarms(self.__device_id)
+        self._LOGGER.debug(
+            "Heat pump is offline, next update in "
+            + str(self.__offline_polling_interval)
+        )
 
+    def __precalculate_operational_status_data(self):
         # Precalculate data (order is important)
         self.__operational_statuses = (
             self.__get_operational_statuses_from_operational_status()
@@ -138,6 +674,14 @@ class ThermiaHeatPump:
         )
         self.__running_power_statuses = self.__get_running_power_statuses()
 
+    @property
+    def changed_data_sources(self) -> Dict[str, bool]:
+        return self.__changed_data_sources
+
+    @property
+    def data_source_states(self) -> Dict[str, DataSourceState]:
+        return dict(self.__data_source_states)
+
     def get_register_indexes(self):
         return self.__register_indexes
 
@@ -150,55 +694,67 @@ class ThermiaHeatPump:
     def set_register_index_hot_water_boost_switch(self, register_index: Optional[int]):
         self.__register_indexes["hot_water_boost_switch"] = register_index
 
-    def set_temperature(self, temperature: int):
+    def set_temperature(self, temperature: int) -> bool:
         if self.__status is None:
             self._LOGGER.error("Status not available, cannot set temperature")
-            return
+            return False
 
         self._LOGGER.info("Setting temperature to " + str(temperature))
 
-        self.__status["heatingEffect"] = (
-            temperature  # update local state before refetching data
-        )
-        self.__api_interface.set_temperature(self, temperature)
+        self.__status = {
+            **self.__status,
+            "heatingEffect": temperature,  # update local state before refetching data
+        }
+        result = self.__api_interface.set_temperature(self, temperature)
         self.update_data()
 
-    def set_operation_mode(self, mode: str):
+        return result
+
+    def set_operation_mode(self, mode: str) -> bool:
         self._LOGGER.info("Setting operation mode to " + str(mode))
 
         if self.__group_operational_operation is not None:
-            self.__group_operational_operation["current"] = (
-                mode  # update local state before refetching data
-            )
-        self.__api_interface.set_operation_mode(self, mode)
+            self.__group_operational_operation = {
+                **self.__group_operational_operation,
+                "current": mode,  # update local state before refetching data
+            }
+        result = self.__api_interface.set_operation_mode(self, mode)
         self.update_data()
 
-    def set_hot_water_switch_state(self, state: int):
+        return result
+
+    def set_hot_water_switch_state(self, state: int) -> bool:
         self._LOGGER.info("Setting hot water switch to " + str(state))
 
         if self.__group_hot_water["hot_water_switch"] is None:
             self._LOGGER.error("Hot water switch not available")
-            return
+            return False
 
-        self.__group_hot_water["hot_water_switch"] = (
-            state  # update local state before refetching data
-        )
-        self.__api_interface.set_hot_water_switch_state(self, state)
+        self.__group_hot_water = {
+            **self.__group_hot_water,
+            "hot_water_switch": state,  # update local state before refetching data
+        }
+        result = self.__api_interface.set_hot_water_switch_state(self, state)
         self.update_data()
 
-    def set_hot_water_boost_switch_state(self, state: int):
+        return result
+
+    def set_hot_water_boost_switch_state(self, state: int) -> bool:
         self._LOGGER.info("Setting hot water boost switch to " + str(state))
 
         if self.__group_hot_water["hot_water_boost_switch"] is None:
             self._LOGGER.error("Hot water switch not available")
-            return
+            return False
 
-        self.__group_hot_water["hot_water_boost_switch"] = (
-            state  # update local state before refetching data
-        )
-        self.__api_interface.set_hot_water_boost_switch_state(self, state)
+        self.__group_hot_water = {
+            **self.__group_hot_water,
+            "hot_water_boost_switch": state,  # update local state before refetching data
+        }
+        result = self.__api_interface.set_hot_water_boost_switch_state(self, state)
         self.update_data()
 
+        return result
+
     def get_all_available_register_groups(self):
         installation_profile_id = get_dict_value_or_none(
             self.__info, "installationProfileId"
@@ -243,7 +799,7 @@ class ThermiaHeatPump:
 
     def set_register_data_by_register_group_and_name(
         self, register_group: str, register_name: str, value: int
-    ):
+    ) -> bool:
         register_data = self.get_register_data_by_register_group_and_name(
             register_group, register_name
         )
@@ -255,11 +811,15 @@ class ThermiaHeatPump:
                 + " and register: "
                 + register_name
             )
-            return None
+            return False
 
-        self.__api_interface.set_register_value(self, register_data["id"], value)
+        result = self.__api_interface.set_register_value(
+            self, register_data["id"], value
+        )
         self.update_data()
 
+        return result
+
     def __get_heat_temperature_data(self):
         device_temperature_register_index = self.get_register_indexes()["temperature"]
         if device_temperature_register_index is None:
@@ -327,15 +887,52 @@ class ThermiaHeatPump:
             "value": data["registerValue"],
         }
 
-    def __get_active_alarms(self):
-        active_alarms = filter(
-            lambda alarm: get_dict_value_or_default(alarm, "isActiveAlarm", False)
-            is True,
-            self.__alarms or [],
+    def __try_sync_alarm_history(self, errors: Dict[str, str]):
+        if (
+            self.__next_alarm_history_sync_time is not None
+            and time.monotonic() < self.__next_alarm_history_sync_time
+        ):
+            return
+
+        # Failed syncs are retried on the next update
+        try:
+            events = self.__api_interface.get_all_alarms(
+                self.__device_id, raise_on_error=True
+            )
+        except Exception as e:
+            self._LOGGER.error("Error syncing alarm history: " + str(e))
+            errors["alarm_history"] = str(e)
+            self.__data_source_states["alarm_history"] = DataSourceState(
+                self.__data_source_states["alarm_history"].fetched_at, str(e)
+            )
+            return
+
+        self.__alarm_index.update_events(events)
+        self.__next_alarm_history_sync_time = (
+            time.monotonic() + ALARM_HISTORY_SYNC_INTERVAL.total_seconds()
+        )
+        self.__data_source_states["alarm_history"] = DataSourceState(
+            datetime.now(), None
         )
-        return list(active_alarms)
 
     def __set_historical_data_registers(self):
+        installation_profile_id = get_dict_value_or_none(
+            self.__info, "installationProfileId"
+        )
+
+        # Heat pumps of the same installation profile have the same registers
+        if (
+            self.__installation_profile_cache is not None
+            and installation_profile_id is not None
+        ):
+            data_map = self.__installation_profile_cache.get(
+                installation_profile_id, "historical_data_registers"
+            )
+
+            if data_map is not None:
+                self.__historical_data_registers_map = data_map
+                return
+
         data = self.__api_interface.get_historical_data_registers(self.__device_id)
 
         data_map = {}
@@ -346,21 +943,36 @@ class ThermiaHeatPump:
             for register in registers:
                 data_map[register["registerName"]] = register["registerId"]
 
+            if (
+                self.__installation_profile_cache is not None
+                and installation_profile_id is not None
+            ):
+                self.__installation_profile_cache.set(
+                    installation_profile_id, "historical_data_registers", data_map
+                )
+
         self.__historical_data_registers_map = data_map
 
     def __get_register_from_operational_status(
         self, register_name: str
     ) -> Optional[Dict]:
-        data = [
-            d
-            for d in self.__group_operational_status or []
-            if d["registerName"] == register_name
-        ]
+        if (
+            self.__operational_status_registers[0]
+            is not self.__group_operational_status
+        ):
+            registers: Dict[str, Optional[Dict]] = {}
 
-        if len(data) != 1:
-            return None
+            for register in self.__group_operational_status or []:
+                name = register["registerName"]
+                # Registers with duplicate names are ambiguous, so they are not used
+                registers[name] = None if name in registers else register
+
+            self.__operational_status_registers = (
+                self.__group_operational_status,
+                registers,
+            )
 
-        return data[0]
+        return self.__operational_status_registers[1].get(register_name)
 
     def __get_operational_statuses_from_operational_status(self) -> Optional[Dict]:
         if self.__device_config["operational_status_register"] is not None:
@@ -373,26 +985,21 @@ class ThermiaHeatPump:
         # Try to get the data from the REG_OPERATIONAL_STATUS_PRIO1 register
         data = self.__get_register_from_operational_status(REG_OPERATIONAL_STATUS_PRIO1)
         if data is not None:
-            self.__device_config["operational_status_register"] = (
-                REG_OPERATIONAL_STATUS_PRIO1
-            )
-            self.__device_config["operational_status_valueNamePrefix"] = (
-                "REG_VALUE_STATUS_"
+            self.__set_operational_status_config(
+                REG_OPERATIONAL_STATUS_PRIO1, "REG_VALUE_STATUS_"
             )
             return data.get("valueNames", [])
 
         # Try to get the data from the COMP_STATUS_ATEC register
         data = self.__get_register_from_operational_status(COMP_STATUS_ATEC)
         if data is not None:
-            self.__device_config["operational_status_register"] = COMP_STATUS_ATEC
-            self.__device_config["operational_status_valueNamePrefix"] = "COMP_VALUE_"
+            self.__set_operational_status_config(COMP_STATUS_ATEC, "COMP_VALUE_")
             return data.get("valueNames", [])
 
         # Try to get the data from the COMP_STATUS_ITEC register
         data = self.__get_register_from_operational_status(COMP_STATUS_ITEC)
         if data is not None:
-            self.__device_config["operational_status_register"] = COMP_STATUS_ITEC
-            self.__device_config["operational_status_valueNamePrefix"] = "COMP_VALUE_"
+            self.__set_operational_status_config(COMP_STATUS_ITEC, "COMP_VALUE_")
             return data.get("valueNames", [])
 
         # Try to get the data from the REG_OPERATIONAL_STATUS_PRIORITY_BITMASK register
@@ -400,24 +1007,32 @@ class ThermiaHeatPump:
             REG_OPERATIONAL_STATUS_PRIORITY_BITMASK
         )
         if data is not None:
-            self.__device_config["operational_status_register"] = (
-                REG_OPERATIONAL_STATUS_PRIORITY_BITMASK
+            self.__set_operational_status_config(
+                REG_OPERATIONAL_STATUS_PRIORITY_BITMASK, "REG_VALUE_"
             )
-            self.__device_config["operational_status_valueNamePrefix"] = "REG_VALUE_"
             return data.get("valueNames", [])
 
         # Try to get the data from the COMP_STATUS register
         data = self.__get_register_from_operational_status(COMP_STATUS)
         if data is not None:
-            self.__device_config["operational_status_register"] = COMP_STATUS
-            self.__device_config["operational_status_valueNamePrefix"] = "COMP_VALUE_"
-            self.__device_config["operational_status_minRegisterValue"] = (
-                "4"  # 4 is OFF
+            self.__set_operational_status_config(
+                COMP_STATUS, "COMP_VALUE_", "4"  # 4 is OFF
             )
             return data.get("valueNames", [])
 
         return None
 
+    def __set_operational_status_config(
+        self,
+        register: str,
+        value_name_prefix: str,
+        min_register_value: Optional[str] = None,
+    ):
+        # All keys are set, so none are left over from a previously detected register
+        self.__device_config["operational_status_register"] = register
+        self.__device_config["operational_status_valueNamePrefix"] = value_name_prefix
+        self.__device_config["operational_status_minRegisterValue"] = min_register_value
+
     def __get_all_operational_statuses_from_operational_status(
         self,
     ) -> Optional[ChainMap]:
@@ -561,6 +1176,7 @@ class ThermiaHeatPump:
         return []
 
     @property
+    @data_source("info")
     def name(self):
         return get_dict_value_or_none(self.__info, "name")
 
@@ -569,28 +1185,38 @@ class ThermiaHeatPump:
         return self.__device_id
 
     @property
+    @data_source("info")
     def is_online(self):
         return get_dict_value_or_none(self.__info, "isOnline")
 
     @property
+    def is_data_stale(self) -> bool:
+        return self.__is_data_stale
+
+    @property
+    @data_source("info")
     def last_online(self):
         return get_dict_value_or_none(self.__info, "lastOnline")
 
     @property
+    @data_source("device_data")
     def model(self):
         return get_dict_value_or_default(self.__device_data, "profile", {}).get(
             "thermiaName"
         )
 
     @property
+    @data_source("device_data")
     def model_id(self):
         return get_dict_value_or_default(self.__device_data, "profile", {}).get("name")
 
     @property
+    @data_source("status")
     def has_indoor_temp_sensor(self):
         return get_dict_value_or_none(self.__status, "hasIndoorTempSensor")
 
     @property
+    @data_source("status")
     def indoor_temperature(self):
         if self.has_indoor_temp_sensor:
             return get_dict_value_or_none(self.__status, "indoorTemperature")
@@ -598,20 +1224,24 @@ class ThermiaHeatPump:
             return self.heat_temperature
 
     @property
+    @data_source("status")
     def is_outdoor_temp_sensor_functioning(self):
         return get_dict_value_or_none(self.__status, "isOutdoorTempSensorFunctioning")
 
     @property
+    @data_source("status")
     def outdoor_temperature(self):
         return get_dict_value_or_none(self.__status, "outdoorTemperature")
 
     @property
+    @data_source("status")
     def is_hot_water_active(self):
         return get_dict_value_or_none(
             self.__status, "isHotwaterActive"
         ) or get_dict_value_or_none(self.__status, "isHotWaterActive")
 
     @property
+    @data_source("status")
     def hot_water_temperature(self):
         return get_dict_value_or_none(self.__status, "hotWaterTemperature")
 
@@ -620,18 +1250,22 @@ class ThermiaHeatPump:
     ###########################################################################
 
     @property
+    @data_source("status")
     def heat_temperature(self):
         return get_dict_value_or_none(self.__status, "heatingEffect")
 
     @property
+    @data_source("group_temperatures")
     def heat_min_temperature_value(self):
         return get_dict_value_or_none(self.__get_heat_temperature_data(), "minValue")
 
     @property
+    @data_source("group_temperatures")
     def heat_max_temperature_value(self):
         return get_dict_value_or_none(self.__get_heat_temperature_data(), "maxValue")
 
     @property
+    @data_source("group_temperatures")
     def heat_temperature_step(self):
         return get_dict_value_or_none(self.__get_heat_temperature_data(), "step")
 
@@ -640,6 +1274,7 @@ class ThermiaHeatPump:
     ###########################################################################
 
     @property
+    @data_source("group_temperatures")
     def supply_line_temperature(self):
         return get_dict_value_or_none(
             self.__get_temperature_data_by_register_name(REG_SUPPLY_LINE), "value"
@@ -649,6 +1284,7 @@ class ThermiaHeatPump:
         )
 
     @property
+    @data_source("group_temperatures")
     def desired_supply_line_temperature(self):
         return (
             get_dict_value_or_none(
@@ -670,6 +1306,7 @@ class ThermiaHeatPump:
         )
 
     @property
+    @data_source("group_temperatures")
     def buffer_tank_temperature(self):
         return get_dict_value_or_none(
             self.__get_temperature_data_by_register_name(REG_OPER_DATA_BUFFER_TANK),
@@ -677,6 +1314,7 @@ class ThermiaHeatPump:
         )
 
     @property
+    @data_source("group_temperatures")
     def return_line_temperature(self):
         return get_dict_value_or_none(
             self.__get_temperature_data_by_register_name(REG_RETURN_LINE), "value"
@@ -685,30 +1323,35 @@ class ThermiaHeatPump:
         )
 
     @property
+    @data_source("group_temperatures")
     def brine_out_temperature(self):
         return get_dict_value_or_none(
             self.__get_temperature_data_by_register_name(REG_BRINE_OUT), "value"
         )
 
     @property
+    @data_source("group_temperatures")
     def pool_temperature(self):
         return get_dict_value_or_none(
             self.__get_temperature_data_by_register_name(REG_ACTUAL_POOL_TEMP), "value"
         )
 
     @property
+    @data_source("group_temperatures")
     def brine_in_temperature(self):
         return get_dict_value_or_none(
             self.__get_temperature_data_by_register_name(REG_BRINE_IN), "value"
         )
 
     @property
+    @data_source("group_temperatures")
     def cooling_tank_temperature(self):
         return get_dict_value_or_none(
             self.__get_temperature_data_by_register_name(REG_COOL_SENSOR_TANK), "value"
         )
 
     @property
+    @data_source("group_temperatures")
     def cooling_supply_line_temperature(self):
         return get_dict_value_or_none(
             self.__get_temperature_data_by_register_name(REG_COOL_SENSOR_SUPPLY),
@@ -720,6 +1363,7 @@ class ThermiaHeatPump:
     ###########################################################################
 
     @property
+    @data_source("group_operational_status")
     def running_operational_statuses(self) -> List[str]:
         data = self.__running_operational_statuses
 
@@ -729,6 +1373,7 @@ class ThermiaHeatPump:
         return data
 
     @property
+    @data_source("group_operational_status")
     def available_operational_statuses(self) -> Optional[List[str]]:
         data = self.__all_operational_statuses_map
 
@@ -738,10 +1383,12 @@ class ThermiaHeatPump:
         return list(data.values())
 
     @property
+    @data_source("group_operational_status")
     def available_operational_statuses_map(self) -> Optional[ChainMap]:
         return self.__all_operational_statuses_map
 
     @property
+    @data_source("group_operational_status")
     def running_power_statuses(self) -> List[str]:
         data = self.__running_power_statuses
 
@@ -751,6 +1398,7 @@ class ThermiaHeatPump:
         return data
 
     @property
+    @data_source("group_operational_status")
     def available_power_statuses(self) -> Optional[List[str]]:
         data = self.__all_power_statuses_map
 
@@ -760,15 +1408,18 @@ class ThermiaHeatPump:
         return list(data.values())
 
     @property
+    @data_source("group_operational_status")
     def available_power_statuses_map(self) -> Optional[ChainMap]:
         return self.__all_power_statuses_map
 
     @property
+    @data_source("group_operational_status")
     def operational_status_integral(self):
         data = self.__get_register_from_operational_status(REG_INTEGRAL_LSD)
         return get_dict_value_or_none(data, "registerValue")
 
     @property
+    @data_source("group_operational_status")
     def operational_status_pid(self) -> Optional[int]:
         data = self.__get_register_from_operational_status(REG_PID)
         return get_dict_value_or_none(data, "registerValue")
@@ -778,6 +1429,7 @@ class ThermiaHeatPump:
     ###########################################################################
 
     @property
+    @data_source("group_operational_time")
     def compressor_operational_time(self):
         return get_dict_value_or_none(
             self.__get_operational_time_data_by_register_name(REG_OPER_TIME_COMPRESSOR),
@@ -785,6 +1437,7 @@ class ThermiaHeatPump:
         )
 
     @property
+    @data_source("group_operational_time")
     def heating_operational_time(self):
         return get_dict_value_or_none(
             self.__get_operational_time_data_by_register_name(REG_OPER_TIME_HEATING),
@@ -792,6 +1445,7 @@ class ThermiaHeatPump:
         )
 
     @property
+    @data_source("group_operational_time")
     def hot_water_operational_time(self):
         return get_dict_value_or_none(
             self.__get_operational_time_data_by_register_name(REG_OPER_TIME_HOT_WATER),
@@ -799,6 +1453,7 @@ class ThermiaHeatPump:
         )
 
     @property
+    @data_source("group_operational_time")
     def auxiliary_heater_1_operational_time(self):
         return get_dict_value_or_none(
             self.__get_operational_time_data_by_register_name(REG_OPER_TIME_IMM1),
@@ -806,6 +1461,7 @@ class ThermiaHeatPump:
         )
 
     @property
+    @data_source("group_operational_time")
     def auxiliary_heater_2_operational_time(self):
         return get_dict_value_or_none(
             self.__get_operational_time_data_by_register_name(REG_OPER_TIME_IMM2),
@@ -813,6 +1469,7 @@ class ThermiaHeatPump:
         )
 
     @property
+    @data_source("group_operational_time")
     def auxiliary_heater_3_operational_time(self):
         return get_dict_value_or_none(
             self.__get_operational_time_data_by_register_name(REG_OPER_TIME_IMM3),
@@ -824,6 +1481,7 @@ class ThermiaHeatPump:
     ###########################################################################
 
     @property
+    @data_source("group_operational_operation")
     def operation_mode(self):
         if self.__group_operational_operation is not None:
             return get_dict_value_or_none(self.__group_operational_operation, "current")
@@ -833,6 +1491,7 @@ class ThermiaHeatPump:
         )
 
     @property
+    @data_source("group_operational_operation")
     def available_operation_modes(self):
         if self.__group_operational_operation is not None:
             return list(
@@ -848,6 +1507,7 @@ class ThermiaHeatPump:
         )
 
     @property
+    @data_source("group_operational_operation")
     def available_operation_mode_map(self):
         if self.__group_operational_operation is not None:
             return get_dict_value_or_default(
@@ -859,6 +1519,7 @@ class ThermiaHeatPump:
         )
 
     @property
+    @data_source("group_operational_operation")
     def is_operation_mode_read_only(self):
         if self.__group_operational_operation is not None:
             return get_dict_value_or_none(
@@ -875,10 +1536,12 @@ class ThermiaHeatPump:
     ###########################################################################
 
     @property
+    @data_source("group_hot_water")
     def hot_water_switch_state(self) -> Optional[int]:
         return self.__group_hot_water["hot_water_switch"]
 
     @property
+    @data_source("group_hot_water")
     def hot_water_boost_switch_state(self) -> Optional[int]:
         return self.__group_hot_water["hot_water_boost_switch"]
 
@@ -887,15 +1550,18 @@ class ThermiaHeatPump:
     ###########################################################################
 
     @property
+    @data_source("alarms")
     def active_alarm_count(self):
-        active_alarms = self.__get_active_alarms()
-        return len(list(active_alarms))
+        return self.__alarm_index.active_alarm_count
 
     @property
+    @data_source("alarms")
     def active_alarms(self):
-        active_alarms = self.__get_active_alarms()
-        active_alarm_texts = map(lambda alarm: alarm.get("eventTitle"), active_alarms)
-        return list(active_alarm_texts)
+        return self.__alarm_index.active_alarm_titles
+
+    @property
+    def alarm_history(self) -> List[dict]:
+        return self.__alarm_index.events
 
     ###########################################################################
     # Historical data
@@ -909,19 +1575,360 @@ class ThermiaHeatPump:
         return list((self.__historical_data_registers_map or {}).keys())
 
     def get_historical_data_for_register(
-        self, register_name, start_date: datetime, end_date: datetime
+        self,
+        register_name,
+        start_date: datetime,
+        end_date: datetime,
+        chunk_size: Optional[timedelta] = HISTORICAL_DATA_CHUNK_SIZE,
+        max_parallel_requests: int = HISTORICAL_DATA_MAX_PARALLEL_REQUESTS,
     ):
-        if self.__historical_data_registers_map is None:
-            self.__set_historical_data_registers()
+        historical_data = self.get_historical_data_columns_for_register(
+            register_name, start_date, end_date, chunk_size, max_parallel_requests
+        )
 
-        register_id = get_dict_value_or_none(
-            self.__historical_data_registers_map, register_name
+        if historical_data is None:
+            return None
+
+        return historical_data.to_list()
+
+    def get_historical_data_columns_for_register(
+        self,
+        register_name,
+        start_date: datetime,
+        end_date: datetime,
+        chunk_size: Optional[timedelta] = HISTORICAL_DATA_CHUNK_SIZE,
+        max_parallel_requests: int = HISTORICAL_DATA_MAX_PARALLEL_REQUESTS,
+    ) -> Optional[HistoricalDataColumns]:
+        register_id = self.__get_historical_data_register_id(register_name)
+
+        if register_id is None:
+            self._LOGGER.error("Register name is not supported: " + str(register_name))
+            return None
+
+        if self.__historical_data_store is not None:
+            self.__sync_historical_data_store(
+                register_id, start_date, end_date, chunk_size, max_parallel_requests
+            )
+
+            return HistoricalDataColumns.from_rows(
+                self.__historical_data_store.get_data(
+                    self.__device_id,
+                    register_id,
+                    datetime_to_timestamp(start_date),
+                    datetime_to_timestamp(end_date),
+                )
+            )
+
+        # Long periods are split into chunks that are fetched in parallel
+        chunks_data = fetch_time_chunks(
+            lambda chunk_start, chunk_end: self.__get_historical_data_entries(
+                register_id, chunk_start, chunk_end
+            ),
+            plan_time_chunks(start_date, end_date, chunk_size),
+            max_parallel_requests,
+        )
+
+        return HistoricalDataColumns.from_entries(
+            merge_historical_data_chunks(chunks_data)
         )
 
+    def iter_historical_data_for_register(
+        self,
+        register_name,
+        start_date: datetime,
+        end_date: datetime,
+        chunk_size: Optional[timedelta] = HISTORICAL_DATA_CHUNK_SIZE,
+    ) -> Iterator[Dict]:
+        for historical_data in self.iter_historical_data_batches_for_register(
+            register_name, start_date, end_date, chunk_size
+        ):
+            yield from historical_data.to_list()
+
+    def iter_historical_data_batches_for_register(
+        self,
+        register_name,
+        start_date: datetime,
+        end_date: datetime,
+        chunk_size: Optional[timedelta] = HISTORICAL_DATA_CHUNK_SIZE,
+        skip_failed_chunks: bool = True,
+    ) -> Iterator[HistoricalDataColumns]:
+        register_id = self.__get_historical_data_register_id(register_name)
+
+        if register_id is None:
+            self._LOGGER.error("Register name is not supported: " + str(register_name))
+            return
+
+        # Chunks are fetched one at a time, so only one chunk is kept in memory
+        last_at = None
+
+        for chunk in plan_time_chunks(start_date, end_date, chunk_size):
+            chunk_data = fetch_time_chunks(
+                lambda chunk_start, chunk_end: self.__get_historical_data_entries(
+                    register_id, chunk_start, chunk_end
+                ),
+                [chunk],
+                1,
+            )[0]
+
+            if chunk_data is None and not skip_failed_chunks:
+                raise NetworkException(
+                    "Error fetching historical data for period "
+                    + str(chunk[0])
+                    + " - "
+                    + str(chunk[1])
+                )
+
+            if not chunk_data:
+                continue
+
+            if last_at is not None:
+                # Chunk edges overlap, drop entries that were already yielded
+                chunk_data = [entry for entry in chunk_data if entry["at"] > last_at]
+
+                if len(chunk_data) == 0:
+                    continue
+
+            last_at = chunk_data[-1]["at"]
+
+            yield HistoricalDataColumns.from_entries(chunk_data)
+
+    def get_historical_data_for_registers(
+        self,
+        register_names: List[str],
+        start_date: datetime,
+        end_date: datetime,
+        chunk_size: Optional[timedelta] = HISTORICAL_DATA_CHUNK_SIZE,
+        max_parallel_requests: int = HISTORICAL_DATA_MAX_PARALLEL_REQUESTS,
+    ) -> Optional[HistoricalDataTable]:
+        for register_name in register_names:
+            if self.__get_historical_data_register_id(register_name) is None:
+                self._LOGGER.error(
+                    "Register name is not supported: " + str(register_name)
+                )
+                return None
+
+        if len(register_names) == 0:
+            return HistoricalDataTable.from_columns({})
+
+        # Registers are fetched in parallel, so the parallel requests are shared between them
+        max_parallel_requests_per_register = max(
+            1, max_parallel_requests // len(register_names)
+        )
+
+        with ThreadPoolExecutor(
+            max_workers=min(max_parallel_requests, len(register_names))
+        ) as executor:
+            futures = {
+                register_name: executor.submit(
+                    self.get_historical_data_columns_for_register,
+                    register_name,
+                    start_date,
+                    end_date,
+                    chunk_size,
+                    max_parallel_requests_per_register,
+                )
+                for register_name in register_names
+            }
+
+            return HistoricalDataTable.from_columns(
+                {
+                    register_name: future.result()
+                    for register_name, future in futures.items()
+                }
+            )
+
+    def get_historical_data_rollup_for_register(
+        self,
+        register_name,
+        start_date: datetime,
+        end_date: datetime,
+        bucket_size: timedelta = HISTORICAL_DATA_ROLLUP_BUCKET_SIZE,
+        chunk_size: Optional[timedelta] = HISTORICAL_DATA_CHUNK_SIZE,
+        max_parallel_requests: int = HISTORICAL_DATA_MAX_PARALLEL_REQUESTS,
+    ) -> Optional[HistoricalDataRollup]:
+        bucket_seconds = int(bucket_size.total_seconds())
+
+        if self.__historical_data_store is None:
+            historical_data = self.get_historical_data_columns_for_register(
+                register_name, start_date, end_date, chunk_size, max_parallel_requests
+            )
+
+            if historical_data is None:
+                return None
+
+            return HistoricalDataRollup.from_columns(historical_data, bucket_seconds)
+
+        register_id = self.__get_historical_data_register_id(register_name)
+
         if register_id is None:
             self._LOGGER.error("Register name is not supported: " + str(register_name))
             return None
 
+        self.__sync_historical_data_store(
+            register_id, start_date, end_date, chunk_size, max_parallel_requests
+        )
+
+        return HistoricalDataRollup.from_rows(
+            bucket_seconds,
+            self.__get_rollup_rows_from_store(
+                register_id,
+                datetime_to_timestamp(start_date),
+                datetime_to_timestamp(end_date),
+                bucket_seconds,
+            ),
+        )
+
+    def __get_rollup_rows_from_store(
+        self, register_id: int, start: int, end: int, bucket_size: int
+    ) -> List[RollupRow]:
+        store = self.__historical_data_store
+
+        # Buckets completely inside the period can be materialized in the store
+        first_full_bucket_start = -(-start // bucket_size) * bucket_size
+        full_bucket_starts = range(
+            first_full_bucket_start, end - bucket_size + 2, bucket_size
+        )
+
+        materialized_rows = (
+            store.get_rollups(
+                self.__device_id,
+                register_id,
+                bucket_size,
+                full_bucket_starts[0],
+                full_bucket_starts[-1],
+            )
+            if len(full_bucket_starts) > 0
+            else {}
+        )
+
+        # Raw data is needed for partial buckets at the period edges and for
+        # full buckets that are not materialized yet
+        raw_data_ranges = []
+        if start < first_full_bucket_start:
+            raw_data_ranges.append((start, min(first_full_bucket_start - 1, end)))
+
+        for bucket_start in full_bucket_starts:
+            if bucket_start not in materialized_rows:
+                raw_data_ranges.append((bucket_start, bucket_start + bucket_size - 1))
+
+        full_buckets_end = (
+            first_full_bucket_start + len(full_bucket_starts) * bucket_size
+        )
+        if full_buckets_end <= end:
+            raw_data_ranges.append((max(full_buckets_end, start), end))
+
+        if len(raw_data_ranges) == 0:
+            return sorted(materialized_rows.values())
+
+        # Merge adjacent ranges to reduce the number of queries
+        merged_raw_data_ranges = [raw_data_ranges[0]]
+        for range_start, range_end in raw_data_ranges[1:]:
+            if merged_raw_data_ranges[-1][1] + 1 == range_start:
+                merged_raw_data_ranges[-1] = (merged_raw_data_ranges[-1][0], range_end)
+            else:
+                merged_raw_data_ranges.append((range_start, range_end))
+
+        calculated_rows: Dict[int, RollupRow] = {}
+        for range_start, range_end in merged_raw_data_ranges:
+            for row in calculate_rollup_rows(
+                HistoricalDataColumns.from_rows(
+                    store.get_data(
+                        self.__device_id, register_id, range_start, range_end
+                    )
+                ),
+                bucket_size,
+            ):
+                calculated_rows[row[0]] = row
+
+        # Only buckets that are completely fetched can be materialized
+        missing_ranges = store.get_missing_ranges(
+            self.__device_id, register_id, start, end
+        )
+        rows_to_materialize = [
+            get_dict_value_or_default(
+                calculated_rows, bucket_start, (bucket_start, None, None, 0.0, 0, None)
+            )
+            for bucket_start in full_bucket_starts
+            if bucket_start not in materialized_rows
+            and not any(
+                missing_start <= bucket_start + bucket_size - 1
+                and missing_end >= bucket_start
+                for missing_start, missing_end in missing_ranges
+            )
+        ]
+        store.add_rollups(
+            self.__device_id, register_id, bucket_size, rows_to_materialize
+        )
+
+        return sorted({**materialized_rows, **calculated_rows}.values())
+
+    def __get_historical_data_register_id(self, register_name) -> Optional[int]:
+        if self.__historical_data_registers_map is None:
+            self.__set_historical_data_registers()
+
+        return get_dict_value_or_none(
+            self.__historical_data_registers_map, register_name
+        )
+
+    def __sync_historical_data_store(
+        self,
+        register_id: int,
+        start_date: datetime,
+        end_date: datetime,
+        chunk_size: Optional[timedelta],
+        max_parallel_requests: int,
+    ):
+        missing_ranges = self.__historical_data_store.get_missing_ranges(
+            self.__device_id,
+            register_id,
+            datetime_to_timestamp(start_date),
+            datetime_to_timestamp(end_date),
+        )
+
+        chunks = []
+        for range_start, range_end in missing_ranges:
+            chunks.extend(
+                plan_time_chunks(
+                    timestamp_to_datetime(range_start),
+                    timestamp_to_datetime(range_end),
+                    chunk_size,
+                )
+            )
+
+        if len(chunks) == 0:
+            return
+
+        chunks_data = fetch_time_chunks(
+            lambda chunk_start, chunk_end: self.__get_historical_data_entries(
+                register_id, chunk_start, chunk_end
+            ),
+            chunks,
+            max_parallel_requests,
+        )
+
+        # The most recent data might not be available yet, so it is never marked as fetched
+        settled_timestamp = datetime_to_timestamp(
+            datetime.now() - HISTORICAL_DATA_STORE_SETTLE_TIME
+        )
+
+        for (chunk_start, chunk_end), chunk_data in zip(chunks, chunks_data):
+            if chunk_data is None:
+                continue
+
+            self.__historical_data_store.add_data(
+                self.__device_id,
+                register_id,
+                datetime_to_timestamp(chunk_start),
+                min(datetime_to_timestamp(chunk_end), settled_timestamp),
+                [
+                    (parse_historical_data_timestamp(entry["at"]), entry["val"])
+                    for entry in chunk_data
+                ],
+            )
+
+    def __get_historical_data_entries(
+        self, register_id: int, start_date: datetime, end_date: datetime
+    ) -> Optional[list]:
         historical_data = self.__api_interface.get_historical_data(
             self.__device_id,
             register_id,
@@ -929,20 +1936,155 @@ class ThermiaHeatPump:
             end_date.strftime(DATETIME_FORMAT),
         )
 
-        if historical_data is None or historical_data.get("data") is None:
-            return []
+        if historical_data is None:
+            return None
 
-        return list(
-            map(
-                lambda entry: {
-                    "time": datetime.strptime(
-                        entry["at"].split(".")[0], DATETIME_FORMAT
-                    ),
-                    "value": int(entry["val"]),
-                },
-                historical_data["data"],
-            )
+        return historical_data.get("data") or []
+
+    ###########################################################################
+    # Snapshot
+    ###########################################################################
+
+    def snapshot(self) -> Dict[str, Any]:
+        snapshot = {}
+
+        for property_name in SNAPSHOT_PROPERTIES:
+            value = getattr(self, property_name)
+            # Copy lists so that the snapshot does not change with next updates
+            snapshot[property_name] = list(value) if isinstance(value, list) else value
+
+        return snapshot
+
+    ###########################################################################
+    # State
+    ###########################################################################
+
+    def to_state(self) -> Dict[str, Any]:
+        """
+        Return JSON serializable state, from which the heat pump can be
+        restored without any requests by passing it as state to the constructor.
+        """
+        return {
+            "info": self.__info,
+            "status": self.__status,
+            "device_data": self.__device_data,
+            "group_temperatures": self.__group_temperatures,
+            "group_operational_status": self.__group_operational_status,
+            "group_operational_time": self.__group_operational_time,
+            "group_operational_operation": _operation_mode_to_state(
+                self.__group_operational_operation
+            ),
+            "group_operational_operation_read_only": _operation_mode_to_state(
+                self.__group_operational_operation_read_only
+            ),
+            "group_hot_water": self.__group_hot_water,
+            "alarms": self.__alarms,
+            "alarm_history": self.__alarm_index.events,
+            "historical_data_registers": self.__historical_data_registers_map,
+            "device_config": self.__device_config,
+            "register_indexes": self.__register_indexes,
+        }
+
+    def __restore_state(self, state: Dict[str, Any]):
+        self.__info = state["info"]
+        self.__status = state["status"]
+        self.__device_data = state["device_data"]
+
+        self.__group_temperatures = state["group_temperatures"]
+        self.__group_operational_status = state["group_operational_status"]
+        self.__group_operational_time = state["group_operational_time"]
+        self.__group_operational_operation = _operation_mode_from_state(
+            state["group_operational_operation"]
         )
+        self.__group_operational_operation_read_only = _operation_mode_from_state(
+            state["group_operational_operation_read_only"]
+        )
+        self.__group_hot_water = state["group_hot_water"]
+
+        self.__alarms = state["alarms"]
+        self.__alarm_index.update_events(state["alarm_history"])
+        if self.__alarms is not None:
+            self.__alarm_index.update_active_alarms(self.__alarms)
+
+        self.__historical_data_registers_map = state["historical_data_registers"]
+        self.__device_config = dict(state["device_config"])
+        self.__register_indexes = dict(state["register_indexes"])
+
+        self.__precalculate_operational_status_data()
+
+        # Restored data is served until the next update_data()
+        self.__is_data_stale = True
+
+    ###########################################################################
+    # Watch
+    ###########################################################################
+
+    async def watch(
+        self,
+        interval: timedelta = DEFAULT_POLLING_INTERVAL,
+        polling_policy: Optional["AdaptivePollingPolicy"] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Update data every interval and yield a snapshot after each update.
+        If polling_policy is given, it chooses the interval after each update.
+        """
+        async for _ in polling_ticks(
+            interval
+            if polling_policy is None
+            else lambda: polling_policy.get_interval(self)
+        ):
+            yield await asyncio.to_thread(self.__update_data_and_snapshot)
+
+    def __update_data_and_snapshot(self) -> Dict[str, Any]:
+        self.update_data()
+        return self.snapshot()
+
+    ###########################################################################
+    # Change subscriptions
+    ###########################################################################
+
+    def subscribe(
+        self, callback: Callable[["ThermiaHeatPump", List[PropertyChange]], None]
+    ) -> None:
+        """
+        Call callback with the list of changed snapshot properties after
+        each update_data() that changed any of them.
+        """
+        with self.__update_lock:
+            if len(self.__subscribers) == 0:
+                self.__subscribers_snapshot = self.snapshot()
+
+            self.__subscribers.append(callback)
+
+    def unsubscribe(
+        self, callback: Callable[["ThermiaHeatPump", List[PropertyChange]], None]
+    ) -> None:
+        with self.__update_lock:
+            if callback in self.__subscribers:
+                self.__subscribers.remove(callback)
+
+            if len(self.__subscribers) == 0:
+                self.__subscribers_snapshot = None
+
+    def __notify_subscribers(self):
+        snapshot = self.snapshot()
+        previous_snapshot = self.__subscribers_snapshot or {}
+        self.__subscribers_snapshot = snapshot
+
+        changes = [
+            PropertyChange(property_name, previous_snapshot.get(property_name), value)
+            for property_name, value in snapshot.items()
+            if previous_snapshot.get(property_name) != value
+        ]
+
+        if len(changes) == 0:
+            return
+
+        for callback in list(self.__subscribers):
+            try:
+                callback(self, changes)
+            except Exception as e:
+                self._LOGGER.error("Error in change subscriber: " + str(e))
 
     ###########################################################################
     # Print debug data
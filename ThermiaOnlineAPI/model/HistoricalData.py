@@ -0,0 +1,292 @@
+from array import array
+from datetime import timedelta
+import heapq
+import math
+from typing import Dict, List, Tuple, Union
+
+from ..utils.historical_data import EPOCH, parse_historical_data_timestamp
+
+try:
+    import numpy
+except ImportError:  # NumPy is an optional dependency
+    numpy = None
+
+
+def create_timestamp_column(timestamps, length: int):
+    if numpy is not None:
+        return numpy.fromiter(timestamps, dtype=numpy.int64, count=length)
+
+    return array("q", timestamps)
+
+
+def create_value_column(values, length: int):
+    if numpy is not None:
+        return numpy.fromiter(values, dtype=numpy.float64, count=length)
+
+    return array("d", values)
+
+
+class HistoricalDataColumns:
+    """
+    Historical data of a single register in columnar format.
+
+    `timestamps` are integer seconds since epoch (naive API datetimes are
+    treated as UTC) and `values` are floats. Columns are NumPy arrays if
+    NumPy is installed, `array.array` otherwise.
+    """
+
+    def __init__(self, timestamps, values):
+        self.timestamps = timestamps
+        self.values = values
+
+    @classmethod
+    def from_entries(cls, entries: List[Dict]) -> "HistoricalDataColumns":
+        """
+        Create columns from raw API entries in format `{ "at": str, "val": number }`
+        """
+        return cls(
+            create_timestamp_column(
+                (parse_historical_data_timestamp(entry["at"]) for entry in entries),
+                len(entries),
+            ),
+            create_value_column(
+                (float(entry["val"]) for entry in entries), len(entries)
+            ),
+        )
+
+    @classmethod
+    def from_rows(
+        cls, rows: List[Tuple[int, Union[int, float]]]
+    ) -> "HistoricalDataColumns":
+        return cls(
+            create_timestamp_column((row[0] for row in rows), len(rows)),
+            create_value_column((row[1] for row in rows), len(rows)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def to_list(self) -> List[Dict]:
+        """
+        Convert to list of dictionaries in format `{ "time": datetime, "value": int }`
+        """
+        return [
+            {"time": EPOCH + timedelta(seconds=int(timestamp)), "value": int(value)}
+            for timestamp, value in zip(self.timestamps, self.values)
+        ]
+
+
+class HistoricalDataTable:
+    """
+    Historical data of multiple registers aligned by time.
+
+    `timestamps` is a shared, sorted timestamp column and `columns` maps
+    register names to value columns of the same length, NaN where a register
+    has no data point for the timestamp.
+    """
+
+    def __init__(self, timestamps, columns: Dict[str, object]):
+        self.timestamps = timestamps
+        self.columns = columns
+
+    @classmethod
+    def from_columns(
+        cls, columns_by_register: Dict[str, HistoricalDataColumns]
+    ) -> "HistoricalDataTable":
+        if numpy is not None:
+            return cls.__from_columns_numpy(columns_by_register)
+
+        # Merge sorted timestamp columns into a single sorted column without duplicates
+        timestamps = array("q")
+        for timestamp in heapq.merge(
+            *(columns.timestamps for columns in columns_by_register.values())
+        ):
+            if len(timestamps) == 0 or timestamps[-1] != timestamp:
+                timestamps.append(timestamp)
+
+        # Sorted-merge join of each register with the shared timestamp column
+        aligned_columns = {}
+        for register_name, columns in columns_by_register.items():
+            aligned_values = array("d", [math.nan]) * len(timestamps)
+            index = 0
+
+            for timestamp, value in zip(columns.timestamps, columns.values):
+                while timestamps[index] < timestamp:
+                    index += 1
+                aligned_values[index] = value
+
+            aligned_columns[register_name] = aligned_values
+
+        return cls(timestamps, aligned_columns)
+
+    @classmethod
+    def __from_columns_numpy(
+        cls, columns_by_register: Dict[str, HistoricalDataColumns]
+    ) -> "HistoricalDataTable":
+        timestamps = numpy.unique(
+            numpy.concatenate(
+                [numpy.empty(0, dtype=numpy.int64)]
+                + [columns.timestamps for columns in columns_by_register.values()]
+            )
+        )
+
+        aligned_columns = {}
+        for register_name, columns in columns_by_register.items():
+            aligned_values = numpy.full(len(timestamps), numpy.nan)
+            aligned_values[numpy.searchsorted(timestamps, columns.timestamps)] = (
+                columns.values
+            )
+            aligned_columns[register_name] = aligned_values
+
+        return cls(timestamps, aligned_columns)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def to_list(self) -> List[Dict]:
+        """
+        Convert to list of dictionaries in format `{ "time": datetime, <register name>: float or None, ... }`
+        """
+        return [
+            {
+                "time": EPOCH + timedelta(seconds=int(timestamp)),
+                **{
+                    register_name: (
+                        None if math.isnan(values[index]) else float(values[index])
+                    )
+                    for register_name, values in self.columns.items()
+                },
+            }
+            for index, timestamp in enumerate(self.timestamps)
+        ]
+
+
+# (bucket start, min, max, sum, count, last)
+RollupRow = Tuple[int, float, float, float, int, float]
+
+
+def calculate_rollup_rows(
+    columns: HistoricalDataColumns, bucket_size: int
+) -> List[RollupRow]:
+    """
+    Aggregate sorted columns into buckets of bucket_size seconds, aligned to
+    multiples of bucket_size since epoch. Buckets without data are left out.
+    """
+    if len(columns) == 0:
+        return []
+
+    if numpy is not None:
+        timestamps = numpy.asarray(columns.timestamps)
+        values = numpy.asarray(columns.values, dtype=numpy.float64)
+
+        bucket_starts = timestamps // bucket_size * bucket_size
+        boundaries = numpy.flatnonzero(numpy.diff(bucket_starts)) + 1
+        first_indexes = numpy.concatenate(([0], boundaries))
+        last_indexes = numpy.concatenate((boundaries, [len(values)])) - 1
+
+        return list(
+            zip(
+                bucket_starts[first_indexes].tolist(),
+                numpy.minimum.reduceat(values, first_indexes).tolist(),
+                numpy.maximum.reduceat(values, first_indexes).tolist(),
+                numpy.add.reduceat(values, first_indexes).tolist(),
+                (last_indexes - first_indexes + 1).tolist(),
+                values[last_indexes].tolist(),
+            )
+        )
+
+    # Single streaming pass over the data
+    rows = []
+    bucket_start = None
+
+    for timestamp, value in zip(columns.timestamps, columns.values):
+        if bucket_start != timestamp // bucket_size * bucket_size:
+            if bucket_start is not None:
+                rows.append(
+                    (bucket_start, min_value, max_value, sum_value, count, last_value)
+                )
+
+            bucket_start = timestamp // bucket_size * bucket_size
+            min_value = max_value = value
+            sum_value = 0.0
+            count = 0
+
+        min_value = min(min_value, value)
+        max_value = max(max_value, value)
+        sum_value += value
+        count += 1
+        last_value = value
+
+    rows.append((bucket_start, min_value, max_value, sum_value, count, last_value))
+
+    return rows
+
+
+class HistoricalDataRollup:
+    """
+    Time-bucketed aggregates of historical data of a single register.
+
+    `bucket_starts` are timestamps in seconds of the bucket starts, `min`,
+    `max`, `mean` and `last` are value columns and `count` is the number of
+    data points in each bucket. Only buckets with data are included.
+    """
+
+    def __init__(
+        self,
+        bucket_size: int,
+        bucket_starts,
+        min_values,
+        max_values,
+        mean_values,
+        last_values,
+        counts,
+    ):
+        self.bucket_size = bucket_size
+        self.bucket_starts = bucket_starts
+        self.min = min_values
+        self.max = max_values
+        self.mean = mean_values
+        self.last = last_values
+        self.count = counts
+
+    @classmethod
+    def from_columns(
+        cls, columns: HistoricalDataColumns, bucket_size: int
+    ) -> "HistoricalDataRollup":
+        return cls.from_rows(bucket_size, calculate_rollup_rows(columns, bucket_size))
+
+    @classmethod
+    def from_rows(
+        cls, bucket_size: int, rows: List[RollupRow]
+    ) -> "HistoricalDataRollup":
+        rows = [row for row in rows if row[4] > 0]
+
+        return cls(
+            bucket_size,
+            create_timestamp_column((row[0] for row in rows), len(rows)),
+            create_value_column((row[1] for row in rows), len(rows)),
+            create_value_column((row[2] for row in rows), len(rows)),
+            create_value_column((row[3] / row[4] for row in rows), len(rows)),
+            create_value_column((row[5] for row in rows), len(rows)),
+            create_timestamp_column((row[4] for row in rows), len(rows)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.bucket_starts)
+
+    def to_list(self) -> List[Dict]:
+        """
+        Convert to list of dictionaries in format
+        `{ "time": datetime, "min": float, "max": float, "mean": float, "last": float, "count": int }`
+        """
+        return [
+            {
+                "time": EPOCH + timedelta(seconds=int(self.bucket_starts[index])),
+                "min": float(self.min[index]),
+                "max": float(self.max[index]),
+                "mean": float(self.mean[index]),
+                "last": float(self.last[index]),
+                "count": int(self.count[index]),
+            }
+            for index in range(len(self))
+        ]
@@ -0,0 +1,337 @@
+import asyncio
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import logging
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from ..const import DEFAULT_POLLING_INTERVAL, DEFAULT_SERVER_HOST, DEFAULT_SERVER_PORT
+from ..exceptions.NetworkException import NetworkException
+from ..utils.polling import polling_ticks
+
+if TYPE_CHECKING:
+    from .. import Thermia
+    from ..model.HeatPump import ThermiaHeatPump
+
+_LOGGER = logging.getLogger(__name__)
+
+# Write commands by path, mapped to the heat pump method that performs them
+WRITE_COMMANDS = {
+    "temperature": "set_temperature",
+    "operation_mode": "set_operation_mode",
+    "hot_water_switch_state": "set_hot_water_switch_state",
+    "hot_water_boost_switch_state": "set_hot_water_boost_switch_state",
+}
+
+
+class ThermiaServerError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class ThermiaServer:
+    """
+    Poll heat pumps of one or more Thermia clients on a schedule and serve
+    their cached snapshots, historical data and write commands to local
+    clients over HTTP/JSON, so that the Thermia API sees a single poller.
+    """
+
+    def __init__(
+        self,
+        thermia_clients: List["Thermia"],
+        host: str = DEFAULT_SERVER_HOST,
+        port: int = DEFAULT_SERVER_PORT,
+        polling_interval: timedelta = DEFAULT_POLLING_INTERVAL,
+    ):
+        self.__polling_interval = polling_interval
+
+        self.__heat_pumps: Dict[str, "ThermiaHeatPump"] = {}
+        for thermia in thermia_clients:
+            for heat_pump in thermia.heat_pumps:
+                self.__heat_pumps[str(heat_pump.id)] = heat_pump
+
+        # Heat pumps are not thread safe, so updates and writes of a heat pump are serialized
+        self.__heat_pump_locks: Dict[str, threading.Lock] = {
+            heat_pump_id: threading.Lock() for heat_pump_id in self.__heat_pumps
+        }
+        self.__snapshots: Dict[str, Dict[str, Any]] = {}
+        self.__snapshots_lock = threading.Lock()
+
+        for heat_pump_id, heat_pump in self.__heat_pumps.items():
+            self.__set_snapshot(heat_pump_id, heat_pump.snapshot())
+
+        self.__http_server = ThreadingHTTPServer((host, port), _ThermiaRequestHandler)
+        self.__http_server.daemon_threads = True
+        setattr(self.__http_server, "thermia_server", self)
+
+        self.__polling_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.__polling_task: Optional[asyncio.Task] = None
+        self.__threads: List[threading.Thread] = []
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.__http_server.server_address[:2]
+
+    def start(self) -> None:
+        """Start polling and serving requests in background threads."""
+        self.__polling_loop = asyncio.new_event_loop()
+        self.__threads = [
+            threading.Thread(target=self.__run_polling, daemon=True),
+            threading.Thread(target=self.__http_server.serve_forever, daemon=True),
+        ]
+        for thread in self.__threads:
+            thread.start()
+
+    def serve_forever(self) -> None:
+        self.start()
+        try:
+            for thread in self.__threads:
+                thread.join()
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        if len(self.__threads) > 0:
+            self.__http_server.shutdown()
+        self.__http_server.server_close()
+
+        if self.__polling_loop is not None and self.__polling_task is not None:
+            self.__polling_loop.call_soon_threadsafe(self.__polling_task.cancel)
+
+        for thread in self.__threads:
+            thread.join()
+        self.__threads = []
+
+    ###########################################################################
+    # Polling
+    ###########################################################################
+
+    def __run_polling(self):
+        asyncio.set_event_loop(self.__polling_loop)
+        self.__polling_task = self.__polling_loop.create_task(self.__poll())
+
+        try:
+            self.__polling_loop.run_until_complete(self.__polling_task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.__polling_loop.close()
+
+    async def __poll(self):
+        # The first tick is immediate, but heat pumps were just fetched
+        ticks = polling_ticks(self.__polling_interval)
+        await ticks.__anext__()
+
+        try:
+            async for _ in ticks:
+                await asyncio.gather(
+                    *[
+                        asyncio.to_thread(self.__update_heat_pump, heat_pump_id)
+                        for heat_pump_id in self.__heat_pumps
+                    ]
+                )
+        finally:
+            await ticks.aclose()
+
+    def __update_heat_pump(self, heat_pump_id: str):
+        try:
+            with self.__heat_pump_locks[heat_pump_id]:
+                heat_pump = self.__heat_pumps[heat_pump_id]
+                heat_pump.update_data()
+                self.__set_snapshot(heat_pump_id, heat_pump.snapshot())
+        except Exception as e:
+            _LOGGER.error(
+                "Error updating heat pump " + heat_pump_id + " data: " + str(e)
+            )
+
+    def __set_snapshot(self, heat_pump_id: str, snapshot: Dict[str, Any]):
+        with self.__snapshots_lock:
+            self.__snapshots[heat_pump_id] = {
+                "updated_at": datetime.now().isoformat(),
+                "snapshot": snapshot,
+            }
+
+    ###########################################################################
+    # Request handling
+    ###########################################################################
+
+    def get_heat_pumps(self) -> List[Dict[str, Any]]:
+        with self.__snapshots_lock:
+            return [
+                {
+                    "id": heat_pump_id,
+                    "name": data["snapshot"]["name"],
+                    "model": data["snapshot"]["model"],
+                    "updated_at": data["updated_at"],
+                }
+                for heat_pump_id, data in self.__snapshots.items()
+            ]
+
+    def get_snapshot(self, heat_pump_id: str) -> Dict[str, Any]:
+        self.__get_heat_pump(heat_pump_id)
+
+        with self.__snapshots_lock:
+            return self.__snapshots[heat_pump_id]
+
+    def get_historical_data(
+        self, heat_pump_id: str, query: Dict[str, List[str]]
+    ) -> Dict[str, Any]:
+        heat_pump = self.__get_heat_pump(heat_pump_id)
+
+        try:
+            register_name = query["register"][0]
+            start_date = datetime.fromisoformat(query["start"][0])
+            end_date = datetime.fromisoformat(query["end"][0])
+        except (KeyError, ValueError):
+            raise ThermiaServerError(
+                400, "Query parameters register, start and end (ISO 8601) are required"
+            )
+
+        # Not serialized with updates, as historical data is not part of heat pump data
+        historical_data = heat_pump.get_historical_data_columns_for_register(
+            register_name, start_date, end_date
+        )
+
+        if historical_data is None:
+            raise ThermiaServerError(404, "Unknown register: " + register_name)
+
+        return {
+            "register": register_name,
+            "timestamps": [int(timestamp) for timestamp in historical_data.timestamps],
+            "values": [float(value) for value in historical_data.values],
+        }
+
+    def write(self, heat_pump_id: str, command: str, body: Any) -> Dict[str, Any]:
+        heat_pump = self.__get_heat_pump(heat_pump_id)
+
+        if command not in WRITE_COMMANDS:
+            raise ThermiaServerError(404, "Unknown command: " + command)
+
+        if not isinstance(body, dict) or "value" not in body:
+            raise ThermiaServerError(400, 'Request body must be {"value": ...}')
+
+        value = body["value"]
+
+        with self.__heat_pump_locks[heat_pump_id]:
+            self.__validate_write(heat_pump, command, value)
+
+            # Setters update the heat pump data after writing
+            is_written = getattr(heat_pump, WRITE_COMMANDS[command])(value)
+            self.__set_snapshot(heat_pump_id, heat_pump.snapshot())
+
+        if not is_written:
+            raise ThermiaServerError(502, "Writing " + command + " failed")
+
+        return self.get_snapshot(heat_pump_id)
+
+    def __validate_write(self, heat_pump: "ThermiaHeatPump", command: str, value):
+        if command == "operation_mode":
+            if heat_pump.is_operation_mode_read_only:
+                raise ThermiaServerError(400, "Operation mode is read only")
+            if value not in (heat_pump.available_operation_modes or []):
+                raise ThermiaServerError(
+                    400,
+                    "Operation mode must be one of: "
+                    + ", ".join(heat_pump.available_operation_modes or []),
+                )
+            return
+
+        # bool is a subclass of int, but true/false are not valid register values
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise ThermiaServerError(400, command + " value must be an integer")
+
+        if command == "temperature":
+            min_value = heat_pump.heat_min_temperature_value
+            max_value = heat_pump.heat_max_temperature_value
+
+            if (min_value is not None and value < min_value) or (
+                max_value is not None and value > max_value
+            ):
+                raise ThermiaServerError(
+                    400,
+                    "Temperature must be between "
+                    + str(min_value)
+                    + " and "
+                    + str(max_value),
+                )
+            return
+
+        if value not in [0, 1]:
+            raise ThermiaServerError(400, command + " value must be 0 or 1")
+
+        if getattr(heat_pump, command) is None:
+            raise ThermiaServerError(400, command + " is not available")
+
+    def __get_heat_pump(self, heat_pump_id: str) -> "ThermiaHeatPump":
+        heat_pump = self.__heat_pumps.get(heat_pump_id)
+
+        if heat_pump is None:
+            raise ThermiaServerError(404, "Unknown heat pump: " + heat_pump_id)
+
+        return heat_pump
+
+
+class _ThermiaRequestHandler(BaseHTTPRequestHandler):
+    # GET /heat_pumps
+    # GET /heat_pumps/<id>
+    # GET /heat_pumps/<id>/historical_data?register=<name>&start=<ISO>&end=<ISO>
+    # POST /heat_pumps/<id>/<command> with body {"value": ...}
+
+    def do_GET(self):
+        self.__handle(self.__get)
+
+    def do_POST(self):
+        self.__handle(self.__post)
+
+    def __get(self, thermia_server: ThermiaServer, path: List[str], query):
+        if path == ["heat_pumps"]:
+            return thermia_server.get_heat_pumps()
+
+        if len(path) == 2 and path[0] == "heat_pumps":
+            return thermia_server.get_snapshot(path[1])
+
+        if len(path) == 3 and path[0] == "heat_pumps" and path[2] == "historical_data":
+            return thermia_server.get_historical_data(path[1], query)
+
+        raise ThermiaServerError(404, "Not found")
+
+    def __post(self, thermia_server: ThermiaServer, path: List[str], query):
+        if len(path) != 3 or path[0] != "heat_pumps":
+            raise ThermiaServerError(404, "Not found")
+
+        try:
+            content_length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(content_length) or b"null")
+        except ValueError:
+            raise ThermiaServerError(400, "Request body is not valid JSON")
+
+        return thermia_server.write(path[1], path[2], body)
+
+    def __handle(self, handler):
+        url = urlparse(self.path)
+        path = [part for part in url.path.split("/") if part]
+
+        try:
+            status = 200
+            data = handler(self.server.thermia_server, path, parse_qs(url.query))
+        except ThermiaServerError as e:
+            status, data = e.status, {"error": str(e)}
+        except NetworkException as e:
+            status, data = 502, {"error": str(e)}
+        except Exception as e:
+            _LOGGER.error("Error handling request " + self.path + ": " + str(e))
+            status, data = 500, {"error": "Internal server error"}
+
+        response = json.dumps(data, default=str).encode()
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, format, *args):
+        _LOGGER.debug(format % args)
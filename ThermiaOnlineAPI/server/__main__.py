@@ -0,0 +1,74 @@
+import argparse
+from datetime import timedelta
+import json
+import logging
+
+from .. import Thermia
+from ..const import DEFAULT_POLLING_INTERVAL, DEFAULT_SERVER_HOST, DEFAULT_SERVER_PORT
+from ..store.HistoricalDataStore import HistoricalDataStore
+from ..store.InstallationProfileCache import InstallationProfileCache
+from .ThermiaServer import ThermiaServer
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve Thermia heat pump data to local clients over HTTP/JSON"
+    )
+    parser.add_argument(
+        "--accounts",
+        required=True,
+        help='JSON file with a list of {"username": ..., "password": ...} accounts',
+    )
+    parser.add_argument("--host", default=DEFAULT_SERVER_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_SERVER_PORT)
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=DEFAULT_POLLING_INTERVAL.total_seconds(),
+        help="Polling interval in seconds",
+    )
+    parser.add_argument(
+        "--historical-data-store", help="SQLite file to cache historical data in"
+    )
+    parser.add_argument(
+        "--installation-profile-cache",
+        help="JSON file to persist the installation profile cache in",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    with open(args.accounts, "r") as accounts_file:
+        accounts = json.load(accounts_file)
+
+    historical_data_store = (
+        HistoricalDataStore(args.historical_data_store)
+        if args.historical_data_store
+        else None
+    )
+    # Shared by all accounts, as heat pumps of the same model can belong to different accounts
+    installation_profile_cache = InstallationProfileCache(
+        args.installation_profile_cache
+    )
+
+    thermia_clients = [
+        Thermia(
+            account["username"],
+            account["password"],
+            historical_data_store=historical_data_store,
+            installation_profile_cache=installation_profile_cache,
+        )
+        for account in accounts
+    ]
+
+    server = ThermiaServer(
+        thermia_clients,
+        host=args.host,
+        port=args.port,
+        polling_interval=timedelta(seconds=args.interval),
+    )
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+from datetime import datetime, timedelta
+import logging
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from ..model.HistoricalData import RollupRow
+from ..utils.historical_data import datetime_to_timestamp
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class HistoricalDataStore:
+    """
+    Local SQLite store for historical data, keyed by heat pump id and register id.
+    Timestamps are stored as integer seconds, time ranges that are already
+    fetched are kept so that only missing ranges have to be fetched again.
+    """
+
+    def __init__(self, database_path: str = ":memory:"):
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(database_path, check_same_thread=False)
+
+        with self.__lock, self.__connection:
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS historical_data ("
+                "device_id TEXT NOT NULL, register_id INTEGER NOT NULL, "
+                "at INTEGER NOT NULL, value REAL NOT NULL, "
+                "PRIMARY KEY (device_id, register_id, at))"
+            )
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS historical_data_ranges ("
+                "device_id TEXT NOT NULL, register_id INTEGER NOT NULL, "
+                "range_start INTEGER NOT NULL, range_end INTEGER NOT NULL)"
+            )
+            self.__connection.execute(
+                "CREATE INDEX IF NOT EXISTS historical_data_ranges_index "
+                "ON historical_data_ranges (device_id, register_id, range_start)"
+            )
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS historical_data_rollups ("
+                "device_id TEXT NOT NULL, register_id INTEGER NOT NULL, "
+                "bucket_size INTEGER NOT NULL, bucket_start INTEGER NOT NULL, "
+                "min_value REAL, max_value REAL, sum_value REAL NOT NULL, "
+                "count INTEGER NOT NULL, last_value REAL, "
+                "PRIMARY KEY (device_id, register_id, bucket_size, bucket_start))"
+            )
+
+    def get_missing_ranges(
+        self, device_id: str, register_id: int, start: int, end: int
+    ) -> List[Tuple[int, int]]:
+        with self.__lock:
+            cached_ranges = self.__connection.execute(
+                "SELECT range_start, range_end FROM historical_data_ranges "
+                "WHERE device_id = ? AND register_id = ? "
+                "AND range_end >= ? AND range_start <= ? ORDER BY range_start",
+                (device_id, register_id, start, end),
+            ).fetchall()
+
+        if start == end:
+            return [] if cached_ranges else [(start, end)]
+
+        missing_ranges = []
+        cursor = start
+
+        for range_start, range_end in cached_ranges:
+            if range_start > cursor:
+                missing_ranges.append((cursor, range_start))
+            cursor = max(cursor, range_end)
+
+        if cursor < end:
+            missing_ranges.append((cursor, end))
+
+        return missing_ranges
+
+    def add_data(
+        self,
+        device_id: str,
+        register_id: int,
+        start: int,
+        end: int,
+        data: List[Tuple[int, float]],
+    ):
+        """
+        Store data points and mark the range from start to end as fetched.
+        If end is before start, data points are stored but no range is marked.
+        """
+        with self.__lock, self.__connection:
+            self.__connection.executemany(
+                "INSERT OR REPLACE INTO historical_data VALUES (?, ?, ?, ?)",
+                ((device_id, register_id, at, value) for at, value in data),
+            )
+
+            if len(data) > 0:
+                # Rollups of buckets with new data points are no longer valid
+                self.__connection.execute(
+                    "DELETE FROM historical_data_rollups "
+                    "WHERE device_id = ? AND register_id = ? "
+                    "AND bucket_start <= ? AND bucket_start + bucket_size > ?",
+                    (
+                        device_id,
+                        register_id,
+                        max(at for at, _ in data),
+                        min(at for at, _ in data),
+                    ),
+                )
+
+            if end < start:
+                return
+
+            # Merge with overlapping and adjacent ranges
+            overlapping_ranges = self.__connection.execute(
+                "SELECT range_start, range_end FROM historical_data_ranges "
+                "WHERE device_id = ? AND register_id = ? "
+                "AND range_end >= ? AND range_start <= ?",
+                (device_id, register_id, start, end),
+            ).fetchall()
+
+            for range_start, range_end in overlapping_ranges:
+                start = min(start, range_start)
+                end = max(end, range_end)
+
+            self.__connection.execute(
+                "DELETE FROM historical_data_ranges "
+                "WHERE device_id = ? AND register_id = ? "
+                "AND range_start >= ? AND range_end <= ?",
+                (device_id, register_id, start, end),
+            )
+            self.__connection.execute(
+                "INSERT INTO historical_data_ranges VALUES (?, ?, ?, ?)",
+                (device_id, register_id, start, end),
+            )
+
+    def get_data(
+        self, device_id: str, register_id: int, start: int, end: int
+    ) -> List[Tuple[int, float]]:
+        with self.__lock:
+            return self.__connection.execute(
+                "SELECT at, value FROM historical_data "
+                "WHERE device_id = ? AND register_id = ? AND at >= ? AND at <= ? "
+                "ORDER BY at",
+                (device_id, register_id, start, end),
+            ).fetchall()
+
+    def get_rollups(
+        self,
+        device_id: str,
+        register_id: int,
+        bucket_size: int,
+        first_bucket_start: int,
+        last_bucket_start: int,
+    ) -> Dict[int, RollupRow]:
+        """
+        Get materialized rollups by bucket start, including buckets without data points.
+        """
+        with self.__lock:
+            rows = self.__connection.execute(
+                "SELECT bucket_start, min_value, max_value, sum_value, count, "
+                "last_value FROM historical_data_rollups "
+                "WHERE device_id = ? AND register_id = ? AND bucket_size = ? "
+                "AND bucket_start >= ? AND bucket_start <= ?",
+                (
+                    device_id,
+                    register_id,
+                    bucket_size,
+                    first_bucket_start,
+                    last_bucket_start,
+                ),
+            ).fetchall()
+
+        return {row[0]: row for row in rows}
+
+    def add_rollups(
+        self,
+        device_id: str,
+        register_id: int,
+        bucket_size: int,
+        rows: List[RollupRow],
+    ):
+        """
+        Materialize rollups of complete buckets, rows are in format
+        (bucket start, min, max, sum, count, last).
+        """
+        with self.__lock, self.__connection:
+            self.__connection.executemany(
+                "INSERT OR REPLACE INTO historical_data_rollups "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                ((device_id, register_id, bucket_size, *row) for row in rows),
+            )
+
+    def prune(self, retention: timedelta, now: Optional[datetime] = None):
+        """
+        Remove data points and fetched ranges older than the retention period.
+        """
+        cutoff = datetime_to_timestamp((now or datetime.now()) - retention)
+
+        with self.__lock, self.__connection:
+            removed_count = self.__connection.execute(
+                "DELETE FROM historical_data WHERE at < ?", (cutoff,)
+            ).rowcount
+            self.__connection.execute(
+                "DELETE FROM historical_data_ranges WHERE range_end < ?", (cutoff,)
+            )
+            self.__connection.execute(
+                "UPDATE historical_data_ranges SET range_start = ? "
+                "WHERE range_start < ?",
+                (cutoff, cutoff),
+            )
+            self.__connection.execute(
+                "DELETE FROM historical_data_rollups WHERE bucket_start < ?",
+                (cutoff,),
+            )
+
+        _LOGGER.info("Pruned " + str(removed_count) + " historical data points")
+
+    def close(self):
+        with self.__lock:
+            self.__connection.close()
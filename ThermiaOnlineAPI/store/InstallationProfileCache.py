@@ -0,0 +1,60 @@
+from datetime import timedelta
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from ..const import INSTALLATION_PROFILE_CACHE_TTL
+from ..utils.utils import load_json_file, save_json_file
+
+
+class InstallationProfileCache:
+    """
+    Cache for data that is the same for all heat pumps of an installation
+    profile (model), like the historical data register map. Entries expire
+    after ttl. When file_path is given, the cache is persisted as a JSON
+    file, so that it is reused after restarts.
+    """
+
+    def __init__(
+        self,
+        file_path: Optional[str] = None,
+        ttl: timedelta = INSTALLATION_PROFILE_CACHE_TTL,
+    ):
+        self.__file_path = file_path
+        self.__ttl = ttl.total_seconds()
+        self.__lock = threading.Lock()
+
+        # {installation profile id: {key: {"value": ..., "updated_at": ...}}}
+        self.__data: Dict[str, Dict[str, Dict[str, Any]]] = (
+            load_json_file(file_path, {}) if file_path is not None else {}
+        )
+
+    def get(
+        self, installation_profile_id, key: str, ttl: Optional[timedelta] = None
+    ) -> Optional[Any]:
+        with self.__lock:
+            entry = self.__data.get(str(installation_profile_id), {}).get(key)
+
+        max_age = self.__ttl if ttl is None else ttl.total_seconds()
+
+        if entry is None or time.time() - entry["updated_at"] > max_age:
+            return None
+
+        return entry["value"]
+
+    def set(self, installation_profile_id, key: str, value: Any) -> None:
+        with self.__lock:
+            self.__data.setdefault(str(installation_profile_id), {})[key] = {
+                "value": value,
+                "updated_at": time.time(),
+            }
+
+            if self.__file_path is not None:
+                save_json_file(self.__file_path, self.__data)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__data = {}
+
+            if self.__file_path is not None:
+                save_json_file(self.__file_path, self.__data)
@@ -0,0 +1,333 @@
+from datetime import datetime
+import logging
+import math
+import mmap
+import os
+import struct
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from ..const import SHARED_SNAPSHOT_VERSION
+
+if TYPE_CHECKING:
+    from ..model.HeatPump import ThermiaHeatPump
+
+_LOGGER = logging.getLogger(__name__)
+
+SHARED_SNAPSHOT_MAGIC = b"THSS"
+# Maximum length of heat pump ids in bytes
+SHARED_SNAPSHOT_ID_SIZE = 64
+# Reads retried this many times while a record is being written
+SHARED_SNAPSHOT_MAX_READ_ATTEMPTS = 1000
+
+# Snapshot properties stored in records: (name, struct format, kind). Floats
+# and integers use NaN and -1 for None, texts and lists are UTF-8 encoded and
+# truncated to the field size, lists are comma separated.
+SHARED_SNAPSHOT_FIELDS: List[Tuple[str, str, str]] = [
+    ("is_online", "b", "flag"),
+    ("is_data_stale", "b", "flag"),
+    ("is_hot_water_active", "b", "flag"),
+    ("indoor_temperature", "d", "float"),
+    ("outdoor_temperature", "d", "float"),
+    ("hot_water_temperature", "d", "float"),
+    ("heat_temperature", "d", "float"),
+    ("supply_line_temperature", "d", "float"),
+    ("desired_supply_line_temperature", "d", "float"),
+    ("buffer_tank_temperature", "d", "float"),
+    ("return_line_temperature", "d", "float"),
+    ("brine_out_temperature", "d", "float"),
+    ("brine_in_temperature", "d", "float"),
+    ("pool_temperature", "d", "float"),
+    ("cooling_tank_temperature", "d", "float"),
+    ("cooling_supply_line_temperature", "d", "float"),
+    ("compressor_operational_time", "d", "float"),
+    ("heating_operational_time", "d", "float"),
+    ("hot_water_operational_time", "d", "float"),
+    ("hot_water_switch_state", "i", "int"),
+    ("hot_water_boost_switch_state", "i", "int"),
+    ("active_alarm_count", "i", "int"),
+    ("operation_mode", "32s", "text"),
+    ("running_operational_statuses", "256s", "list"),
+    ("running_power_statuses", "128s", "list"),
+]
+
+# File header: magic, layout version, record count, record size
+_HEADER = struct.Struct("<4sIII")
+# Record: sequence, then updated at timestamp, heat pump id and fields
+_SEQUENCE = struct.Struct("<Q")
+_RECORD_DATA = struct.Struct(
+    "<d"
+    + str(SHARED_SNAPSHOT_ID_SIZE)
+    + "s"
+    + "".join(field_format for _, field_format, _ in SHARED_SNAPSHOT_FIELDS)
+)
+_RECORD = struct.Struct("<Q" + _RECORD_DATA.format[1:])
+
+
+def _get_field_offsets() -> Dict[str, Tuple[int, struct.Struct, str]]:
+    field_offsets = {}
+    offset = _SEQUENCE.size + struct.calcsize("<d" + str(SHARED_SNAPSHOT_ID_SIZE) + "s")
+
+    for name, field_format, kind in SHARED_SNAPSHOT_FIELDS:
+        field_struct = struct.Struct("<" + field_format)
+        field_offsets[name] = (offset, field_struct, kind)
+        offset += field_struct.size
+
+    return field_offsets
+
+
+_FIELD_OFFSETS = _get_field_offsets()
+
+
+def _encode_value(value: Any, field_format: str, kind: str) -> Any:
+    if kind == "float":
+        return math.nan if value is None else float(value)
+
+    if kind in ["flag", "int"]:
+        return -1 if value is None else int(value)
+
+    if kind == "list":
+        value = ",".join(value) if value else None
+
+    # struct pads with zero bytes, truncating must not split a character
+    encoded_value = (value or "").encode()[: int(field_format[:-1])]
+    return encoded_value.decode(errors="ignore").encode()
+
+
+def _decode_value(value: Any, kind: str) -> Any:
+    if kind == "float":
+        return None if math.isnan(value) else value
+
+    if kind in ["flag", "int"]:
+        if value == -1:
+            return None
+        return bool(value) if kind == "flag" else value
+
+    text = value.rstrip(b"\0").decode()
+
+    if kind == "list":
+        return text.split(",") if text else []
+
+    return text or None
+
+
+class SharedSnapshotWriter:
+    """
+    Write heat pump snapshots into fixed layout records of a memory mapped
+    file, which other processes on the same host read with
+    SharedSnapshotReader without any requests.
+
+    Each record is guarded by a sequence number (seqlock), which is odd
+    while the record is being written, so readers can detect and retry torn
+    reads. There must be only one writer per file. A recreated writer
+    replaces the file with a new one, which readers detect and reopen.
+    """
+
+    def __init__(self, file_path: str, heat_pump_ids: List[str]):
+        self.__record_indexes = {
+            str(heat_pump_id): index for index, heat_pump_id in enumerate(heat_pump_ids)
+        }
+
+        size = _HEADER.size + len(heat_pump_ids) * _RECORD.size
+
+        # File mapped by readers is not truncated, but replaced once initialized
+        temporary_file_path = file_path + ".tmp"
+        with open(temporary_file_path, "w+b") as file:
+            file.truncate(size)
+            self.__mmap = mmap.mmap(file.fileno(), size)
+
+        for heat_pump_id, index in self.__record_indexes.items():
+            # Records without data have sequence 0
+            _RECORD.pack_into(
+                self.__mmap,
+                self.__get_record_offset(index),
+                0,
+                0.0,
+                heat_pump_id.encode(),
+                *[
+                    _encode_value(None, field_format, kind)
+                    for _, field_format, kind in SHARED_SNAPSHOT_FIELDS
+                ],
+            )
+
+        # Header is written last, so readers do not open half initialized files
+        _HEADER.pack_into(
+            self.__mmap,
+            0,
+            SHARED_SNAPSHOT_MAGIC,
+            SHARED_SNAPSHOT_VERSION,
+            len(heat_pump_ids),
+            _RECORD.size,
+        )
+
+        os.replace(temporary_file_path, file_path)
+
+    def write(self, heat_pump: "ThermiaHeatPump") -> None:
+        self.write_snapshot(str(heat_pump.id), heat_pump.snapshot())
+
+    def write_snapshot(self, heat_pump_id: str, snapshot: Dict[str, Any]) -> None:
+        index = self.__record_indexes.get(str(heat_pump_id))
+
+        if index is None:
+            _LOGGER.error("Unknown heat pump id: " + str(heat_pump_id))
+            return
+
+        offset = self.__get_record_offset(index)
+        (sequence,) = _SEQUENCE.unpack_from(self.__mmap, offset)
+
+        _SEQUENCE.pack_into(self.__mmap, offset, sequence + 1)
+        _RECORD_DATA.pack_into(
+            self.__mmap,
+            offset + _SEQUENCE.size,
+            time.time(),
+            str(heat_pump_id).encode(),
+            *[
+                _encode_value(snapshot.get(name), field_format, kind)
+                for name, field_format, kind in SHARED_SNAPSHOT_FIELDS
+            ],
+        )
+        _SEQUENCE.pack_into(self.__mmap, offset, sequence + 2)
+
+    def close(self) -> None:
+        self.__mmap.close()
+
+    def __get_record_offset(self, index: int) -> int:
+        return _HEADER.size + index * _RECORD.size
+
+
+class SharedSnapshotReader:
+    """
+    Read heat pump snapshots written by SharedSnapshotWriter. Values are
+    unpacked directly from the shared memory, and reads are retried while
+    the writer is updating the record. The file is reopened when a
+    recreated writer has replaced it.
+    """
+
+    def __init__(self, file_path: str):
+        self.__file_path = file_path
+        self.__open()
+
+    def __open(self):
+        with open(self.__file_path, "rb") as file:
+            file_stat = os.fstat(file.fileno())
+            file_mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, record_count, record_size = _HEADER.unpack_from(file_mmap, 0)
+
+        if magic != SHARED_SNAPSHOT_MAGIC or version != SHARED_SNAPSHOT_VERSION:
+            file_mmap.close()
+            raise ValueError("Unsupported shared snapshot file: " + self.__file_path)
+
+        record_offsets: Dict[str, int] = {}
+        for index in range(record_count):
+            offset = _HEADER.size + index * record_size
+            heat_pump_id = _decode_value(
+                _RECORD.unpack_from(file_mmap, offset)[2], "text"
+            )
+            record_offsets[heat_pump_id] = offset
+
+        self.__mmap = file_mmap
+        self.__file_id = (file_stat.st_dev, file_stat.st_ino)
+        self.__record_offsets = record_offsets
+
+    def __reopen_if_replaced(self):
+        try:
+            file_stat = os.stat(self.__file_path)
+        except OSError:
+            return
+
+        if (file_stat.st_dev, file_stat.st_ino) == self.__file_id:
+            return
+
+        previous_mmap = self.__mmap
+        self.__open()
+        previous_mmap.close()
+
+    @property
+    def heat_pump_ids(self) -> List[str]:
+        self.__reopen_if_replaced()
+        return list(self.__record_offsets.keys())
+
+    def get_generation(self, heat_pump_id: str) -> Optional[int]:
+        """
+        Return the number of snapshots written for the heat pump, which can
+        be compared to the last read generation to detect new data cheaply.
+        """
+        self.__reopen_if_replaced()
+        offset = self.__record_offsets.get(str(heat_pump_id))
+
+        if offset is None:
+            return None
+
+        (sequence,) = _SEQUENCE.unpack_from(self.__mmap, offset)
+        return sequence // 2
+
+    def read(self, heat_pump_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Return all stored snapshot properties of the heat pump together with
+        generation and updated_at, or None if no snapshot was written yet.
+        """
+        values = self.__read_consistent(
+            heat_pump_id, lambda offset: _RECORD.unpack_from(self.__mmap, offset)
+        )
+
+        if values is None:
+            return None
+
+        generation, values = values
+        snapshot: Dict[str, Any] = {
+            "generation": generation,
+            "updated_at": datetime.fromtimestamp(values[1]),
+        }
+        for (name, _, kind), value in zip(SHARED_SNAPSHOT_FIELDS, values[3:]):
+            snapshot[name] = _decode_value(value, kind)
+
+        return snapshot
+
+    def read_value(self, heat_pump_id: str, name: str) -> Any:
+        """Return a single snapshot property of the heat pump."""
+        field_offset, field_struct, kind = _FIELD_OFFSETS[name]
+
+        value = self.__read_consistent(
+            heat_pump_id,
+            lambda offset: field_struct.unpack_from(self.__mmap, offset + field_offset)[
+                0
+            ],
+        )
+
+        if value is None:
+            return None
+
+        return _decode_value(value[1], kind)
+
+    def close(self) -> None:
+        self.__mmap.close()
+
+    def __read_consistent(self, heat_pump_id: str, read) -> Optional[Tuple[int, Any]]:
+        self.__reopen_if_replaced()
+        offset = self.__record_offsets.get(str(heat_pump_id))
+
+        if offset is None:
+            _LOGGER.error("Unknown heat pump id: " + str(heat_pump_id))
+            return None
+
+        for _ in range(SHARED_SNAPSHOT_MAX_READ_ATTEMPTS):
+            (sequence,) = _SEQUENCE.unpack_from(self.__mmap, offset)
+
+            if sequence == 0:
+                return None
+
+            if sequence % 2 == 1:
+                # Writer is updating the record
+                time.sleep(0)
+                continue
+
+            value = read(offset)
+
+            if _SEQUENCE.unpack_from(self.__mmap, offset)[0] == sequence:
+                return sequence // 2, value
+
+        _LOGGER.error(
+            "Could not read consistent snapshot of heat pump " + str(heat_pump_id)
+        )
+        return None
@@ -1,6 +1,8 @@
 from datetime import datetime, timedelta
 import os
+import re
 from typing import List
+from urllib.parse import parse_qs, urlparse
 
 from .utils import match_lists_in_any_order, parse_debug_file
 
@@ -78,6 +80,59 @@ def __mock_data_requests(requests_mock, test_data_file: str):
         f"{THERMIA_TEST_URL}/api/v1/installation/test-id/events?onlyActiveAlarms=false",
         json=[],
     )
+    requests_mock.get(
+        f"{THERMIA_TEST_URL}/api/v1/installation/test-id/events?onlyActiveAlarms=true",
+        json=[],
+    )
+
+
+HISTORICAL_DATA_REGISTERS = {
+    "REG_OUTDOOR_TEMPERATURE": (1, timedelta(hours=12)),
+    "REG_SUPPLY_LINE": (2, timedelta(hours=8)),
+}
+
+
+def mock_historical_data_requests(requests_mock):
+    requests_mock.get(
+        f"{THERMIA_TEST_URL}/api/v1/DataHistory/installation/test-id",
+        json={
+            "registers": [
+                {"registerId": register_data[0], "registerName": register_name}
+                for register_name, register_data in HISTORICAL_DATA_REGISTERS.items()
+            ]
+        },
+    )
+
+    for register_id, interval in HISTORICAL_DATA_REGISTERS.values():
+
+        def historical_data(request, context, interval=interval):
+            # One data point every interval, both period ends included
+            query = parse_qs(urlparse(request.url).query)
+            period_start = datetime.fromisoformat(query["periodStart"][0])
+            period_end = datetime.fromisoformat(query["periodEnd"][0])
+
+            data = []
+            at = datetime(period_start.year, period_start.month, period_start.day)
+            while at <= period_end:
+                if at >= period_start:
+                    data.append({"at": at.isoformat() + ".000", "val": at.hour})
+                at += interval
+
+            return {"data": data}
+
+        requests_mock.get(
+            re.compile(
+                f"{THERMIA_TEST_URL}/api/v1/datahistory/installation/test-id/register/{register_id}/minute"
+            ),
+            json=historical_data,
+        )
+
+
+def setup_thermia(requests_mock, test_data_file: str, **thermia_kwargs) -> Thermia:
+    __mock_auth_requests(requests_mock)
+    __mock_data_requests(requests_mock, test_data_file)
+
+    return Thermia("username", "password", **thermia_kwargs)
 
 
 def setup_thermia_and_perform_basic_tests(
@@ -91,10 +146,7 @@ def setup_thermia_and_perform_basic_tests(
     expected_is_operation_mode_read_only: bool = False,
     expected_operational_status_pid_value: int | None = None,
 ) -> ThermiaHeatPump:
-    __mock_auth_requests(requests_mock)
-    __mock_data_requests(requests_mock, test_data_file)
-
-    thermia = Thermia("username", "password")
+    thermia = setup_thermia(requests_mock, test_data_file)
 
     assert thermia.connected == True
 
@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta
+import time
+
+import pytest
+
+from .setup import mock_historical_data_requests, setup_thermia
+from ..backfill.HistoricalDataBackfill import HistoricalDataBackfill
+from ..store.HistoricalDataStore import HistoricalDataStore
+from ..utils.historical_data import datetime_to_timestamp
+
+
+def test_backfill_resumes_from_checkpoint(requests_mock, tmp_path):
+    thermia = setup_thermia(requests_mock, "ncp_1024.txt")
+    mock_historical_data_requests(requests_mock)
+
+    checkpoint_file_path = str(tmp_path / "checkpoint.txt")
+    start_date = datetime(2024, 1, 1)
+    end_date = datetime(2024, 1, 4)
+
+    saved_work_units = []
+
+    def on_data(work_unit, columns):
+        if len(saved_work_units) == 2:
+            raise RuntimeError("Crash")
+        saved_work_units.append(work_unit)
+
+    backfill = HistoricalDataBackfill(
+        thermia.api_interface,
+        checkpoint_file_path,
+        on_data=on_data,
+        max_parallel_requests=1,
+        max_requests_per_second=None,
+    )
+
+    work_units = backfill.plan(start_date, end_date)
+
+    # 2 registers, 3 daily chunks each
+    assert len(work_units) == 6
+    assert work_units[0].end + 1 == work_units[1].start
+
+    with pytest.raises(RuntimeError):
+        backfill.run(start_date, end_date)
+
+    store = HistoricalDataStore()
+    backfill = HistoricalDataBackfill(
+        thermia.api_interface,
+        checkpoint_file_path,
+        historical_data_store=store,
+        max_requests_per_second=None,
+    )
+
+    assert backfill.run(start_date, end_date) == {
+        "total": 6,
+        "skipped": 2,
+        "completed": 4,
+        "failed": 0,
+    }
+    assert backfill.run(start_date, end_date)["skipped"] == 6
+
+    start = datetime_to_timestamp(start_date)
+    end = datetime_to_timestamp(end_date)
+
+    assert store.get_missing_ranges("test-id", 1, start, end) == [
+        (work_units[0].start, work_units[2].start)
+    ]
+    assert len(store.get_data("test-id", 2, start, end)) == 10
+
+
+def test_backfill_error_cancels_pending_work_units(requests_mock, tmp_path):
+    thermia = setup_thermia(requests_mock, "ncp_1024.txt")
+    mock_historical_data_requests(requests_mock)
+
+    handled_work_units = []
+
+    def on_data(work_unit, columns):
+        handled_work_units.append(work_unit)
+        if len(handled_work_units) == 1:
+            raise RuntimeError("Crash")
+        # Gives run() time to cancel the pending work units
+        time.sleep(0.2)
+
+    backfill = HistoricalDataBackfill(
+        thermia.api_interface,
+        str(tmp_path / "checkpoint.txt"),
+        on_data=on_data,
+        max_parallel_requests=1,
+        max_requests_per_second=None,
+    )
+
+    with pytest.raises(RuntimeError):
+        backfill.run(datetime(2024, 1, 1), datetime(2024, 1, 4))
+
+    # Only the failed work unit and the one already running were started
+    assert len(handled_work_units) <= 2
+
+
+def test_backfill_does_not_complete_unsettled_data(requests_mock, tmp_path):
+    thermia = setup_thermia(requests_mock, "ncp_1024.txt")
+    mock_historical_data_requests(requests_mock)
+
+    end_date = datetime.now()
+    start_date = end_date - timedelta(hours=12)
+
+    store = HistoricalDataStore()
+    backfill = HistoricalDataBackfill(
+        thermia.api_interface,
+        str(tmp_path / "checkpoint.txt"),
+        historical_data_store=store,
+        max_requests_per_second=None,
+    )
+
+    register_names = ["REG_SUPPLY_LINE"]
+
+    assert (
+        backfill.run(start_date, end_date, register_names=register_names)["completed"]
+        == 1
+    )
+    # Unit ending within the settle time is not checkpointed and its last hour stays missing
+    assert (
+        backfill.run(start_date, end_date, register_names=register_names)["skipped"]
+        == 0
+    )
+    missing_ranges = store.get_missing_ranges(
+        "test-id",
+        2,
+        datetime_to_timestamp(start_date),
+        datetime_to_timestamp(end_date),
+    )
+    assert len(missing_ranges) == 1
+    assert missing_ranges[0][1] == datetime_to_timestamp(end_date)
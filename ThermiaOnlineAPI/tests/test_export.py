@@ -0,0 +1,110 @@
+import csv
+from datetime import datetime
+import os
+import re
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from .setup import THERMIA_TEST_URL, mock_historical_data_requests, setup_thermia
+from ..exceptions.NetworkException import NetworkException
+from ..export import ExportWriter
+from ..export.DataExporter import DataExporter
+from ..utils.historical_data import datetime_to_timestamp
+
+
+def test_export_historical_data_resumes_from_checkpoint(requests_mock, tmp_path):
+    thermia = setup_thermia(requests_mock, "ncp_1024.txt")
+    mock_historical_data_requests(requests_mock)
+
+    exporter = DataExporter(str(tmp_path), "csv")
+    exporter.export_historical_data(
+        thermia,
+        datetime(2024, 1, 1),
+        datetime(2024, 1, 2),
+        register_names=["REG_OUTDOOR_TEMPERATURE"],
+    )
+
+    # New exporter continues from the checkpoint saved by the previous one
+    exporter = DataExporter(str(tmp_path), "csv")
+    exporter.export_historical_data(
+        thermia,
+        datetime(2024, 1, 1),
+        datetime(2024, 1, 3),
+        register_names=["REG_OUTDOOR_TEMPERATURE"],
+    )
+
+    directory = tmp_path / "historical" / "test-id" / "REG_OUTDOOR_TEMPERATURE"
+    timestamps = []
+    for file_name in sorted(os.listdir(directory)):
+        with open(directory / file_name) as file:
+            timestamps.extend(int(row["timestamp"]) for row in csv.DictReader(file))
+
+    assert timestamps == [
+        datetime_to_timestamp(datetime(2024, 1, 1)),
+        datetime_to_timestamp(datetime(2024, 1, 1, 12)),
+        datetime_to_timestamp(datetime(2024, 1, 2)),
+        datetime_to_timestamp(datetime(2024, 1, 2, 12)),
+        datetime_to_timestamp(datetime(2024, 1, 3)),
+    ]
+    assert exporter.get_checkpoint(
+        "test-id", "REG_OUTDOOR_TEMPERATURE"
+    ) == datetime_to_timestamp(datetime(2024, 1, 3))
+
+
+def test_export_historical_data_discards_partial_file_on_error(requests_mock, tmp_path):
+    thermia = setup_thermia(requests_mock, "ncp_1024.txt")
+    mock_historical_data_requests(requests_mock)
+
+    failed_chunk_start = datetime(2024, 1, 2)
+    historical_data_url = re.compile(
+        f"{THERMIA_TEST_URL}/api/v1/datahistory/installation/test-id/register/.*/minute"
+    )
+    chunk_responses = {
+        datetime(2024, 1, 1): {"data": [{"at": "2024-01-01T00:00:00.000", "val": 1}]},
+        failed_chunk_start: {},
+    }
+
+    def historical_data(request, context):
+        query = parse_qs(urlparse(request.url).query)
+        period_start = datetime.fromisoformat(query["periodStart"][0])
+        if period_start == failed_chunk_start:
+            context.status_code = 403
+        return chunk_responses[period_start]
+
+    requests_mock.get(historical_data_url, json=historical_data)
+
+    exporter = DataExporter(str(tmp_path), "csv", row_group_size=1)
+    with pytest.raises(NetworkException):
+        exporter.export_historical_data(
+            thermia,
+            datetime(2024, 1, 1),
+            datetime(2024, 1, 3),
+            register_names=["REG_OUTDOOR_TEMPERATURE"],
+        )
+
+    directory = tmp_path / "historical" / "test-id" / "REG_OUTDOOR_TEMPERATURE"
+    assert os.listdir(directory) == []
+    assert exporter.get_checkpoint("test-id", "REG_OUTDOOR_TEMPERATURE") is None
+
+
+def test_export_writer_is_abstract():
+    with pytest.raises(TypeError):
+        ExportWriter.ExportWriter("file", 1)
+
+
+@pytest.mark.skipif(ExportWriter.pyarrow is None, reason="pyarrow is not installed")
+def test_export_snapshots_to_parquet(requests_mock, tmp_path):
+    thermia = setup_thermia(requests_mock, "ncp_1024.txt")
+
+    exporter = DataExporter(str(tmp_path), "parquet", row_group_size=2)
+    for _ in range(3):
+        exporter.export_snapshots(thermia)
+    exporter.close()
+
+    (file_name,) = os.listdir(tmp_path / "snapshots")
+    table = ExportWriter.pyarrow.parquet.read_table(tmp_path / "snapshots" / file_name)
+
+    assert table.num_rows == 3
+    assert table.column("id").to_pylist() == ["test-id"] * 3
+    assert table.column("model").to_pylist() == ["NCP 1024"] * 3
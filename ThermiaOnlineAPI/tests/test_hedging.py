@@ -0,0 +1,62 @@
+import itertools
+import threading
+import time
+
+from ..utils.hedging import HedgingPolicy
+
+
+def test_slow_request_is_hedged():
+    policy = HedgingPolicy(percentile=50, max_hedge_ratio=0.5, min_samples=3)
+
+    for _ in range(3):
+        assert policy.run(lambda: "fast") == "fast"
+
+    assert policy.get_hedge_delay() is not None
+
+    calls = itertools.count()
+    release_slow_request = threading.Event()
+
+    def request():
+        if next(calls) == 0:
+            release_slow_request.wait(5)
+            return "slow"
+        return "hedged"
+
+    start_time = time.monotonic()
+
+    assert policy.run(request) == "hedged"
+    assert time.monotonic() - start_time < 1
+
+    release_slow_request.set()
+
+
+def test_hedging_budget():
+    policy = HedgingPolicy(percentile=50, max_hedge_ratio=0, min_samples=1)
+    policy.run(lambda: None)
+
+    calls = itertools.count()
+
+    def request():
+        next(calls)
+        time.sleep(0.05)
+        return "slow"
+
+    assert policy.run(request) == "slow"
+    assert next(calls) == 1
+
+
+def test_requests_are_not_limited_by_hedging_pool():
+    policy = HedgingPolicy(min_samples=100, max_workers=1)
+
+    threads = [
+        threading.Thread(target=policy.run, args=(lambda: time.sleep(0.2),))
+        for _ in range(4)
+    ]
+
+    start_time = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert time.monotonic() - start_time < 0.6
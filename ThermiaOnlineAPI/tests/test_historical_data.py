@@ -0,0 +1,227 @@
+from datetime import datetime, timedelta
+
+from .setup import mock_historical_data_requests, setup_thermia
+from ..model import HistoricalData
+from ..model.HistoricalData import HistoricalDataColumns, HistoricalDataRollup
+from ..store.InstallationProfileCache import InstallationProfileCache
+from ..utils.historical_data import (
+    datetime_to_timestamp,
+    fetch_time_chunks,
+    merge_historical_data_chunks,
+    plan_time_chunks,
+)
+
+
+def test_plan_time_chunks():
+    start_date = datetime(2024, 1, 1)
+    end_date = datetime(2024, 1, 3, 12)
+
+    assert plan_time_chunks(start_date, end_date, timedelta(days=1)) == [
+        (datetime(2024, 1, 1), datetime(2024, 1, 2)),
+        (datetime(2024, 1, 2), datetime(2024, 1, 3)),
+        (datetime(2024, 1, 3), datetime(2024, 1, 3, 12)),
+    ]
+    assert plan_time_chunks(start_date, end_date, None) == [(start_date, end_date)]
+
+
+def test_fetch_time_chunks_retries_failed_chunks():
+    attempts = {}
+
+    def fetch_chunk(chunk_start, chunk_end):
+        attempts[chunk_start] = attempts.get(chunk_start, 0) + 1
+        if chunk_start.day == 2 and attempts[chunk_start] == 1:
+            raise Exception("Timeout")
+        return [chunk_start.day]
+
+    chunks = plan_time_chunks(
+        datetime(2024, 1, 1), datetime(2024, 1, 4), timedelta(days=1)
+    )
+
+    assert fetch_time_chunks(fetch_chunk, chunks, 4) == [[1], [2], [3]]
+    assert attempts[datetime(2024, 1, 2)] == 2
+
+
+def test_merge_historical_data_chunks_removes_duplicates_at_edges():
+    chunks_data = [
+        [
+            {"at": "2024-01-01T23:59:00", "val": 1},
+            {"at": "2024-01-02T00:00:00", "val": 2},
+        ],
+        None,
+        [
+            {"at": "2024-01-02T00:00:00", "val": 2},
+            {"at": "2024-01-02T00:01:00", "val": 3},
+        ],
+    ]
+
+    assert [entry["val"] for entry in merge_historical_data_chunks(chunks_data)] == [
+        1,
+        2,
+        3,
+    ]
+
+
+def test_get_historical_data_for_register_in_chunks(requests_mock):
+    thermia = setup_thermia(requests_mock, "ncp_1024.txt")
+    heat_pump = thermia.heat_pumps[0]
+
+    mock_historical_data_requests(requests_mock)
+
+    data = heat_pump.get_historical_data_for_register(
+        "REG_OUTDOOR_TEMPERATURE",
+        datetime(2024, 1, 1),
+        datetime(2024, 1, 3),
+        chunk_size=timedelta(days=1),
+    )
+
+    assert [entry["time"] for entry in data] == [
+        datetime(2024, 1, 1),
+        datetime(2024, 1, 1, 12),
+        datetime(2024, 1, 2),
+        datetime(2024, 1, 2, 12),
+        datetime(2024, 1, 3),
+    ]
+
+
+def test_historical_data_columns_from_entries(monkeypatch):
+    entries = [
+        {"at": "2024-01-01T00:00:00.123", "val": 5},
+        {"at": "2024-01-02T23:59:59", "val": -1.5},
+    ]
+
+    for numpy in [HistoricalData.numpy, None]:
+        monkeypatch.setattr(HistoricalData, "numpy", numpy)
+
+        columns = HistoricalDataColumns.from_entries(entries)
+
+        assert len(columns) == 2
+        assert list(columns.timestamps) == [
+            datetime_to_timestamp(datetime(2024, 1, 1)),
+            datetime_to_timestamp(datetime(2024, 1, 2, 23, 59, 59)),
+        ]
+        assert list(columns.values) == [5.0, -1.5]
+        assert columns.to_list() == [
+            {"time": datetime(2024, 1, 1), "value": 5},
+            {"time": datetime(2024, 1, 2, 23, 59, 59), "value": -1},
+        ]
+
+
+def test_get_historical_data_for_registers(requests_mock, monkeypatch):
+    thermia = setup_thermia(requests_mock, "ncp_1024.txt")
+    heat_pump = thermia.heat_pumps[0]
+
+    mock_historical_data_requests(requests_mock)
+
+    for numpy in [HistoricalData.numpy, None]:
+        monkeypatch.setattr(HistoricalData, "numpy", numpy)
+
+        data = heat_pump.get_historical_data_for_registers(
+            ["REG_OUTDOOR_TEMPERATURE", "REG_SUPPLY_LINE"],
+            datetime(2024, 1, 1),
+            datetime(2024, 1, 2),
+        )
+
+        assert data.to_list() == [
+            {
+                "time": datetime(2024, 1, 1, 0),
+                "REG_OUTDOOR_TEMPERATURE": 0,
+                "REG_SUPPLY_LINE": 0,
+            },
+            {
+                "time": datetime(2024, 1, 1, 8),
+                "REG_OUTDOOR_TEMPERATURE": None,
+                "REG_SUPPLY_LINE": 8,
+            },
+            {
+                "time": datetime(2024, 1, 1, 12),
+                "REG_OUTDOOR_TEMPERATURE": 12,
+                "REG_SUPPLY_LINE": None,
+            },
+            {
+                "time": datetime(2024, 1, 1, 16),
+                "REG_OUTDOOR_TEMPERATURE": None,
+                "REG_SUPPLY_LINE": 16,
+            },
+            {
+                "time": datetime(2024, 1, 2, 0),
+                "REG_OUTDOOR_TEMPERATURE": 0,
+                "REG_SUPPLY_LINE": 0,
+            },
+        ]
+
+
+def test_historical_data_rollup(monkeypatch):
+    columns = HistoricalDataColumns.from_rows(
+        [(0, 1), (1800, 3), (3600, 5), (10800, -1), (12000, 2)]
+    )
+
+    for numpy in [HistoricalData.numpy, None]:
+        monkeypatch.setattr(HistoricalData, "numpy", numpy)
+
+        rollup = HistoricalDataRollup.from_columns(columns, 3600)
+
+        assert list(rollup.bucket_starts) == [0, 3600, 10800]
+        assert list(rollup.min) == [1, 5, -1]
+        assert list(rollup.max) == [3, 5, 2]
+        assert list(rollup.mean) == [2, 5, 0.5]
+        assert list(rollup.last) == [3, 5, 2]
+        assert list(rollup.count) == [2, 1, 2]
+
+
+def test_iter_historical_data_batches_for_register(requests_mock):
+    thermia = setup_thermia(requests_mock, "ncp_1024.txt")
+    heat_pump = thermia.heat_pumps[0]
+
+    mock_historical_data_requests(requests_mock)
+
+    batches = heat_pump.iter_historical_data_batches_for_register(
+        "REG_OUTDOOR_TEMPERATURE",
+        datetime(2024, 1, 1),
+        datetime(2024, 1, 3),
+        chunk_size=timedelta(days=1),
+    )
+
+    assert [len(batch) for batch in batches] == [3, 2]
+    assert [
+        entry["time"]
+        for entry in heat_pump.iter_historical_data_for_register(
+            "REG_OUTDOOR_TEMPERATURE", datetime(2024, 1, 1), datetime(2024, 1, 2)
+        )
+    ] == [datetime(2024, 1, 1), datetime(2024, 1, 1, 12), datetime(2024, 1, 2)]
+
+
+def test_historical_data_registers_are_cached_per_installation_profile(
+    requests_mock, tmp_path
+):
+    cache_file_path = str(tmp_path / "installation_profiles.json")
+
+    thermia = setup_thermia(
+        requests_mock,
+        "ncp_1024.txt",
+        installation_profile_cache=InstallationProfileCache(cache_file_path),
+    )
+    mock_historical_data_requests(requests_mock)
+
+    assert thermia.heat_pumps[0].historical_data_registers == [
+        "REG_OUTDOOR_TEMPERATURE",
+        "REG_SUPPLY_LINE",
+    ]
+
+    # New objects after a restart use the persisted register map
+    thermia = setup_thermia(
+        requests_mock,
+        "ncp_1024.txt",
+        installation_profile_cache=InstallationProfileCache(cache_file_path),
+    )
+
+    assert thermia.heat_pumps[0].historical_data_registers == [
+        "REG_OUTDOOR_TEMPERATURE",
+        "REG_SUPPLY_LINE",
+    ]
+
+    register_map_requests = [
+        request
+        for request in requests_mock.request_history
+        if request.path == "/api/v1/datahistory/installation/test-id"
+    ]
+    assert len(register_map_requests) == 1
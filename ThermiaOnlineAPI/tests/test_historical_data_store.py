@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta
+
+from .setup import mock_historical_data_requests, setup_thermia
+from ..store.HistoricalDataStore import HistoricalDataStore
+from ..utils.historical_data import datetime_to_timestamp
+
+
+def test_get_missing_ranges():
+    store = HistoricalDataStore()
+    store.add_data("1", 1, 100, 200, [(100, 1), (150, 2), (200, 3)])
+    store.add_data("1", 1, 300, 400, [])
+
+    assert store.get_missing_ranges("1", 1, 0, 500) == [
+        (0, 100),
+        (200, 300),
+        (400, 500),
+    ]
+    assert store.get_missing_ranges("1", 1, 120, 180) == []
+    assert store.get_missing_ranges("1", 2, 120, 180) == [(120, 180)]
+
+    store.add_data("1", 1, 200, 300, [])
+
+    assert store.get_missing_ranges("1", 1, 0, 500) == [(0, 100), (400, 500)]
+    assert store.get_data("1", 1, 120, 500) == [(150, 2), (200, 3)]
+
+
+def test_prune():
+    store = HistoricalDataStore()
+    now = datetime(2024, 1, 10)
+    start = datetime_to_timestamp(datetime(2024, 1, 1))
+    end = datetime_to_timestamp(now)
+
+    store.add_data("1", 1, start, end, [(start, 1), (end, 2)])
+    store.prune(timedelta(days=1), now)
+
+    cutoff = datetime_to_timestamp(now - timedelta(days=1))
+
+    assert store.get_data("1", 1, start, end) == [(end, 2)]
+    assert store.get_missing_ranges("1", 1, start, end) == [(start, cutoff)]
+
+
+def test_get_historical_data_for_register_fetches_only_missing_ranges(
+    requests_mock,
+):
+    thermia = setup_thermia(
+        requests_mock, "ncp_1024.txt", historical_data_store=HistoricalDataStore()
+    )
+    heat_pump = thermia.heat_pumps[0]
+
+    mock_historical_data_requests(requests_mock)
+
+    heat_pump.get_historical_data_for_register(
+        "REG_OUTDOOR_TEMPERATURE", datetime(2024, 1, 1), datetime(2024, 1, 2)
+    )
+    request_count = requests_mock.call_count
+
+    data = heat_pump.get_historical_data_for_register(
+        "REG_OUTDOOR_TEMPERATURE", datetime(2024, 1, 1, 12), datetime(2024, 1, 3)
+    )
+
+    historical_data_requests = [
+        request.qs
+        for request in requests_mock.request_history[request_count:]
+        if "/minute" in request.path
+    ]
+
+    assert historical_data_requests == [
+        {"periodstart": ["2024-01-02t00:00:00"], "periodend": ["2024-01-03t00:00:00"]}
+    ]
+    assert [entry["time"] for entry in data] == [
+        datetime(2024, 1, 1, 12),
+        datetime(2024, 1, 2),
+        datetime(2024, 1, 2, 12),
+        datetime(2024, 1, 3),
+    ]
+
+
+def test_get_historical_data_rollup_for_register_materializes_rollups(
+    requests_mock, monkeypatch
+):
+    store = HistoricalDataStore()
+    thermia = setup_thermia(requests_mock, "ncp_1024.txt", historical_data_store=store)
+    heat_pump = thermia.heat_pumps[0]
+
+    mock_historical_data_requests(requests_mock)
+
+    expected_rollup = [
+        {
+            "time": datetime(2024, 1, 1),
+            "min": 0.0,
+            "max": 12.0,
+            "mean": 6.0,
+            "last": 12.0,
+            "count": 2,
+        },
+        {
+            "time": datetime(2024, 1, 2),
+            "min": 0.0,
+            "max": 12.0,
+            "mean": 6.0,
+            "last": 12.0,
+            "count": 2,
+        },
+    ]
+
+    rollup = heat_pump.get_historical_data_rollup_for_register(
+        "REG_OUTDOOR_TEMPERATURE",
+        datetime(2024, 1, 1),
+        datetime(2024, 1, 2, 23, 59, 59),
+        bucket_size=timedelta(days=1),
+    )
+
+    assert rollup.to_list() == expected_rollup
+
+    # Second query must be answered from materialized rollups only
+    def get_data(*args):
+        raise AssertionError("Raw data should not be queried")
+
+    monkeypatch.setattr(store, "get_data", get_data)
+
+    rollup = heat_pump.get_historical_data_rollup_for_register(
+        "REG_OUTDOOR_TEMPERATURE",
+        datetime(2024, 1, 1),
+        datetime(2024, 1, 2, 23, 59, 59),
+        bucket_size=timedelta(days=1),
+    )
+
+    assert rollup.to_list() == expected_rollup
@@ -0,0 +1,145 @@
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from .setup import setup_thermia
+from ..utils.polling import (
+    AdaptivePollingPolicy,
+    get_polling_offset,
+    polling_ticks,
+)
+
+
+def test_polling_ticks_skip_missed_ticks():
+    async def collect_ticks():
+        ticks = []
+        async for tick in polling_ticks(timedelta(seconds=0.1)):
+            ticks.append(tick)
+            if tick == 0:
+                await asyncio.sleep(0.25)
+            if len(ticks) == 3:
+                return ticks
+
+    assert asyncio.run(collect_ticks()) == [0, 3, 4]
+
+
+def test_watch_yields_snapshots(requests_mock):
+    thermia = setup_thermia(requests_mock, "ncp_1024.txt")
+    heat_pump = thermia.heat_pumps[0]
+
+    async def collect_snapshots(watch):
+        snapshots = []
+        async for snapshot in watch:
+            snapshots.append(snapshot)
+            if len(snapshots) == 2:
+                return snapshots
+
+    snapshots = asyncio.run(
+        collect_snapshots(heat_pump.watch(timedelta(milliseconds=10)))
+    )
+
+    assert snapshots == [heat_pump.snapshot(), heat_pump.snapshot()]
+
+    snapshots = asyncio.run(
+        collect_snapshots(thermia.watch(timedelta(milliseconds=10)))
+    )
+
+    assert snapshots[0] == {heat_pump.id: heat_pump.snapshot()}
+
+
+def test_adaptive_polling_policy():
+    policy = AdaptivePollingPolicy(
+        min_interval=timedelta(minutes=1), max_interval=timedelta(minutes=5)
+    )
+    heat_pump = SimpleNamespace(
+        id="1",
+        is_online=True,
+        running_operational_statuses=["STATUS_STANDBY"],
+        indoor_temperature=21.0,
+        outdoor_temperature=5.0,
+        hot_water_temperature=50.0,
+        supply_line_temperature=30.0,
+        return_line_temperature=None,
+    )
+
+    # Idle heat pump backs off up to the maximum interval
+    intervals = [policy.get_interval(heat_pump, now=i * 60) for i in range(5)]
+
+    assert intervals == [timedelta(minutes=minutes) for minutes in [1, 2, 4, 5, 5]]
+
+    # Fast temperature change resets to the minimum interval
+    heat_pump.supply_line_temperature = 35.0
+
+    assert policy.get_interval(heat_pump, now=600) == timedelta(minutes=1)
+
+    heat_pump.running_operational_statuses = ["COMPRESSOR"]
+
+    assert policy.get_interval(heat_pump, now=660) == timedelta(minutes=1)
+
+    heat_pump.is_online = False
+
+    assert policy.get_interval(heat_pump, now=720) == timedelta(minutes=5)
+
+
+def test_get_polling_offset():
+    interval = timedelta(minutes=1)
+    offsets = [get_polling_offset(str(i), interval) for i in range(100)]
+
+    assert offsets == [get_polling_offset(str(i), interval) for i in range(100)]
+    assert all(timedelta(0) <= offset < interval for offset in offsets)
+    # Spread over the whole interval
+    assert min(offsets) < timedelta(seconds=10)
+    assert max(offsets) > timedelta(seconds=50)
+
+
+def test_polling_ticks_reject_non_positive_interval():
+    async def collect_ticks(interval):
+        ticks = []
+        async for tick in polling_ticks(interval):
+            ticks.append(tick)
+        return ticks
+
+    for interval in [timedelta(0), timedelta(seconds=-1)]:
+        with pytest.raises(ValueError):
+            asyncio.run(asyncio.wait_for(collect_ticks(interval), 5))
+
+
+def test_staggered_watch_yields_each_heat_pump(requests_mock):
+    thermia = setup_thermia(requests_mock, "ncp_1024.txt")
+    heat_pump = thermia.heat_pumps[0]
+
+    async def collect_snapshots():
+        snapshots = []
+        watch = thermia.watch(
+            timedelta(milliseconds=20),
+            stagger=True,
+            jitter=timedelta(milliseconds=5),
+        )
+        async for snapshot in watch:
+            snapshots.append(snapshot)
+            if len(snapshots) == 2:
+                await watch.aclose()
+                return snapshots
+
+    assert (
+        asyncio.run(collect_snapshots()) == [{heat_pump.id: heat_pump.snapshot()}] * 2
+    )
+
+
+def test_staggered_watch_raises_heat_pump_errors(requests_mock, monkeypatch):
+    thermia = setup_thermia(requests_mock, "ncp_1024.txt")
+    heat_pump = thermia.heat_pumps[0]
+
+    def update_data():
+        raise RuntimeError("update failed")
+
+    monkeypatch.setattr(heat_pump, "update_data", update_data)
+
+    async def collect_snapshots():
+        async for _ in thermia.watch(timedelta(milliseconds=20), stagger=True):
+            pass
+
+    with pytest.raises(RuntimeError, match="update failed"):
+        asyncio.run(asyncio.wait_for(collect_snapshots(), 5))
@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta
+import json
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from .setup import THERMIA_TEST_URL, mock_historical_data_requests, setup_thermia
+from ..exceptions.NetworkException import NetworkException
+from ..server.ThermiaServer import ThermiaServer
+
+
+def request_json(server: ThermiaServer, path: str, body=None):
+    host, port = server.address
+    request = Request(
+        "http://" + host + ":" + str(port) + path,
+        data=json.dumps(body).encode() if body is not None else None,
+        method="POST" if body is not None else "GET",
+    )
+
+    try:
+        with urlopen(request, timeout=5) as response:
+            return response.status, json.loads(response.read())
+    except HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_server_serves_cached_snapshots(requests_mock):
+    thermia = setup_thermia(requests_mock, "ncp_1024.txt")
+    mock_historical_data_requests(requests_mock)
+    heat_pump = thermia.heat_pumps[0]
+
+    server = ThermiaServer([thermia], port=0, polling_interval=timedelta(hours=1))
+    server.start()
+
+    try:
+        request_count = requests_mock.call_count
+
+        status, heat_pumps = request_json(server, "/heat_pumps")
+        assert status == 200
+        assert [heat_pump_data["id"] for heat_pump_data in heat_pumps] == ["test-id"]
+
+        status, snapshot = request_json(server, "/heat_pumps/test-id")
+        assert status == 200
+        assert (
+            snapshot["snapshot"]["outdoor_temperature"] == heat_pump.outdoor_temperature
+        )
+
+        # Snapshots are served from the cache
+        assert requests_mock.call_count == request_count
+
+        start = datetime(2024, 1, 1)
+        status, historical_data = request_json(
+            server,
+            "/heat_pumps/test-id/historical_data?register=REG_OUTDOOR_TEMPERATURE&start="
+            + start.isoformat()
+            + "&end="
+            + (start + timedelta(days=1)).isoformat(),
+        )
+        assert status == 200
+        assert historical_data["values"] == [0.0, 12.0, 0.0]
+
+        requests_mock.post(
+            THERMIA_TEST_URL + "/api/v1/Registers/Installations/test-id/Registers"
+        )
+        status, snapshot = request_json(
+            server, "/heat_pumps/test-id/hot_water_switch_state", {"value": 0}
+        )
+        assert status == 200
+        register_requests = [
+            request
+            for request in requests_mock.request_history
+            if request.method == "POST"
+        ]
+        assert register_requests[-1].json()["registerValue"] == 0
+
+        # Invalid values are rejected before writing
+        assert (
+            request_json(server, "/heat_pumps/test-id/temperature", {"value": "abc"})[0]
+            == 400
+        )
+        assert (
+            request_json(
+                server, "/heat_pumps/test-id/operation_mode", {"value": "INVALID"}
+            )[0]
+            == 400
+        )
+        assert (
+            request_json(
+                server, "/heat_pumps/test-id/hot_water_switch_state", {"value": 2}
+            )[0]
+            == 400
+        )
+
+        requests_mock.post(
+            THERMIA_TEST_URL + "/api/v1/Registers/Installations/test-id/Registers",
+            status_code=403,
+        )
+        assert (
+            request_json(
+                server, "/heat_pumps/test-id/hot_water_switch_state", {"value": 1}
+            )[0]
+            == 502
+        )
+        assert [
+            request.json()["registerValue"]
+            for request in requests_mock.request_history
+            if request.method == "POST" and "Registers" in request.url
+        ] == [0, 1]
+
+        # Network errors are reported as bad gateway
+        def get_historical_data_failing(*args):
+            raise NetworkException("Error fetching historical data", 500)
+
+        setattr(
+            heat_pump,
+            "get_historical_data_columns_for_register",
+            get_historical_data_failing,
+        )
+        assert (
+            request_json(
+                server,
+                "/heat_pumps/test-id/historical_data?register=REG_OUTDOOR_TEMPERATURE&start="
+                + start.isoformat()
+                + "&end="
+                + (start + timedelta(days=1)).isoformat(),
+            )[0]
+            == 502
+        )
+
+        assert request_json(server, "/heat_pumps/unknown-id")[0] == 404
+        assert (
+            request_json(server, "/heat_pumps/test-id/unknown", {"value": 1})[0] == 404
+        )
+        assert request_json(server, "/heat_pumps/test-id/temperature", [])[0] == 400
+    finally:
+        server.stop()
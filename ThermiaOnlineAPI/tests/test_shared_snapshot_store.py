@@ -0,0 +1,66 @@
+from .setup import setup_thermia
+from ..store.SharedSnapshotStore import SharedSnapshotReader, SharedSnapshotWriter
+
+
+def test_shared_snapshot_store(requests_mock, tmp_path):
+    thermia = setup_thermia(requests_mock, "ncp_1024.txt")
+    heat_pump = thermia.heat_pumps[0]
+    file_path = str(tmp_path / "snapshots")
+
+    writer = SharedSnapshotWriter(file_path, [heat_pump.id, "other-id"])
+    reader = SharedSnapshotReader(file_path)
+
+    assert reader.heat_pump_ids == ["test-id", "other-id"]
+    assert reader.read("test-id") is None
+    assert reader.get_generation("test-id") == 0
+
+    writer.write(heat_pump)
+    writer.write(heat_pump)
+
+    snapshot = reader.read("test-id")
+    assert snapshot["generation"] == 2
+    assert snapshot["is_online"] == heat_pump.is_online
+    assert snapshot["outdoor_temperature"] == heat_pump.outdoor_temperature
+    assert snapshot["operation_mode"] == heat_pump.operation_mode
+    assert snapshot["hot_water_switch_state"] == heat_pump.hot_water_switch_state
+    assert (
+        snapshot["running_operational_statuses"]
+        == heat_pump.running_operational_statuses
+    )
+
+    assert (
+        reader.read_value("test-id", "hot_water_temperature")
+        == heat_pump.hot_water_temperature
+    )
+    assert reader.read("other-id") is None
+
+    reader.close()
+    writer.close()
+
+
+def test_shared_snapshot_reader_reopens_replaced_file(requests_mock, tmp_path):
+    thermia = setup_thermia(requests_mock, "ncp_1024.txt")
+    heat_pump = thermia.heat_pumps[0]
+    file_path = str(tmp_path / "snapshots")
+
+    writer = SharedSnapshotWriter(file_path, [heat_pump.id])
+    writer.write(heat_pump)
+    reader = SharedSnapshotReader(file_path)
+    assert reader.get_generation("test-id") == 1
+
+    # Recreated writer does not truncate the file mapped by the reader
+    writer.close()
+    writer = SharedSnapshotWriter(file_path, ["other-id", heat_pump.id])
+
+    assert reader.heat_pump_ids == ["other-id", "test-id"]
+    assert reader.read("test-id") is None
+
+    writer.write(heat_pump)
+    assert reader.read("test-id")["generation"] == 1
+    assert (
+        reader.read_value("test-id", "outdoor_temperature")
+        == heat_pump.outdoor_temperature
+    )
+
+    reader.close()
+    writer.close()
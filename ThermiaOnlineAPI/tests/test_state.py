@@ -0,0 +1,32 @@
+import json
+
+from .setup import setup_thermia
+from .. import Thermia
+
+
+def test_restore_from_state_without_requests(requests_mock):
+    thermia = setup_thermia(requests_mock, "ncp_1024.txt")
+    heat_pump = thermia.heat_pumps[0]
+
+    state = json.loads(json.dumps(thermia.to_state()))
+
+    request_count = requests_mock.call_count
+    restored_thermia = Thermia.from_state("username", "password", state)
+    restored_heat_pump = restored_thermia.heat_pumps[0]
+
+    assert requests_mock.call_count == request_count
+    assert restored_thermia.connected is True
+    assert restored_heat_pump.is_data_stale is True
+    assert {**restored_heat_pump.snapshot(), "is_data_stale": False} == (
+        heat_pump.snapshot()
+    )
+    assert (
+        restored_heat_pump.available_operation_modes
+        == heat_pump.available_operation_modes
+    )
+    assert restored_heat_pump.get_register_indexes() == heat_pump.get_register_indexes()
+
+    restored_thermia.update_data_in_background().join()
+
+    assert restored_heat_pump.is_data_stale is False
+    assert requests_mock.call_count > request_count
@@ -0,0 +1,448 @@
+from datetime import timedelta
+import threading
+import time
+
+import requests
+
+from .setup import THERMIA_TEST_URL, setup_thermia
+from .. import Thermia
+from ..store.InstallationProfileCache import InstallationProfileCache
+
+
+def test_update_data_reuses_unchanged_responses(requests_mock):
+    thermia = setup_thermia(requests_mock, "ncp_1024.txt")
+    heat_pump = thermia.heat_pumps[0]
+
+    available_operational_statuses_map = heat_pump.available_operational_statuses_map
+
+    heat_pump.update_data()
+
+    assert not any(heat_pump.changed_data_sources.values())
+    assert (
+        heat_pump.available_operational_statuses_map
+        is available_operational_statuses_map
+    )
+
+
+def test_update_data_detects_changed_response(requests_mock):
+    thermia = setup_thermia(requests_mock, "ncp_1024.txt")
+    heat_pump = thermia.heat_pumps[0]
+
+    requests_mock.get(
+        f"{THERMIA_TEST_URL}/api/v1/installationstatus/test-id/status",
+        json={"heatingEffect": 25},
+    )
+
+    heat_pump.update_data()
+
+    assert heat_pump.changed_data_sources["status"] is True
+    assert heat_pump.changed_data_sources["group_temperatures"] is False
+    assert heat_pump.heat_temperature == 25
+
+
+def test_subscribers_receive_only_changed_properties(requests_mock):
+    thermia = setup_thermia(requests_mock, "ncp_1024.txt")
+    heat_pump = thermia.heat_pumps[0]
+    heat_temperature = heat_pump.heat_temperature
+
+    notifications = []
+    callback = lambda heat_pump, changes: notifications.append(changes)
+    thermia.subscribe(callback)
+
+    thermia.update_data()
+
+    assert notifications == []
+
+    requests_mock.get(
+        f"{THERMIA_TEST_URL}/api/v1/installationstatus/test-id/status",
+        json={"heatingEffect": 25},
+    )
+    thermia.update_data()
+
+    assert len(notifications) == 1
+    assert ("heat_temperature", heat_temperature, 25) in notifications[0]
+    assert "operation_mode" not in [change.name for change in notifications[0]]
+
+    thermia.unsubscribe(callback)
+    requests_mock.get(
+        f"{THERMIA_TEST_URL}/api/v1/installationstatus/test-id/status",
+        json={"heatingEffect": 26},
+    )
+    thermia.update_data()
+
+    assert len(notifications) == 1
+
+
+def test_offline_heat_pump_polls_only_info_with_back_off(requests_mock, monkeypatch):
+    thermia = setup_thermia(requests_mock, "ncp_1024.txt")
+    heat_pump = thermia.heat_pumps[0]
+    snapshot = heat_pump.snapshot()
+
+    info_url = f"{THERMIA_TEST_URL}/api/v1/installations/test-id"
+    online_info = requests.get(info_url).json()
+    requests_mock.get(info_url, json={**online_info, "isOnline": False})
+
+    now = 1000.0
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+
+    request_count = requests_mock.call_count
+    heat_pump.update_data()
+
+    # Only info and installations info are fetched
+    assert requests_mock.call_count == request_count + 2
+    assert heat_pump.is_data_stale is True
+    assert heat_pump.heat_temperature == snapshot["heat_temperature"]
+
+    request_count = requests_mock.call_count
+    heat_pump.update_data()
+
+    assert requests_mock.call_count == request_count
+
+    requests_mock.get(info_url, json=online_info)
+    now += 60
+    heat_pump.update_data()
+
+    assert heat_pump.is_data_stale is False
+    assert requests_mock.call_count > request_count + 2
+
+
+def test_alarm_history_is_synced_less_often_than_active_alarms(requests_mock):
+    setup_thermia(requests_mock, "ncp_1024.txt")
+
+    events_url = f"{THERMIA_TEST_URL}/api/v1/installation/test-id/events"
+    history = requests_mock.get(
+        events_url + "?onlyActiveAlarms=false",
+        json=[{"id": 1, "eventTitle": "Old alarm", "isActiveAlarm": False}],
+    )
+    active_alarms = requests_mock.get(
+        events_url + "?onlyActiveAlarms=true",
+        json=[{"id": 2, "eventTitle": "High pressure", "isActiveAlarm": True}],
+    )
+
+    thermia = Thermia("username", "password")
+    heat_pump = thermia.heat_pumps[0]
+    heat_pump.update_data()
+
+    assert heat_pump.active_alarm_count == 1
+    assert heat_pump.active_alarms == ["High pressure"]
+    assert sorted(event["id"] for event in heat_pump.alarm_history) == [1, 2]
+    assert history.call_count == 1
+    assert active_alarms.call_count == 2
+
+
+def test_unsupported_register_groups_are_not_requested_again(requests_mock):
+    setup_thermia(requests_mock, "ncp_1024.txt")
+
+    groups_url = f"{THERMIA_TEST_URL}/api/v1/Registers/Installations/test-id/Groups/"
+    hot_water = requests_mock.get(groups_url + "REG_GROUP_HOT_WATER", json=[])
+    operational_operation = requests_mock.get(
+        groups_url + "REG_GROUP_OPERATIONAL_OPERATION", status_code=404
+    )
+
+    thermia = Thermia("username", "password")
+    heat_pump = thermia.heat_pumps[0]
+
+    # Cached as unsupported only after several consistent responses
+    for _ in range(3):
+        heat_pump.update_data()
+
+    assert hot_water.call_count == 3
+    assert operational_operation.call_count == 3
+    assert heat_pump.hot_water_switch_state is None
+
+
+def test_empty_response_does_not_hide_supported_register_group(requests_mock):
+    installation_profile_cache = InstallationProfileCache()
+    thermia = setup_thermia(
+        requests_mock,
+        "ncp_1024.txt",
+        installation_profile_cache=installation_profile_cache,
+    )
+    heat_pump = thermia.heat_pumps[0]
+    supply_line_temperature = heat_pump.supply_line_temperature
+
+    temperatures_url = f"{THERMIA_TEST_URL}/api/v1/Registers/Installations/test-id/Groups/REG_GROUP_TEMPERATURES"
+    temperatures = requests.get(temperatures_url).json()
+    requests_mock.get(temperatures_url, json=[])
+
+    for _ in range(3):
+        heat_pump.update_data()
+
+    # Last good data is kept
+    assert heat_pump.supply_line_temperature == supply_line_temperature
+    assert heat_pump.data_source_states["group_temperatures"].error is not None
+
+    requests_mock.get(temperatures_url, json=temperatures)
+    other_heat_pump = Thermia(
+        "username", "password", installation_profile_cache=installation_profile_cache
+    ).heat_pumps[0]
+
+    assert other_heat_pump.supply_line_temperature == supply_line_temperature
+
+
+def test_offline_heat_pump_does_not_cache_unsupported_data(requests_mock):
+    setup_thermia(requests_mock, "ncp_1024.txt")
+
+    info_url = f"{THERMIA_TEST_URL}/api/v1/installations/test-id"
+    online_info = requests.get(info_url).json()
+    requests_mock.get(info_url, json={**online_info, "isOnline": False})
+    groups_url = f"{THERMIA_TEST_URL}/api/v1/Registers/Installations/test-id/Groups/"
+    temperatures = requests.get(groups_url + "REG_GROUP_TEMPERATURES").json()
+    requests_mock.get(groups_url + "REG_GROUP_TEMPERATURES", json=[])
+
+    installation_profile_cache = InstallationProfileCache()
+    for _ in range(3):
+        Thermia(
+            "username",
+            "password",
+            installation_profile_cache=installation_profile_cache,
+        )
+
+    requests_mock.get(info_url, json=online_info)
+    requests_mock.get(groups_url + "REG_GROUP_TEMPERATURES", json=temperatures)
+    heat_pump = Thermia(
+        "username", "password", installation_profile_cache=installation_profile_cache
+    ).heat_pumps[0]
+
+    assert heat_pump.supply_line_temperature is not None
+
+
+def test_capability_profile_is_shared_per_installation_profile(requests_mock):
+    installation_profile_cache = InstallationProfileCache()
+    thermia = setup_thermia(
+        requests_mock,
+        "ncp_1024.txt",
+        installation_profile_cache=installation_profile_cache,
+    )
+    heat_pump = thermia.heat_pumps[0]
+
+    capability_profile = installation_profile_cache.get(1024, "capabilities")
+
+    assert capability_profile["operational_status_register"] is not None
+    assert (
+        capability_profile["operation_mode_register_index"]
+        == heat_pump.get_register_indexes()["operation_mode"]
+    )
+
+    other_heat_pump = Thermia(
+        "username", "password", installation_profile_cache=installation_profile_cache
+    ).heat_pumps[0]
+
+    assert (
+        other_heat_pump.running_operational_statuses
+        == heat_pump.running_operational_statuses
+    )
+    assert installation_profile_cache.get(1024, "capabilities") is capability_profile
+
+
+def test_capability_profile_of_other_registers_is_not_used(requests_mock):
+    installation_profile_cache = InstallationProfileCache()
+    installation_profile_cache.set(
+        1005,
+        "capabilities",
+        {
+            "operational_status_register": "COMP_STATUS",
+            "operational_status_valueNamePrefix": "COMP_VALUE_",
+            "operational_status_minRegisterValue": "4",
+        },
+    )
+
+    setup_thermia(
+        requests_mock,
+        "iTec_IQ.txt",
+        installation_profile_cache=installation_profile_cache,
+    )
+
+    capability_profile = installation_profile_cache.get(1005, "capabilities")
+
+    assert capability_profile["operational_status_register"] == "COMP_STATUS_ITEC"
+    assert capability_profile["operational_status_minRegisterValue"] is None
+
+
+def test_stale_data_source_is_refreshed_in_background(requests_mock, monkeypatch):
+    thermia = setup_thermia(
+        requests_mock, "ncp_1024.txt", max_data_age=timedelta(minutes=1)
+    )
+    heat_pump = thermia.heat_pumps[0]
+    heat_temperature = heat_pump.heat_temperature
+
+    response_allowed = threading.Event()
+
+    def get_status(request, context):
+        response_allowed.wait(1)
+        return {"heatingEffect": 25}
+
+    status = requests_mock.get(
+        f"{THERMIA_TEST_URL}/api/v1/installationstatus/test-id/status",
+        json=get_status,
+    )
+
+    # Fresh data is returned without requests
+    assert heat_pump.heat_temperature == heat_temperature
+    assert status.call_count == 0
+
+    now = time.monotonic() + 120
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    request_count = requests_mock.call_count
+
+    # Stale data is returned at once, while only its data source is refreshed
+    assert heat_pump.heat_temperature == heat_temperature
+    response_allowed.set()
+
+    for _ in range(100):
+        if heat_pump.heat_temperature == 25:
+            break
+        time.sleep(0.01)
+
+    assert heat_pump.heat_temperature == 25
+    assert status.call_count == 1
+    assert requests_mock.call_count == request_count + 1
+
+
+def test_background_refresh_and_update_data_are_serialized(requests_mock, monkeypatch):
+    thermia = setup_thermia(
+        requests_mock, "ncp_1024.txt", max_data_age=timedelta(minutes=1)
+    )
+    heat_pump = thermia.heat_pumps[0]
+
+    status_url = f"{THERMIA_TEST_URL}/api/v1/installationstatus/test-id/status"
+    requests_mock.get(status_url, json={"heatingEffect": 25})
+
+    notifications = []
+    in_callback = threading.Event()
+    callback_allowed = threading.Event()
+
+    def callback(heat_pump, changes):
+        notifications.append(changes)
+        if len(notifications) == 1:
+            in_callback.set()
+            callback_allowed.wait(1)
+
+    heat_pump.subscribe(callback)
+
+    now = time.monotonic() + 120
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+
+    # Starts a background refresh of status, which notifies subscribers
+    heat_pump.heat_temperature
+    assert in_callback.wait(1)
+
+    requests_mock.get(status_url, json={"heatingEffect": 26})
+    update = threading.Thread(target=heat_pump.update_data)
+    update.start()
+    time.sleep(0.1)
+
+    # update_data() waits until the background refresh has notified subscribers
+    assert len(notifications) == 1
+
+    callback_allowed.set()
+    update.join()
+
+    assert [
+        [change.new_value for change in changes if change.name == "heat_temperature"]
+        for changes in notifications
+    ] == [[25], [26]]
+    assert heat_pump.changed_data_sources["status"] is True
+
+
+def test_outdated_background_refresh_does_not_replace_newer_data(
+    requests_mock, monkeypatch
+):
+    thermia = setup_thermia(
+        requests_mock, "ncp_1024.txt", max_data_age=timedelta(minutes=1)
+    )
+    heat_pump = thermia.heat_pumps[0]
+
+    status_url = f"{THERMIA_TEST_URL}/api/v1/installationstatus/test-id/status"
+    requests_mock.get(status_url, json={"heatingEffect": 25})
+
+    # Background fetch is held after its response, as mocked requests are serialized
+    in_fetch = threading.Event()
+    fetch_allowed = threading.Event()
+    get_device_status = thermia.api_interface.get_device_status
+
+    def get_device_status_held(*args, **kwargs):
+        device_status = get_device_status(*args, **kwargs)
+        if threading.current_thread() is not threading.main_thread():
+            in_fetch.set()
+            fetch_allowed.wait(1)
+        return device_status
+
+    monkeypatch.setattr(
+        thermia.api_interface, "get_device_status", get_device_status_held
+    )
+
+    notifications = []
+    heat_pump.subscribe(lambda heat_pump, changes: notifications.append(changes))
+
+    now = time.monotonic() + 120
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+
+    # Starts a background refresh of status, which is overtaken by update_data()
+    heat_pump.heat_temperature
+    assert in_fetch.wait(1)
+
+    now += 1
+    requests_mock.get(status_url, json={"heatingEffect": 26})
+    heat_pump.update_data()
+    assert heat_pump.heat_temperature == 26
+
+    fetch_allowed.set()
+    for _ in range(100):
+        if "status" not in heat_pump._ThermiaHeatPump__refreshing_data_sources:
+            break
+        time.sleep(0.01)
+
+    assert heat_pump.heat_temperature == 26
+    assert [
+        [change.new_value for change in changes if change.name == "heat_temperature"]
+        for changes in notifications
+    ] == [[26]]
+
+
+def test_failed_data_source_keeps_last_good_value(requests_mock):
+    thermia = setup_thermia(requests_mock, "ncp_1024.txt")
+    heat_pump = thermia.heat_pumps[0]
+    supply_line_temperature = heat_pump.supply_line_temperature
+    fetched_at = heat_pump.data_source_states["group_temperatures"].fetched_at
+
+    requests_mock.get(
+        f"{THERMIA_TEST_URL}/api/v1/Registers/Installations/test-id/Groups/REG_GROUP_TEMPERATURES",
+        status_code=500,
+    )
+    requests_mock.get(
+        f"{THERMIA_TEST_URL}/api/v1/installationstatus/test-id/status",
+        json={"heatingEffect": 25},
+    )
+    heat_pump.update_data()
+
+    data_source_states = heat_pump.data_source_states
+
+    assert heat_pump.supply_line_temperature == supply_line_temperature
+    assert heat_pump.heat_temperature == 25
+    assert heat_pump.is_data_stale is True
+    assert data_source_states["group_temperatures"].fetched_at == fetched_at
+    assert data_source_states["group_temperatures"].error is not None
+    assert data_source_states["status"].fetched_at > fetched_at
+    assert data_source_states["status"].error is None
+    assert heat_pump.changed_data_sources["group_temperatures"] is False
+
+
+def test_failed_alarm_history_sync_keeps_fetched_data(requests_mock):
+    setup_thermia(requests_mock, "ncp_1024.txt")
+
+    requests_mock.get(
+        f"{THERMIA_TEST_URL}/api/v1/installation/test-id/events?onlyActiveAlarms=false",
+        exc=requests.exceptions.ConnectionError,
+    )
+    requests_mock.get(
+        f"{THERMIA_TEST_URL}/api/v1/installationstatus/test-id/status",
+        json={"heatingEffect": 25},
+    )
+
+    heat_pump = Thermia("username", "password").heat_pumps[0]
+
+    assert heat_pump.heat_temperature == 25
+    assert heat_pump.is_data_stale is True
+    assert heat_pump.data_source_states["alarm_history"].error is not None
+    assert heat_pump.data_source_states["status"].error is None
@@ -0,0 +1,35 @@
+import json
+
+from .setup import setup_thermia
+from ..utils import utils
+
+
+def test_custom_json_decoder_decodes_api_responses(requests_mock, monkeypatch):
+    monkeypatch.setattr(utils, "json_loads", utils.json_loads)
+
+    decoded_responses = []
+
+    def decoder(data):
+        decoded_responses.append(data)
+        return json.loads(data)
+
+    utils.set_json_decoder(decoder)
+    thermia = setup_thermia(requests_mock, "ncp_1024.txt")
+
+    assert len(decoded_responses) > 0
+    assert all(isinstance(data, bytes) for data in decoded_responses)
+    assert thermia.heat_pumps[0].outdoor_temperature is not None
+
+    utils.set_json_decoder(None)
+    assert utils.json_loads is utils.get_default_json_decoder()
+
+
+def test_json_decoder_falls_back_to_json_without_orjson(requests_mock, monkeypatch):
+    monkeypatch.setattr(utils, "json_loads", utils.json_loads)
+    monkeypatch.setattr(utils, "orjson", None)
+
+    utils.set_json_decoder(None)
+    assert utils.json_loads is json.loads
+
+    thermia = setup_thermia(requests_mock, "ncp_1024.txt")
+    assert thermia.heat_pumps[0].outdoor_temperature is not None
@@ -0,0 +1,134 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import logging
+import threading
+import time
+from typing import Callable, Deque, List, Optional, TypeVar
+
+_LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class HedgingPolicy:
+    """
+    Hedging of idempotent requests: when a request has not answered within
+    the given percentile of recently observed latencies, a second identical
+    request is sent and whichever answers first is used. At most
+    max_hedge_ratio of requests are hedged, and no requests are hedged until
+    min_samples latencies have been observed. Only hedged requests run on
+    the pool of max_workers threads.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95,
+        max_hedge_ratio: float = 0.1,
+        min_samples: int = 20,
+        window_size: int = 1000,
+        max_workers: int = 8,
+    ):
+        self.__percentile = percentile
+        self.__max_hedge_ratio = max_hedge_ratio
+        self.__min_samples = min_samples
+
+        self.__lock = threading.Lock()
+        self.__latencies: Deque[float] = deque(maxlen=window_size)
+        # Whether each of the recent requests was hedged, for the hedging budget
+        self.__hedged_requests: Deque[bool] = deque(maxlen=window_size)
+
+        self.__executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="hedged-request"
+        )
+
+    def get_hedge_delay(self) -> Optional[float]:
+        with self.__lock:
+            if len(self.__latencies) < self.__min_samples:
+                return None
+
+            latencies = sorted(self.__latencies)
+
+        index = min(len(latencies) - 1, int(len(latencies) * self.__percentile / 100))
+        return latencies[index]
+
+    def run(self, request: Callable[[], T]) -> T:
+        hedge_delay = self.get_hedge_delay()
+
+        # Requests that cannot be hedged run on the caller's thread, without waiting for the pool
+        if hedge_delay is None or not self.__has_hedge_budget():
+            with self.__lock:
+                self.__hedged_requests.append(False)
+
+            return self.__run_and_record_latency(request)
+
+        # First request runs on its own thread, so only hedged requests share the pool
+        future: "Future[T]" = Future()
+        threading.Thread(
+            target=self.__run_into_future, args=(request, future), daemon=True
+        ).start()
+
+        done, _ = wait([future], timeout=hedge_delay)
+
+        if len(done) == 0 and self.__try_acquire_hedge():
+            _LOGGER.debug(
+                "Request did not answer in " + str(round(hedge_delay, 3)) + "s, hedging"
+            )
+            return self.__wait_for_first_success(
+                [future, self.__executor.submit(request)]
+            )
+
+        with self.__lock:
+            self.__hedged_requests.append(False)
+
+        return future.result()
+
+    def __run_into_future(self, request: Callable[[], T], future: "Future[T]"):
+        if not future.set_running_or_notify_cancel():
+            return
+
+        try:
+            future.set_result(self.__run_and_record_latency(request))
+        except BaseException as e:
+            future.set_exception(e)
+
+    def __run_and_record_latency(self, request: Callable[[], T]) -> T:
+        # Latency of the first request is recorded even if the hedged request wins
+        start_time = time.monotonic()
+
+        try:
+            return request()
+        finally:
+            self.__record_latency(time.monotonic() - start_time)
+
+    def __wait_for_first_success(self, futures: "List[Future[T]]") -> T:
+        pending = set(futures)
+
+        # Use the first successful response, or the last error if both fail
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+            for completed_future in done:
+                if completed_future.exception() is None or len(pending) == 0:
+                    return completed_future.result()
+
+    def __has_hedge_budget(self) -> bool:
+        with self.__lock:
+            return self.__has_hedge_budget_locked()
+
+    def __try_acquire_hedge(self) -> bool:
+        with self.__lock:
+            if not self.__has_hedge_budget_locked():
+                return False
+
+            self.__hedged_requests.append(True)
+            return True
+
+    def __has_hedge_budget_locked(self) -> bool:
+        requests_count = len(self.__hedged_requests) + 1
+        hedged_count = sum(self.__hedged_requests) + 1
+
+        return hedged_count <= self.__max_hedge_ratio * requests_count
+
+    def __record_latency(self, latency: float):
+        with self.__lock:
+            self.__latencies.append(latency)
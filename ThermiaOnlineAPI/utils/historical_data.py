@@ -0,0 +1,131 @@
+import calendar
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from functools import lru_cache
+import logging
+from typing import Callable, List, Optional, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+TimeChunk = Tuple[datetime, datetime]
+
+EPOCH = datetime(1970, 1, 1)
+
+
+# Thermia API works with naive datetimes, they are converted to timestamps
+# as if they were UTC so that the conversion is the same in both directions
+def datetime_to_timestamp(date: datetime) -> int:
+    return calendar.timegm(date.timetuple())
+
+
+def timestamp_to_datetime(timestamp: int) -> datetime:
+    return EPOCH + timedelta(seconds=timestamp)
+
+
+@lru_cache(maxsize=1024)
+def _date_to_timestamp(date: str) -> int:
+    return calendar.timegm((int(date[0:4]), int(date[5:7]), int(date[8:10]), 0, 0, 0))
+
+
+def parse_historical_data_timestamp(at: str) -> int:
+    # Format is always "YYYY-MM-DDTHH:MM:SS[.fff]", parsing it by position
+    # avoids creating a datetime object for every data point
+    return (
+        _date_to_timestamp(at[0:10])
+        + int(at[11:13]) * 3600
+        + int(at[14:16]) * 60
+        + int(at[17:19])
+    )
+
+
+def plan_time_chunks(
+    start_date: datetime, end_date: datetime, chunk_size: Optional[timedelta]
+) -> List[TimeChunk]:
+    if chunk_size is None or chunk_size <= timedelta(0) or start_date >= end_date:
+        return [(start_date, end_date)]
+
+    chunks = []
+    chunk_start = start_date
+
+    while chunk_start < end_date:
+        chunk_end = min(chunk_start + chunk_size, end_date)
+        chunks.append((chunk_start, chunk_end))
+        chunk_start = chunk_end
+
+    return chunks
+
+
+def fetch_time_chunks(
+    fetch_chunk: Callable[[datetime, datetime], Optional[list]],
+    chunks: List[TimeChunk],
+    max_parallel_requests: int,
+) -> List[Optional[list]]:
+    """
+    Fetch all chunks with bounded parallelism, then retry failed chunks one by one.
+    Result is in the same order as chunks, None for chunks that failed twice.
+    """
+
+    def fetch_chunk_or_none(chunk: TimeChunk) -> Optional[list]:
+        try:
+            return fetch_chunk(*chunk)
+        except Exception as e:
+            _LOGGER.warning(
+                "Error fetching data for period "
+                + str(chunk[0])
+                + " - "
+                + str(chunk[1])
+                + ": "
+                + str(e)
+            )
+            return None
+
+    results: List[Optional[list]] = [None] * len(chunks)
+
+    if len(chunks) == 1 or max_parallel_requests <= 1:
+        for index, chunk in enumerate(chunks):
+            results[index] = fetch_chunk_or_none(chunk)
+    else:
+        with ThreadPoolExecutor(
+            max_workers=min(max_parallel_requests, len(chunks))
+        ) as executor:
+            futures = {
+                executor.submit(fetch_chunk_or_none, chunk): index
+                for index, chunk in enumerate(chunks)
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+
+    for index, chunk in enumerate(chunks):
+        if results[index] is None:
+            results[index] = fetch_chunk_or_none(chunk)
+
+            if results[index] is None:
+                _LOGGER.error(
+                    "Failed to fetch data for period "
+                    + str(chunk[0])
+                    + " - "
+                    + str(chunk[1])
+                )
+
+    return results
+
+
+def merge_historical_data_chunks(chunks_data: List[Optional[list]]) -> list:
+    """
+    Merge ordered chunks of raw historical data entries into one list,
+    chunk edges overlap so entries already seen are dropped.
+    """
+    merged_data = []
+    last_at = None
+
+    for chunk_data in chunks_data:
+        for entry in chunk_data or []:
+            entry_at = entry["at"]
+
+            if last_at is not None and entry_at <= last_at:
+                continue
+
+            merged_data.append(entry)
+            last_at = entry_at
+
+    return merged_data
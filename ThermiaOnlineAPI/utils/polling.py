@@ -0,0 +1,165 @@
+import asyncio
+import hashlib
+from datetime import timedelta
+import logging
+import math
+import time
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Dict, Optional, Tuple, Union
+
+from ..const import (
+    ADAPTIVE_POLLING_MAX_INTERVAL,
+    ADAPTIVE_POLLING_MIN_INTERVAL,
+    ADAPTIVE_POLLING_RATE_OF_CHANGE_THRESHOLD,
+    IDLE_OPERATIONAL_STATUSES,
+)
+
+if TYPE_CHECKING:
+    from ..model.HeatPump import ThermiaHeatPump
+
+_LOGGER = logging.getLogger(__name__)
+
+# Heat pump properties used to calculate the rate of change of temperatures
+ADAPTIVE_POLLING_TEMPERATURE_PROPERTIES = [
+    "indoor_temperature",
+    "outdoor_temperature",
+    "hot_water_temperature",
+    "supply_line_temperature",
+    "return_line_temperature",
+]
+
+
+async def polling_ticks(
+    interval: Union[timedelta, Callable[[], timedelta]],
+) -> AsyncIterator[int]:
+    """
+    Yield tick numbers every interval, starting immediately. Interval can be
+    a function, which is called after each cycle to get the next interval.
+
+    Ticks are scheduled from the previous tick time and not from the end of
+    the previous cycle, so they do not drift. Ticks that were missed because
+    the previous cycle (including the consumer's work) took too long are
+    skipped instead of being run back to back.
+    """
+    loop = asyncio.get_running_loop()
+
+    tick_time = loop.time()
+    tick = 0
+
+    while True:
+        yield tick
+
+        interval_seconds = (
+            interval() if callable(interval) else interval
+        ).total_seconds()
+
+        if interval_seconds <= 0:
+            raise ValueError("Polling interval must be positive")
+
+        tick += 1
+        tick_time += interval_seconds
+        now = loop.time()
+
+        if now > tick_time:
+            missed_ticks = math.ceil((now - tick_time) / interval_seconds)
+            _LOGGER.debug(
+                "Polling cycle took too long, skipping "
+                + str(missed_ticks)
+                + " cycle(s)"
+            )
+            tick += missed_ticks
+            tick_time += missed_ticks * interval_seconds
+
+        await asyncio.sleep(tick_time - now)
+
+
+def get_polling_offset(key: str, interval: timedelta) -> timedelta:
+    """
+    Deterministic offset within interval, evenly distributed over keys, used
+    to spread polling of many heat pumps across the interval.
+    """
+    key_hash = int.from_bytes(
+        hashlib.blake2b(key.encode(), digest_size=8).digest(), "big"
+    )
+
+    return interval * (key_hash / 2**64)
+
+
+class AdaptivePollingPolicy:
+    """
+    Chooses polling intervals of heat pumps based on their current state.
+
+    Heat pumps that are running (see IDLE_OPERATIONAL_STATUSES) or whose
+    temperatures change faster than rate_of_change_threshold degrees per
+    minute are polled every min_interval. While a heat pump is idle, its
+    interval doubles after each update, up to max_interval. Offline heat
+    pumps are polled every max_interval.
+    """
+
+    def __init__(
+        self,
+        min_interval: timedelta = ADAPTIVE_POLLING_MIN_INTERVAL,
+        max_interval: timedelta = ADAPTIVE_POLLING_MAX_INTERVAL,
+        rate_of_change_threshold: float = ADAPTIVE_POLLING_RATE_OF_CHANGE_THRESHOLD,
+    ):
+        self.__min_interval = min_interval
+        self.__max_interval = max_interval
+        self.__rate_of_change_threshold = rate_of_change_threshold
+
+        # Last interval, update time and temperatures by heat pump id
+        self.__state: Dict[str, Tuple[timedelta, float, Dict[str, float]]] = {}
+
+    def get_interval(
+        self, heat_pump: "ThermiaHeatPump", now: Optional[float] = None
+    ) -> timedelta:
+        if now is None:
+            now = time.monotonic()
+
+        temperatures = {
+            property_name: getattr(heat_pump, property_name)
+            for property_name in ADAPTIVE_POLLING_TEMPERATURE_PROPERTIES
+        }
+
+        previous_state = self.__state.get(heat_pump.id)
+
+        if heat_pump.is_online is False:
+            interval = self.__max_interval
+        elif self.__is_running(heat_pump) or previous_state is None:
+            interval = self.__min_interval
+        elif (
+            self.__get_rate_of_change(previous_state, now, temperatures)
+            >= self.__rate_of_change_threshold
+        ):
+            interval = self.__min_interval
+        else:
+            interval = min(previous_state[0] * 2, self.__max_interval)
+
+        self.__state[heat_pump.id] = (interval, now, temperatures)
+
+        return interval
+
+    def __is_running(self, heat_pump: "ThermiaHeatPump") -> bool:
+        return any(
+            status not in IDLE_OPERATIONAL_STATUSES
+            for status in heat_pump.running_operational_statuses
+        )
+
+    def __get_rate_of_change(
+        self,
+        previous_state: Tuple[timedelta, float, Dict[str, float]],
+        now: float,
+        temperatures: Dict[str, float],
+    ) -> float:
+        _, previous_time, previous_temperatures = previous_state
+        minutes = (now - previous_time) / 60
+
+        if minutes <= 0:
+            return 0.0
+
+        changes = [
+            abs(temperature - previous_temperatures[property_name])
+            for property_name, temperature in temperatures.items()
+            if temperature is not None
+            and previous_temperatures.get(property_name) is not None
+        ]
+
+        return max(changes, default=0.0) / minutes
@@ -1,9 +1,15 @@
 import json
 from base64 import urlsafe_b64encode
 import logging
+import os
 import random
 import string
-from typing import Any, TypeVar
+from typing import Any, Callable, Optional, TypeVar, Union
+
+try:
+    import orjson
+except ImportError:  # orjson is an optional dependency
+    orjson = None
 
 T = TypeVar("T")
 
@@ -11,6 +17,22 @@ T = TypeVar("T")
 _LOGGER = logging.getLogger(__name__)
 
 
+def get_default_json_decoder() -> Callable[[Union[bytes, str]], Any]:
+    # orjson is preferred when installed. Both decoders accept raw bytes,
+    # json.loads detects UTF-8/16/32 by itself.
+    return orjson.loads if orjson is not None else json.loads
+
+
+# Decoder used for all API responses
+json_loads: Callable[[Union[bytes, str]], Any] = get_default_json_decoder()
+
+
+def set_json_decoder(decoder: Optional[Callable[[Union[bytes, str]], Any]]) -> None:
+    """Set the decoder of API responses, None restores the default one."""
+    global json_loads
+    json_loads = decoder if decoder is not None else get_default_json_decoder()
+
+
 def get_dict_value_or_none(dictionary, key) -> Any:
     if dictionary is None or key not in dictionary:
         return None
@@ -64,7 +86,30 @@ def generate_challenge(length):
 
 def get_response_json_or_log_and_raise_exception(response, message: str):
     try:
-        return response.json()
+        # Decode raw body bytes directly, response.text would create an extra str copy
+        return json_loads(response.content)
     except Exception as e:
         _LOGGER.error(f"{message} {response.status_code} {response.text}")
         raise Exception(f"{message} {response.status_code} {response.text}") from e
+
+
+def load_json_file(file_path: str, default: T) -> T:
+    if not os.path.exists(file_path):
+        return default
+
+    try:
+        with open(file_path, "r") as file:
+            return json.load(file)
+    except (OSError, ValueError) as e:
+        _LOGGER.error("Error reading JSON file " + file_path + ": " + str(e))
+        return default
+
+
+def save_json_file(file_path: str, data) -> None:
+    # Write to a temporary file first, so that a crash never leaves a partially written file
+    temporary_file_path = file_path + ".tmp"
+
+    with open(temporary_file_path, "w") as file:
+        json.dump(data, file)
+
+    os.replace(temporary_file_path, file_path)
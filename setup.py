@@ -10,8 +10,12 @@ setuptools.setup(
     packages=[
         "ThermiaOnlineAPI",
         "ThermiaOnlineAPI.api",
+        "ThermiaOnlineAPI.backfill",
         "ThermiaOnlineAPI.exceptions",
+        "ThermiaOnlineAPI.export",
         "ThermiaOnlineAPI.model",
+        "ThermiaOnlineAPI.server",
+        "ThermiaOnlineAPI.store",
         "ThermiaOnlineAPI.utils",
     ],
     setuptools_git_versioning={
@@ -28,6 +32,11 @@ setuptools.setup(
     download_url="https://github.com/klejejs/python-thermia-online-api/releases",
     keywords=["Thermia", "Online"],
     install_requires=[],
+    extras_require={
+        "fast": ["orjson"],
+        "numpy": ["numpy"],
+        "export": ["pyarrow"],
+    },
     setup_requires=["setuptools-git-versioning"],
     classifiers=[],
 )